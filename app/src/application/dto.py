@@ -1,15 +1,21 @@
 # -*- coding: utf-8 -*-
 
-from typing import Optional
-from dataclasses import dataclass, asdict
+from typing import Any, Optional
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
 from decimal import Decimal
 
+from app.src.domain.entities import SearchResultsDm
+
 
 @dataclass(slots=True)
 class Filters:
     agency: Optional[str]
     address: Optional[str]
 
+    def to_dict(self):
+        return {k: v for k, v in asdict(self).items() if v is not None}
+
 
 @dataclass(slots=True)
 class Cookies:
@@ -27,10 +33,107 @@ class RequestParam:
     url: str
     headers: Optional[dict[str, str]]
 
+@dataclass(slots=True)
+class FetchState:
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+
+
+@dataclass(slots=True)
+class FetchResult:
+    modified: bool
+    data: Optional[str]
+    state: Optional[FetchState]
+    gone: bool = False
+
+
+@dataclass(slots=True)
+class FetchSettings:
+    initial_rate: float
+    min_rate: float
+    max_rate: float
+    burst: int
+    initial_concurrency: int
+    max_concurrency: int
+    max_retries: int
+    backoff_base: float
+    backoff_max: float
+
+
+@dataclass(slots=True)
+class HostFetchStats:
+    host: str
+    rate: float
+    concurrency: int
+    in_flight: int
+    throttled: int
+
+
+@dataclass(slots=True)
+class LabelCount:
+    label: str
+    count: int
+
+
+@dataclass(slots=True)
+class RecrawlSettings:
+    interval: float
+    batch_size: int
+    concurrency: int
+    min_age: float
+
+
+@dataclass(slots=True)
+class ParseSettings:
+    streaming: bool
+
+
+@dataclass(slots=True)
+class IngestSettings:
+    fetch_workers: int
+    parse_workers: int
+    queue_size: int
+    persist_batch_size: int
+
+
+@dataclass(slots=True)
+class IngestResult:
+    url: str
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass(slots=True)
+class DiscoverySettings:
+    search_url: str
+    link_pattern: str
+    max_pages: int
+
+
+@dataclass(slots=True)
+class DiscoveryResult:
+    pages: int
+    found: int
+    ingested: list[IngestResult]
+
+
 @dataclass(slots=True)
 class DbSearchFilters:
     min_price_usd: Optional[int] = None
     max_price_usd: Optional[int] = None
+    min_year_of_build: Optional[int] = None
+    max_year_of_build: Optional[int] = None
+    min_floor: Optional[int] = None
+    max_floor: Optional[int] = None
+    min_area: Optional[Decimal] = None
+    max_area: Optional[Decimal] = None
+    min_living_area: Optional[Decimal] = None
+    max_living_area: Optional[Decimal] = None
+    min_kitchen_area: Optional[Decimal] = None
+    max_kitchen_area: Optional[Decimal] = None
+    active: Optional[bool] = None
     build_type: Optional[str] = None
     year_of_build: Optional[int] = None
     floor: Optional[int] = None
@@ -50,4 +153,147 @@ class DbSearchFilters:
     street: Optional[str] = None
     house_number: Optional[str] = None
     city_region: Optional[str] = None
-    micro_region: Optional[str] = None
\ No newline at end of file
+    micro_region: Optional[str] = None
+    q: Optional[str] = None
+
+
+@dataclass(slots=True)
+class GeoSearch:
+    latitude: float
+    longitude: float
+    radius: Optional[float] = None
+    min_latitude: Optional[float] = None
+    min_longitude: Optional[float] = None
+    max_latitude: Optional[float] = None
+    max_longitude: Optional[float] = None
+
+
+@dataclass(slots=True)
+class SearchSettings:
+    default_page_size: int
+    max_page_size: int
+    stream_batch_size: int
+
+
+@dataclass(slots=True)
+class SearchPage:
+    limit: int
+    cursor: Optional[str] = None
+
+
+@dataclass(slots=True)
+class SearchResults:
+    items: list[SearchResultsDm]
+    next_cursor: Optional[str] = None
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int
+    misses: int
+    size: int
+
+
+@dataclass(slots=True)
+class AnalyticsSettings:
+    interval: float
+    batch_size: int
+    lag: float
+
+
+@dataclass(slots=True)
+class ObjectFacts:
+    id: str
+    active: bool
+    updated_at: datetime
+    city: Optional[str]
+    city_region: Optional[str]
+    micro_region: Optional[str]
+    build_type: Optional[str]
+    repair: Optional[str]
+    rooms: Optional[int]
+    year_of_build: Optional[int]
+    price_usd: Optional[int]
+    price_m2: Optional[int]
+    area: Optional[Decimal]
+
+
+@dataclass(slots=True)
+class AggregateQuery:
+    metric: str
+    group_by: tuple[str, ...] = ()
+    percentiles: tuple[float, ...] = (50,)
+    filters: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class AggregateGroup:
+    key: dict[str, Any]
+    count: int
+    mean: float
+    min: float
+    max: float
+    percentiles: dict[str, float]
+
+
+@dataclass(slots=True)
+class HistogramQuery:
+    metric: str
+    bins: int = 20
+    filters: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class Histogram:
+    edges: list[float]
+    counts: list[int]
+
+
+@dataclass(slots=True)
+class AnalyticsStats:
+    rows: int
+    live: int
+    watermark: Optional[datetime]
+    refreshed_at: Optional[datetime]
+
+
+@dataclass(slots=True)
+class PricePoint:
+    observed_at: datetime
+    price_usd: Optional[int]
+    price_byn: Optional[int]
+
+
+@dataclass(slots=True)
+class MarketStatsSettings:
+    interval: float
+
+
+@dataclass(slots=True)
+class PriceHistorySettings:
+    interval: float
+    months_ahead: int
+
+
+@dataclass(slots=True)
+class MarketStatsQuery:
+    group_by: tuple[str, ...] = ()
+    filters: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class MarketStat:
+    city: Optional[str]
+    city_region: Optional[str]
+    rooms: Optional[int]
+    build_type: Optional[str]
+    count: int
+    avg_price_usd: Optional[float]
+    p25_price_usd: Optional[float]
+    median_price_usd: Optional[float]
+    p75_price_usd: Optional[float]
+    avg_price_m2: Optional[float]
+    p25_price_m2: Optional[float]
+    median_price_m2: Optional[float]
+    p75_price_m2: Optional[float]
+    refreshed_at: datetime
\ No newline at end of file
@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
 
-from typing import Optional
+import asyncio
+from dataclasses import replace
+from datetime import timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
 
+from app.src.domain import geohash
 from app.src.domain.entities import ObjectDm, SearchResultsDm 
 from app.src.application import interfaces
 from app.src.application import dto
@@ -10,43 +14,156 @@ from app.src.application import dto
 class SaveObjectInteractor:
     def __init__(
         self,
-        save_gateway: interfaces.SaveObject,
+        upsert_gateway: interfaces.UpsertObject,
         db_session: interfaces.DbSession,
-        uuid_generator: interfaces.UUIDGenerator
+        uuid_generator: interfaces.UUIDGenerator,
+        search_cache: interfaces.SearchCache,
+        object_cache: interfaces.ObjectCache,
+        seen_urls: interfaces.SeenUrls
     ) -> None:
-        self._save_gateway = save_gateway
+        self._upsert_gateway = upsert_gateway
         self._db_session = db_session
         self._uuid_generator = uuid_generator
+        self._search_cache = search_cache
+        self._object_cache = object_cache
+        self._seen_urls = seen_urls
 
     async def __call__(self, object_dm: ObjectDm) -> None:
         object_dm.id = str(self._uuid_generator())
-        await self._save_gateway.save(object_dm)
+        object_dm.id = await self._upsert_gateway.upsert(object_dm)
         await self._db_session.commit()
+        self._search_cache.invalidate()
+        self._object_cache.invalidate(object_dm.url)
+        self._seen_urls.add(object_dm.url)
 
 
 class GetObjectInteractor:
     def __init__(
         self,
-        read_gateway: interfaces.ReadObject
+        read_gateway: interfaces.ReadObject,
+        object_cache: interfaces.ObjectCache
     ) -> None:
         self._read_gateway = read_gateway
+        self._object_cache = object_cache
 
     async def __call__(self, id: str) -> Optional[ObjectDm]:
-        return await self._read_gateway.read_by_id(id)
+        if (object_dm := self._object_cache.get(id)) is not None:
+            return object_dm
+        if (object_dm := await self._read_gateway.read_by_id(id)) is not None:
+            self._object_cache.set(object_dm)
+        return object_dm
+
+
+class GetPriceHistoryInteractor:
+    def __init__(
+        self,
+        history_gateway: interfaces.ReadPriceHistory
+    ) -> None:
+        self._history_gateway = history_gateway
+
+    async def __call__(self, object_id: str) -> list[dto.PricePoint]:
+        return await self._history_gateway.read_price_history(object_id)
+
+
+class PreparePriceHistoryInteractor:
+    def __init__(
+        self,
+        partitions_gateway: interfaces.PriceHistoryPartitions,
+        db_session: interfaces.DbSession,
+        settings: dto.PriceHistorySettings
+    ) -> None:
+        self._partitions_gateway = partitions_gateway
+        self._db_session = db_session
+        self._settings = settings
+
+    async def __call__(self) -> None:
+        await self._partitions_gateway.ensure_partitions(self._settings.months_ahead)
+        await self._db_session.commit()
 
 
 class UpdateObjectInteractor:
     def __init__(
         self,
-        update_gateway: interfaces.UpdateObject,
+        upsert_gateway: interfaces.UpsertObject,
         db_session: interfaces.DbSession,
+        uuid_generator: interfaces.UUIDGenerator,
+        search_cache: interfaces.SearchCache,
+        object_cache: interfaces.ObjectCache,
+        seen_urls: interfaces.SeenUrls
     ) -> None:
-        self._update_gateway = update_gateway
+        self._upsert_gateway = upsert_gateway
         self._db_session = db_session
+        self._uuid_generator = uuid_generator
+        self._search_cache = search_cache
+        self._object_cache = object_cache
+        self._seen_urls = seen_urls
 
     async def __call__(self, data: ObjectDm, url: str) -> None:
-        await self._update_gateway.update_by_url(data, url)
+        data.url = url
+        data.id = str(self._uuid_generator())
+        data.id = await self._upsert_gateway.upsert(data)
         await self._db_session.commit()
+        self._search_cache.invalidate()
+        self._object_cache.invalidate(url)
+        self._seen_urls.add(url)
+
+
+class RefreshObjectInteractor:
+    def __init__(
+        self,
+        parser_gateway: interfaces.HttpParser,
+        data_extractor: interfaces.DataExtractor,
+        read_state_gateway: interfaces.ReadFetchState,
+        save_state_gateway: interfaces.SaveFetchState,
+        upsert_gateway: interfaces.UpsertObject,
+        deactivate_gateway: interfaces.DeactivateObject,
+        db_session: interfaces.DbSession,
+        uuid_generator: interfaces.UUIDGenerator,
+        search_cache: interfaces.SearchCache,
+        object_cache: interfaces.ObjectCache,
+        seen_urls: interfaces.SeenUrls
+    ) -> None:
+        self._parser_gateway = parser_gateway
+        self._data_extractor = data_extractor
+        self._read_state_gateway = read_state_gateway
+        self._save_state_gateway = save_state_gateway
+        self._upsert_gateway = upsert_gateway
+        self._deactivate_gateway = deactivate_gateway
+        self._db_session = db_session
+        self._uuid_generator = uuid_generator
+        self._search_cache = search_cache
+        self._object_cache = object_cache
+        self._seen_urls = seen_urls
+
+    async def __call__(
+        self,
+        request_params: dto.RequestParam,
+        cookies: Optional[dto.Cookies] = None
+    ) -> dto.FetchResult:
+        state = await self._read_state_gateway.read_fetch_state(request_params.url)
+        try:
+            fetched = await self._parser_gateway.get_data_if_changed(request_params, state, cookies)
+            if fetched.modified:
+                object_dm = await self._data_extractor.extract_data(fetched.data, request_params)
+                object_dm.id = str(self._uuid_generator())
+                await self._upsert_gateway.upsert(object_dm)
+            elif fetched.gone:
+                await self._deactivate_gateway.deactivate_by_url(request_params.url)
+        except Exception:
+            # Recorded as checked, so a failing page backs off instead of staying first in line
+            await self._db_session.rollback()
+            await self._save_state_gateway.save_fetch_failure(request_params.url)
+            await self._db_session.commit()
+            raise
+        if fetched.state is not None:
+            await self._save_state_gateway.save_fetch_state(fetched.state)
+        await self._db_session.commit()
+        if fetched.modified or fetched.gone:
+            self._search_cache.invalidate()
+            self._object_cache.invalidate(request_params.url)
+        if fetched.modified:
+            self._seen_urls.add(request_params.url)
+        return fetched
 
 
 class DeleteObjectInteractor:
@@ -54,33 +171,150 @@ class DeleteObjectInteractor:
         self,
         delete_gateway: interfaces.DeleteObject,
         db_session: interfaces.DbSession,
+        search_cache: interfaces.SearchCache,
+        object_cache: interfaces.ObjectCache
     ) -> None:
         self._delete_gateway = delete_gateway
         self._db_session = db_session
+        self._search_cache = search_cache
+        self._object_cache = object_cache
 
     async def __call__(self, url: str) -> None:
         await self._delete_gateway.delete_by_url(url)
         await self._db_session.commit()
+        self._search_cache.invalidate()
+        self._object_cache.invalidate(url)
+
+class FetchStatsInteractor:
+    def __init__(
+        self,
+        fetch_stats: interfaces.FetchStats
+    ) -> None:
+        self._fetch_stats = fetch_stats
+
+    def __call__(self) -> list[dto.HostFetchStats]:
+        return self._fetch_stats.stats()
+
+
+class ExtractionStatsInteractor:
+    def __init__(
+        self,
+        extraction_stats: interfaces.ExtractionStats
+    ) -> None:
+        self._extraction_stats = extraction_stats
+
+    def __call__(self) -> list[dto.LabelCount]:
+        return self._extraction_stats.unknown_labels()
+
 
 class FindObjectsInteractor:
     def __init__(
         self,
-        search_gateway: interfaces.FindObjects
+        search_gateway: interfaces.FindObjects,
+        search_cache: interfaces.SearchCache,
+        settings: dto.SearchSettings
+    ) -> None:
+        self._search_gateway = search_gateway
+        self._search_cache = search_cache
+        self._settings = settings
+
+    async def __call__(
+        self,
+        params: dto.DbSearchFilters,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> dto.SearchResults:
+        page = dto.SearchPage(
+            limit=min(limit or self._settings.default_page_size, self._settings.max_page_size),
+            cursor=cursor
+        )
+        if (results := self._search_cache.get(params, page)) is not None:
+            return results
+        results = await self._search_gateway.search_objects(params, page)
+        self._search_cache.set(params, page, results)
+        return results
+
+
+class FindNearbyObjectsInteractor:
+    def __init__(
+        self,
+        search_gateway: interfaces.FindNearbyObjects,
+        settings: dto.SearchSettings
     ) -> None:
         self._search_gateway = search_gateway
+        self._settings = settings
+
+    async def __call__(
+        self,
+        params: dto.DbSearchFilters,
+        area: dto.GeoSearch,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> dto.SearchResults:
+        bounds = (area.min_latitude, area.min_longitude, area.max_latitude, area.max_longitude)
+        if area.radius is not None:
+            circle = geohash.bounding_box(area.latitude, area.longitude, area.radius)
+            bounds = (
+                max(circle[0], bounds[0] if bounds[0] is not None else circle[0]),
+                max(circle[1], bounds[1] if bounds[1] is not None else circle[1]),
+                min(circle[2], bounds[2] if bounds[2] is not None else circle[2]),
+                min(circle[3], bounds[3] if bounds[3] is not None else circle[3])
+            )
+        elif None in bounds:
+            raise ValueError("Either a radius or a full bounding box is required")
+        if bounds[0] > bounds[2] or bounds[1] > bounds[3]:
+            # The radius circle does not overlap the bounding box
+            return dto.SearchResults(items=[])
+        page = dto.SearchPage(
+            limit=min(limit or self._settings.default_page_size, self._settings.max_page_size),
+            cursor=cursor
+        )
+        area = replace(
+            area,
+            min_latitude=bounds[0],
+            min_longitude=bounds[1],
+            max_latitude=bounds[2],
+            max_longitude=bounds[3]
+        )
+        return await self._search_gateway.search_nearby(params, area, page)
+
+
+class SearchCacheStatsInteractor:
+    def __init__(
+        self,
+        search_cache: interfaces.SearchCache
+    ) -> None:
+        self._search_cache = search_cache
+
+    def __call__(self) -> dto.CacheStats:
+        return self._search_cache.stats()
+
 
-    async def __call__(self, params: dto.DbSearchFilters)  -> list[Optional[SearchResultsDm]]:
-        return await self._search_gateway.search_objects(params)
+class StreamObjectsInteractor:
+    def __init__(
+        self,
+        stream_gateway: interfaces.StreamObjects,
+        settings: dto.SearchSettings
+    ) -> None:
+        self._stream_gateway = stream_gateway
+        self._settings = settings
+
+    def __call__(self, params: dto.DbSearchFilters) -> AsyncIterator[SearchResultsDm]:
+        return self._stream_gateway.stream_objects(params, self._settings.stream_batch_size)
 
 
 class DataParserInteractor:
     def __init__(
         self,
         parser_gateway: interfaces.HttpParser,
+        streaming_parser: interfaces.StreamingParser,
         data_extractor: interfaces.DataExtractor,
+        settings: dto.ParseSettings
     ) -> None:
-        self. _parser_gateway = parser_gateway
+        self._parser_gateway = parser_gateway
+        self._streaming_parser = streaming_parser
         self._data_extractor = data_extractor
+        self._settings = settings
 
     async def __call__(
         self,
@@ -88,5 +322,285 @@ class DataParserInteractor:
         cookies: Optional[dto.Cookies], 
         filters: Optional[dto.Filters]
     ) -> ObjectDm:
-        html_data = await self._parser_gateway.get_data(request_params, filters, cookies)
-        return await self._data_extractor.extract_data(html_data, request_params)
\ No newline at end of file
+        if self._settings.streaming and filters is None:
+            return await self._streaming_parser.get_object(request_params, cookies)
+        html_data = await self._parser_gateway.get_data(request_params, cookies, filters)
+        return await self._data_extractor.extract_data(html_data, request_params)
+
+
+_STOP = object()
+
+
+class BatchIngestInteractor:
+    def __init__(
+        self,
+        parser_gateway: interfaces.HttpParser,
+        data_extractor: interfaces.DataExtractor,
+        save_gateway: interfaces.SaveObjects,
+        upsert_gateway: interfaces.UpsertObject,
+        db_session: interfaces.DbSession,
+        uuid_generator: interfaces.UUIDGenerator,
+        search_cache: interfaces.SearchCache,
+        object_cache: interfaces.ObjectCache,
+        seen_urls: interfaces.SeenUrls,
+        settings: dto.IngestSettings
+    ) -> None:
+        self._parser_gateway = parser_gateway
+        self._data_extractor = data_extractor
+        self._save_gateway = save_gateway
+        self._upsert_gateway = upsert_gateway
+        self._db_session = db_session
+        self._uuid_generator = uuid_generator
+        self._search_cache = search_cache
+        self._object_cache = object_cache
+        self._seen_urls = seen_urls
+        self._settings = settings
+
+    async def __call__(self, urls: list[str]) -> list[dto.IngestResult]:
+        results = {url: dto.IngestResult(url=url) for url in urls}
+        fetch_queue: asyncio.Queue = asyncio.Queue()
+        parse_queue: asyncio.Queue = asyncio.Queue(maxsize=self._settings.queue_size)
+        persist_queue: asyncio.Queue = asyncio.Queue(maxsize=self._settings.queue_size)
+        for url in results:
+            fetch_queue.put_nowait((url, dto.RequestParam(url=url, headers=None)))
+        for _ in range(self._settings.fetch_workers):
+            fetch_queue.put_nowait(_STOP)
+        async with asyncio.TaskGroup() as group:
+            group.create_task(self._run_stage(
+                self._fetch, fetch_queue, parse_queue, results,
+                self._settings.fetch_workers, self._settings.parse_workers
+            ))
+            group.create_task(self._run_stage(
+                self._parse, parse_queue, persist_queue, results,
+                self._settings.parse_workers, 1
+            ))
+            group.create_task(self._persist_stage(persist_queue, results))
+        return list(results.values())
+
+    async def _run_stage(
+        self,
+        handler: Callable[[Any], Awaitable[Any]],
+        inbox: asyncio.Queue,
+        outbox: asyncio.Queue,
+        results: dict[str, dto.IngestResult],
+        workers: int,
+        next_workers: int
+    ) -> None:
+        async def worker() -> None:
+            while (item := await inbox.get()) is not _STOP:
+                url, payload = item
+                try:
+                    output = await handler(payload)
+                except Exception as e:
+                    results[url].error = f"{type(e).__name__}: {e}"
+                    continue
+                await outbox.put((url, output))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        for _ in range(next_workers):
+            await outbox.put(_STOP)
+
+    async def _fetch(self, request_params: dto.RequestParam) -> tuple[str, dto.RequestParam]:
+        html_data = await self._parser_gateway.get_data(request_params, None, None)
+        return html_data, request_params
+
+    async def _parse(self, payload: tuple[str, dto.RequestParam]) -> ObjectDm:
+        return await self._data_extractor.extract_data(*payload)
+
+    async def _persist_stage(
+        self,
+        inbox: asyncio.Queue,
+        results: dict[str, dto.IngestResult]
+    ) -> None:
+        stopped = False
+        while not stopped:
+            batch = [await inbox.get()]
+            while len(batch) < self._settings.persist_batch_size and not inbox.empty():
+                batch.append(inbox.get_nowait())
+            if _STOP in batch:
+                batch.remove(_STOP)
+                stopped = True
+            if batch:
+                await self._persist(batch, results)
+
+    async def _persist(
+        self,
+        batch: list[tuple[str, ObjectDm]],
+        results: dict[str, dto.IngestResult]
+    ) -> None:
+        for _, object_dm in batch:
+            object_dm.id = str(self._uuid_generator())
+        try:
+            inserted = await self._save_gateway.save_many([object_dm for _, object_dm in batch])
+            for _, object_dm in batch:
+                if object_dm.url in inserted:
+                    object_dm.id = inserted[object_dm.url]
+                else:
+                    # Stored since it was queued, e.g. through POST /
+                    object_dm.id = await self._upsert_gateway.upsert(object_dm)
+            await self._db_session.commit()
+            self._search_cache.invalidate()
+        except Exception as e:
+            await self._db_session.rollback()
+            if len(batch) > 1:
+                for item in batch:
+                    await self._persist([item], results)
+            else:
+                url, _ = batch[0]
+                results[url].error = f"{type(e).__name__}: {e}"
+            return
+        for url, object_dm in batch:
+            results[url].id = object_dm.id
+            self._object_cache.invalidate(object_dm.url)
+            self._seen_urls.add(object_dm.url)
+
+
+class FindStaleObjectsInteractor:
+    def __init__(
+        self,
+        stale_gateway: interfaces.FindStaleObjects,
+        settings: dto.RecrawlSettings
+    ) -> None:
+        self._stale_gateway = stale_gateway
+        self._settings = settings
+
+    async def __call__(self) -> list[str]:
+        return await self._stale_gateway.find_stale_urls(
+            self._settings.batch_size,
+            self._settings.min_age
+        )
+
+
+class DiscoverListingsInteractor:
+    def __init__(
+        self,
+        parser_gateway: interfaces.HttpParser,
+        link_extractor: interfaces.LinkExtractor,
+        seen_urls: interfaces.SeenUrls,
+        urls_gateway: interfaces.ReadObjectUrls,
+        ingest_interactor: BatchIngestInteractor,
+        settings: dto.DiscoverySettings
+    ) -> None:
+        self._parser_gateway = parser_gateway
+        self._link_extractor = link_extractor
+        self._seen_urls = seen_urls
+        self._urls_gateway = urls_gateway
+        self._ingest_interactor = ingest_interactor
+        self._settings = settings
+
+    async def __call__(
+        self,
+        filters: Optional[dto.Filters],
+        cookies: Optional[dto.Cookies] = None,
+        max_pages: Optional[int] = None
+    ) -> dto.DiscoveryResult:
+        result = dto.DiscoveryResult(pages=0, found=0, ingested=[])
+        queued: set[str] = set()
+        for page in range(1, min(max_pages or self._settings.max_pages, self._settings.max_pages) + 1):
+            request_params = dto.RequestParam(
+                url=self._settings.search_url.format(page=page),
+                headers=None
+            )
+            html_data = await self._parser_gateway.get_data(request_params, cookies, filters)
+            links = await self._link_extractor.extract_links(
+                html_data, request_params, self._settings.link_pattern
+            )
+            if not links:
+                break
+            result.pages += 1
+            result.found += len(links)
+            candidates = [url for url in links if url not in queued]
+            # The filter can return false positives, so a hit is only skipped once the DB confirms it
+            maybe_seen = [url for url in candidates if self._seen_urls.contains(url)]
+            stored = await self._urls_gateway.read_stored_urls(maybe_seen) if maybe_seen else set()
+            new_urls = [url for url in candidates if url not in stored]
+            queued.update(new_urls)
+            if not new_urls:
+                continue
+            result.ingested.extend(await self._ingest_interactor(new_urls))
+        return result
+
+
+class RefreshAnalyticsInteractor:
+    def __init__(
+        self,
+        changes_gateway: interfaces.StreamChangedObjects,
+        analytics: interfaces.MarketAnalytics,
+        settings: dto.AnalyticsSettings
+    ) -> None:
+        self._changes_gateway = changes_gateway
+        self._analytics = analytics
+        self._settings = settings
+
+    async def __call__(self) -> int:
+        since = self._analytics.watermark()
+        if since is not None:
+            # Rows committed late keep the timestamp of their transaction start
+            since -= timedelta(seconds=self._settings.lag)
+        batch: list[dto.ObjectFacts] = []
+        applied = 0
+        async for facts in self._changes_gateway.stream_changed(since, self._settings.batch_size):
+            batch.append(facts)
+            if len(batch) >= self._settings.batch_size:
+                self._analytics.apply(batch)
+                applied += len(batch)
+                batch = []
+        self._analytics.apply(batch)
+        return applied + len(batch)
+
+
+class MarketAggregateInteractor:
+    def __init__(
+        self,
+        analytics: interfaces.MarketAnalytics
+    ) -> None:
+        self._analytics = analytics
+
+    def __call__(self, query: dto.AggregateQuery) -> list[dto.AggregateGroup]:
+        return self._analytics.aggregate(query)
+
+
+class MarketHistogramInteractor:
+    def __init__(
+        self,
+        analytics: interfaces.MarketAnalytics
+    ) -> None:
+        self._analytics = analytics
+
+    def __call__(self, query: dto.HistogramQuery) -> dto.Histogram:
+        return self._analytics.histogram(query)
+
+
+class AnalyticsStatsInteractor:
+    def __init__(
+        self,
+        analytics: interfaces.MarketAnalytics
+    ) -> None:
+        self._analytics = analytics
+
+    def __call__(self) -> dto.AnalyticsStats:
+        return self._analytics.stats()
+
+
+class MarketStatsInteractor:
+    def __init__(
+        self,
+        stats_gateway: interfaces.ReadMarketStats
+    ) -> None:
+        self._stats_gateway = stats_gateway
+
+    async def __call__(self, query: dto.MarketStatsQuery) -> list[dto.MarketStat]:
+        return await self._stats_gateway.read_market_stats(query)
+
+
+class RefreshMarketStatsInteractor:
+    def __init__(
+        self,
+        stats_gateway: interfaces.RefreshMarketStats,
+        db_session: interfaces.DbSession
+    ) -> None:
+        self._stats_gateway = stats_gateway
+        self._db_session = db_session
+
+    async def __call__(self) -> None:
+        await self._stats_gateway.refresh_market_stats()
+        await self._db_session.commit()
\ No newline at end of file
@@ -1,30 +1,71 @@
 # -*- coding: utf-8 -*-
 
-from typing import Protocol, Optional
+from datetime import datetime
+from typing import AsyncIterator, Iterator, Protocol, Optional
 from abc import abstractmethod
 from uuid import UUID
 
 from app.src.domain import entities 
-from app.src.application.dto import DbSearchFilters, RequestParam, Cookies, Filters
+from app.src.application.dto import (
+    DbSearchFilters,
+    GeoSearch,
+    RequestParam,
+    Cookies,
+    Filters,
+    SearchPage,
+    SearchResults,
+    CacheStats,
+    FetchState,
+    FetchResult,
+    HostFetchStats,
+    LabelCount,
+    ObjectFacts,
+    AggregateQuery,
+    AggregateGroup,
+    HistogramQuery,
+    Histogram,
+    AnalyticsStats,
+    PricePoint,
+    MarketStatsQuery,
+    MarketStat
+)
 
-class HttpParser(Protocol):
+class DataExtractor(Protocol):
 
     @abstractmethod
-    async def get_data(self, url: str) -> str:
+    async def extract_data(self, data: str, request_params: RequestParam) -> entities.ObjectDm:
         ...
 
 
-class DataExtractor(Protocol):
+class LinkExtractor(Protocol):
 
     @abstractmethod
-    async def extract_data(self, data: str, request_params: RequestParam) -> entities.ObjectDm:
+    async def extract_links(self, data: str, request_params: RequestParam, pattern: str) -> list[str]:
         ...
 
 
-class SaveObject(Protocol):
+class ExtractionStats(Protocol):
 
     @abstractmethod
-    async def save(self, object: entities.ObjectDm) -> None:
+    def unknown_labels(self) -> list[LabelCount]:
+        ...
+
+
+class SaveObjects(Protocol):
+
+    @abstractmethod
+    async def save_many(self, objects: list[entities.ObjectDm]) -> dict[str, str]:
+        ...
+
+
+class ReadObjectUrls(Protocol):
+
+    @abstractmethod
+    def iter_urls(self) -> AsyncIterator[str]:
+        ...
+
+    @abstractmethod
+    async def read_stored_urls(self, urls: list[str]) -> set[str]:
         ...
 
 
@@ -35,10 +76,10 @@ class ReadObject(Protocol):
         ...
 
 
-class UpdateObject(Protocol):
+class UpsertObject(Protocol):
 
     @abstractmethod
-    async def update_by_url(self, data: entities.ObjectDm, url: str) -> None:
+    async def upsert(self, object: entities.ObjectDm) -> str:
         ...
 
 
@@ -49,10 +90,42 @@ class DeleteObject(Protocol):
         ...
 
 
+class DeactivateObject(Protocol):
+
+    @abstractmethod
+    async def deactivate_by_url(self, url: str) -> None:
+        ...
+
+
+class FindStaleObjects(Protocol):
+
+    @abstractmethod
+    async def find_stale_urls(self, limit: int, min_age: float) -> list[str]:
+        ...
+
+
 class FindObjects(Protocol):
 
     @abstractmethod
-    async def search_objects(self, object: DbSearchFilters) -> list[Optional[entities.SearchResultsDm]]:
+    async def search_objects(self, filters: DbSearchFilters, page: SearchPage) -> SearchResults:
+        ...
+
+
+class FindNearbyObjects(Protocol):
+
+    @abstractmethod
+    async def search_nearby(self, filters: DbSearchFilters, area: GeoSearch, page: SearchPage) -> SearchResults:
+        ...
+
+
+class StreamObjects(Protocol):
+
+    @abstractmethod
+    def stream_objects(
+        self,
+        filters: DbSearchFilters,
+        batch_size: int
+    ) -> AsyncIterator[entities.SearchResultsDm]:
         ...
 
 
@@ -67,6 +140,173 @@ class HttpParser(Protocol):
     ) -> str:
         ...
 
+    @abstractmethod
+    async def get_data_if_changed(
+        self,
+        request_params: RequestParam,
+        state: Optional[FetchState],
+        cookies: Optional[Cookies]
+    ) -> FetchResult:
+        ...
+
+
+class StreamingParser(Protocol):
+
+    @abstractmethod
+    async def get_object(
+        self,
+        request_params: RequestParam,
+        cookies: Optional[Cookies]
+    ) -> entities.ObjectDm:
+        ...
+
+
+class PageArchive(Protocol):
+
+    @abstractmethod
+    def put(self, url: str, body: bytes, fetched_at: Optional[float] = None) -> str:
+        ...
+
+    @abstractmethod
+    def get(self, url: str, at: Optional[float] = None) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def iter_pages(self, latest: bool = False) -> Iterator[tuple[str, float, bytes]]:
+        ...
+
+    @abstractmethod
+    def close(self) -> None:
+        ...
+
+
+class FetchStats(Protocol):
+
+    @abstractmethod
+    def stats(self) -> list[HostFetchStats]:
+        ...
+
+
+class ReadFetchState(Protocol):
+
+    @abstractmethod
+    async def read_fetch_state(self, url: str) -> Optional[FetchState]:
+        ...
+
+
+class SaveFetchState(Protocol):
+
+    @abstractmethod
+    async def save_fetch_state(self, state: FetchState) -> None:
+        ...
+
+    @abstractmethod
+    async def save_fetch_failure(self, url: str) -> None:
+        ...
+
+
+class SearchCache(Protocol):
+
+    @abstractmethod
+    def get(self, filters: DbSearchFilters, page: SearchPage) -> Optional[SearchResults]:
+        ...
+
+    @abstractmethod
+    def set(self, filters: DbSearchFilters, page: SearchPage, results: SearchResults) -> None:
+        ...
+
+    @abstractmethod
+    def invalidate(self) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> CacheStats:
+        ...
+
+
+class ObjectCache(Protocol):
+
+    @abstractmethod
+    def get(self, id: str) -> Optional[entities.ObjectDm]:
+        ...
+
+    @abstractmethod
+    def set(self, object_dm: entities.ObjectDm) -> None:
+        ...
+
+    @abstractmethod
+    def invalidate(self, url: str) -> None:
+        ...
+
+
+class ReadPriceHistory(Protocol):
+
+    @abstractmethod
+    async def read_price_history(self, object_id: str) -> list[PricePoint]:
+        ...
+
+
+class PriceHistoryPartitions(Protocol):
+
+    @abstractmethod
+    async def ensure_partitions(self, months_ahead: int) -> None:
+        ...
+
+
+class ReadMarketStats(Protocol):
+
+    @abstractmethod
+    async def read_market_stats(self, query: MarketStatsQuery) -> list[MarketStat]:
+        ...
+
+
+class RefreshMarketStats(Protocol):
+
+    @abstractmethod
+    async def refresh_market_stats(self) -> None:
+        ...
+
+
+class StreamChangedObjects(Protocol):
+
+    @abstractmethod
+    def stream_changed(self, since: Optional[datetime], batch_size: int) -> AsyncIterator[ObjectFacts]:
+        ...
+
+
+class MarketAnalytics(Protocol):
+
+    @abstractmethod
+    def watermark(self) -> Optional[datetime]:
+        ...
+
+    @abstractmethod
+    def apply(self, rows: list[ObjectFacts]) -> None:
+        ...
+
+    @abstractmethod
+    def aggregate(self, query: AggregateQuery) -> list[AggregateGroup]:
+        ...
+
+    @abstractmethod
+    def histogram(self, query: HistogramQuery) -> Histogram:
+        ...
+
+    @abstractmethod
+    def stats(self) -> AnalyticsStats:
+        ...
+
+
+class SeenUrls(Protocol):
+
+    @abstractmethod
+    def contains(self, url: str) -> bool:
+        ...
+
+    @abstractmethod
+    def add(self, url: str) -> None:
+        ...
+
 
 class DbSession(Protocol):
 
@@ -78,6 +318,10 @@ class DbSession(Protocol):
     async def flush(self) -> None:
         ...
 
+    @abstractmethod
+    async def rollback(self) -> None:
+        ...
+
 
 class UUIDGenerator(Protocol):
     def __call__(self) -> UUID:
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Offline re-extraction of listing pages into the database.
+
+Usage:
+    python -m app.src.cli --jsonl pages.jsonl [--workers N] [--batch-size N] [--dry-run]
+    python -m app.src.cli --archive ARCHIVE_DIRECTORY [--all-versions] ...
+
+JSONL records are objects with a "url" and an optional "html" field;
+records without "html" are fetched first.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterable, Iterator, Optional
+from uuid import uuid4
+
+from dishka import AsyncContainer, Provider, Scope, make_async_container, provide
+
+from app.src.config import Config, ExtractorConfig
+from app.src.application import dto
+from app.src.application import interfaces
+from app.src.domain.entities import ObjectDm
+from app.src.infrastructure.executors import ExtractionExecutor
+from app.src.infrastructure.extractor_gateway import configure_extractor, extract_object_with_labels
+from app.src.infrastructure.page_archive import PageArchive
+from app.src.ioc import AppProvider
+
+
+@dataclass(slots=True)
+class StageStats:
+    ok: int = 0
+    failed: int = 0
+    errors: dict[str, int] = field(default_factory=dict)
+
+    def fail(self, error: Exception) -> None:
+        self.failed += 1
+        name = type(error).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+
+async def read_jsonl(path: str, stats: StageStats) -> AsyncIterator[tuple[str, Optional[str]]]:
+    with open(path, encoding='utf-8') as source:
+        for line in source:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                url, html_data = record['url'], record.get('html')
+            except (json.JSONDecodeError, KeyError, TypeError) as e:
+                stats.fail(e)
+                continue
+            yield url, html_data
+
+
+def _next_page(pages: Iterator[tuple[str, float, bytes]]) -> Optional[tuple[str, str]]:
+    for url, _, body in pages:
+        return url, body.decode('utf-8', errors='replace')
+    return None
+
+
+async def read_archive(directory: str, latest: bool) -> AsyncIterator[tuple[str, Optional[str]]]:
+    # Index queries, mmap reads and decompression all block, so they run off the event loop
+    archive = await asyncio.to_thread(PageArchive, directory)
+    try:
+        pages = archive.iter_pages(latest=latest)
+        while (page := await asyncio.to_thread(_next_page, pages)) is not None:
+            yield page
+    finally:
+        await asyncio.to_thread(archive.close)
+
+
+class CliProvider(Provider):
+    # One worker pool, sized by --workers, serves both the replay and the gateways that fetch pages
+
+    def __init__(self, workers: int) -> None:
+        super().__init__()
+        self._workers = workers
+
+    @provide(scope=Scope.APP)
+    def get_extraction_executor(
+        self,
+        config: Config
+    ) -> Iterable[ExtractionExecutor]:
+        executor = ExtractionExecutor(
+            ExtractorConfig(EXTRACTOR_MODE='process', EXTRACTOR_WORKERS=self._workers),
+            configure_extractor,
+            (config.extractor_config.selectors_path,)
+        )
+        yield executor
+        executor.shutdown()
+
+
+class Replay:
+    def __init__(self, container: AsyncContainer, executor: ExtractionExecutor, args: argparse.Namespace) -> None:
+        self._container = container
+        self._executor = executor
+        self._args = args
+        self._in_flight = asyncio.Semaphore(2 * args.workers)
+        self._persist_queue: asyncio.Queue = asyncio.Queue(maxsize=4 * args.batch_size)
+        self.stats = {stage: StageStats() for stage in ('read', 'fetch', 'extract', 'persist')}
+        self.unknown_labels: Counter[str] = Counter()
+
+    async def run(self, source: AsyncIterator[tuple[str, Optional[str]]]) -> None:
+        # A failing persist stage cancels the producers instead of leaving them blocked on the queue
+        async with asyncio.TaskGroup() as group:
+            group.create_task(self._persist_stage())
+            async with asyncio.TaskGroup() as extractors:
+                async for url, html_data in source:
+                    self.stats['read'].ok += 1
+                    await self._in_flight.acquire()
+                    extractors.create_task(self._extract(url, html_data))
+            await self._persist_queue.put(None)
+
+    async def _extract(self, url: str, html_data: Optional[str]) -> None:
+        try:
+            if html_data is None:
+                html_data = await self._fetch(url)
+                if html_data is None:
+                    return
+            try:
+                object_dm, unknown_labels = await self._executor.run(
+                    extract_object_with_labels, html_data, url
+                )
+            except Exception as e:
+                self.stats['extract'].fail(e)
+                return
+            self.unknown_labels.update(unknown_labels)
+            self.stats['extract'].ok += 1
+            if not self._args.dry_run:
+                await self._persist_queue.put(object_dm)
+        finally:
+            self._in_flight.release()
+
+    async def _fetch(self, url: str) -> Optional[str]:
+        try:
+            async with self._container() as request_container:
+                parser = await request_container.get(interfaces.HttpParser)
+                html_data = await parser.get_data(dto.RequestParam(url=url, headers=None), None, None)
+        except Exception as e:
+            self.stats['fetch'].fail(e)
+            return None
+        self.stats['fetch'].ok += 1
+        return html_data
+
+    async def _persist_stage(self) -> None:
+        stopped = False
+        while not stopped:
+            batch = [await self._persist_queue.get()]
+            while len(batch) < self._args.batch_size and not self._persist_queue.empty():
+                batch.append(self._persist_queue.get_nowait())
+            if None in batch:
+                batch.remove(None)
+                stopped = True
+            if batch:
+                await self._persist(batch)
+
+    async def _persist(self, batch: list[ObjectDm]) -> None:
+        for object_dm in batch:
+            object_dm.id = str(uuid4())
+        async with self._container() as request_container:
+            db_session = await request_container.get(interfaces.DbSession)
+            try:
+                save_gateway = await request_container.get(interfaces.SaveObjects)
+                inserted = await save_gateway.save_many(batch)
+                await db_session.commit()
+                self.stats['persist'].ok += len(inserted)
+            except Exception:
+                await db_session.rollback()
+                inserted = {}
+            upsert_gateway = await request_container.get(interfaces.UpsertObject)
+            for object_dm in batch:
+                if object_dm.url in inserted:
+                    continue
+                try:
+                    await upsert_gateway.upsert(object_dm)
+                    await db_session.commit()
+                    self.stats['persist'].ok += 1
+                except Exception as e:
+                    await db_session.rollback()
+                    self.stats['persist'].fail(e)
+
+
+def report(stats: dict[str, StageStats], unknown_labels: Counter[str], elapsed: float) -> None:
+    print(f"elapsed: {elapsed:.1f}s")
+    for stage, stage_stats in stats.items():
+        if stage_stats.ok or stage_stats.failed:
+            print(
+                f"{stage:8} ok={stage_stats.ok:<8} failed={stage_stats.failed:<6} "
+                f"{stage_stats.ok / elapsed:10.1f}/s {stage_stats.errors or ''}"
+            )
+    if unknown_labels:
+        print("unknown labels:")
+        for label, count in unknown_labels.most_common():
+            print(f"  {count:<8} {label}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    config = Config()
+    container = make_async_container(AppProvider(), CliProvider(args.workers), context={Config: config})
+    try:
+        replay = Replay(container, await container.get(ExtractionExecutor), args)
+        if args.jsonl:
+            source = read_jsonl(args.jsonl, replay.stats['read'])
+        else:
+            source = read_archive(args.archive, latest=not args.all_versions)
+        started = time.perf_counter()
+        await replay.run(source)
+    finally:
+        await container.close()
+    report(replay.stats, replay.unknown_labels, time.perf_counter() - started)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Re-extract listing pages into the database")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--jsonl', help="JSONL file of {\"url\", \"html\"} records")
+    source.add_argument('--archive', help="Page archive directory")
+    parser.add_argument('--all-versions', action='store_true', help="Replay every archived fetch, not only the latest")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--dry-run', action='store_true', help="Extract only, do not write to the database")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    asyncio.run(main(parse_args()))
@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
 
+import logging
 from os import environ as env
+from typing import Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+
+logger = logging.getLogger(__name__)
 
 
 class AppConfig(BaseModel):
@@ -25,7 +30,118 @@ class DbConfig(BaseModel):
     database: str = Field(alias='DB_DB')
 
 
+class ExtractorConfig(BaseModel):
+    mode: Literal['inline', 'thread', 'process'] = Field(default='process', alias='EXTRACTOR_MODE')
+    workers: Optional[int] = Field(default=None, alias='EXTRACTOR_WORKERS')
+    selectors_path: Optional[str] = Field(default=None, alias='EXTRACTOR_SELECTORS')
+
+
+class HttpClientConfig(BaseModel):
+    limit: int = Field(default=100, alias='HTTP_POOL_LIMIT')
+    limit_per_host: int = Field(default=10, alias='HTTP_POOL_LIMIT_PER_HOST')
+    keepalive_timeout: float = Field(default=30, alias='HTTP_KEEPALIVE_TIMEOUT')
+    dns_cache_ttl: int = Field(default=300, alias='HTTP_DNS_CACHE_TTL')
+    total_timeout: float = Field(default=30, alias='HTTP_TOTAL_TIMEOUT')
+    connect_timeout: float = Field(default=10, alias='HTTP_CONNECT_TIMEOUT')
+
+
+class FetchConfig(BaseModel):
+    initial_rate: float = Field(default=2, alias='FETCH_INITIAL_RATE')
+    min_rate: float = Field(default=0.2, alias='FETCH_MIN_RATE')
+    max_rate: float = Field(default=20, alias='FETCH_MAX_RATE')
+    burst: int = Field(default=5, alias='FETCH_BURST')
+    initial_concurrency: int = Field(default=2, alias='FETCH_INITIAL_CONCURRENCY')
+    max_concurrency: int = Field(default=10, alias='FETCH_MAX_CONCURRENCY')
+    max_retries: int = Field(default=4, alias='FETCH_MAX_RETRIES')
+    backoff_base: float = Field(default=0.5, alias='FETCH_BACKOFF_BASE')
+    backoff_max: float = Field(default=30, alias='FETCH_BACKOFF_MAX')
+    streaming: bool = Field(
+        default=False,
+        alias='FETCH_STREAMING',
+        description="Parse listing pages while they download; needs EXTRACTOR_MODE thread or inline, "
+                    "process mode fetches whole pages instead"
+    )
+
+
+class ArchiveConfig(BaseModel):
+    directory: Optional[str] = Field(default=None, alias='ARCHIVE_DIRECTORY')
+    codec: Literal['gzip', 'zstd'] = Field(default='gzip', alias='ARCHIVE_CODEC')
+    segment_size: int = Field(default=256 * 1024 * 1024, alias='ARCHIVE_SEGMENT_SIZE')
+
+
+class IngestConfig(BaseModel):
+    fetch_workers: int = Field(default=16, alias='INGEST_FETCH_WORKERS')
+    parse_workers: int = Field(default=4, alias='INGEST_PARSE_WORKERS')
+    queue_size: int = Field(default=64, alias='INGEST_QUEUE_SIZE')
+    persist_batch_size: int = Field(default=100, alias='INGEST_PERSIST_BATCH_SIZE')
+
+
+class SearchConfig(BaseModel):
+    default_page_size: int = Field(default=50, alias='SEARCH_DEFAULT_PAGE_SIZE')
+    max_page_size: int = Field(default=500, alias='SEARCH_MAX_PAGE_SIZE')
+    stream_batch_size: int = Field(default=1000, alias='SEARCH_STREAM_BATCH_SIZE')
+    cache_size: int = Field(default=1024, alias='SEARCH_CACHE_SIZE')
+    cache_ttl: float = Field(default=60, alias='SEARCH_CACHE_TTL')
+
+
+class ObjectCacheConfig(BaseModel):
+    size: int = Field(default=10000, alias='OBJECT_CACHE_SIZE')
+    ttl: float = Field(default=300, alias='OBJECT_CACHE_TTL')
+
+
+class RecrawlConfig(BaseModel):
+    enabled: bool = Field(default=False, alias='RECRAWL_ENABLED')
+    interval: float = Field(default=60, alias='RECRAWL_INTERVAL')
+    batch_size: int = Field(default=100, alias='RECRAWL_BATCH_SIZE')
+    concurrency: int = Field(default=4, alias='RECRAWL_CONCURRENCY')
+    min_age: float = Field(default=3600, alias='RECRAWL_MIN_AGE')
+
+
+class AnalyticsConfig(BaseModel):
+    enabled: bool = Field(default=False, alias='ANALYTICS_ENABLED')
+    interval: float = Field(default=60, alias='ANALYTICS_INTERVAL')
+    batch_size: int = Field(default=10000, alias='ANALYTICS_BATCH_SIZE')
+    lag: float = Field(default=300, alias='ANALYTICS_LAG')
+
+
+class MarketStatsConfig(BaseModel):
+    enabled: bool = Field(default=False, alias='MARKET_STATS_ENABLED')
+    interval: float = Field(default=600, alias='MARKET_STATS_INTERVAL')
+
+
+class PriceHistoryConfig(BaseModel):
+    interval: float = Field(default=86400, alias='PRICE_HISTORY_PARTITION_INTERVAL')
+    months_ahead: int = Field(default=2, alias='PRICE_HISTORY_MONTHS_AHEAD')
+
+
+class DiscoveryConfig(BaseModel):
+    search_url: str = Field(default='https://realt.by/sale/flats/?page={page}', alias='DISCOVERY_SEARCH_URL')
+    link_pattern: str = Field(default=r'realt\.by/sale-flats/object/\d+/?$', alias='DISCOVERY_LINK_PATTERN')
+    max_pages: int = Field(default=50, alias='DISCOVERY_MAX_PAGES')
+    bloom_capacity: int = Field(default=1_000_000, alias='DISCOVERY_BLOOM_CAPACITY')
+    bloom_error_rate: float = Field(default=0.001, alias='DISCOVERY_BLOOM_ERROR_RATE')
+
+
 class Config(BaseModel):
     app_config: AppConfig = Field(default_factory=lambda: AppConfig(**env))
     static_config: AppStaticConfig = Field(default_factory=lambda: AppStaticConfig(**env))
-    db_config: DbConfig = Field(default_factory=lambda: DbConfig(**env))
\ No newline at end of file
+    db_config: DbConfig = Field(default_factory=lambda: DbConfig(**env))
+    extractor_config: ExtractorConfig = Field(default_factory=lambda: ExtractorConfig(**env))
+    http_client_config: HttpClientConfig = Field(default_factory=lambda: HttpClientConfig(**env))
+    ingest_config: IngestConfig = Field(default_factory=lambda: IngestConfig(**env))
+    search_config: SearchConfig = Field(default_factory=lambda: SearchConfig(**env))
+    object_cache_config: ObjectCacheConfig = Field(default_factory=lambda: ObjectCacheConfig(**env))
+    recrawl_config: RecrawlConfig = Field(default_factory=lambda: RecrawlConfig(**env))
+    analytics_config: AnalyticsConfig = Field(default_factory=lambda: AnalyticsConfig(**env))
+    market_stats_config: MarketStatsConfig = Field(default_factory=lambda: MarketStatsConfig(**env))
+    price_history_config: PriceHistoryConfig = Field(default_factory=lambda: PriceHistoryConfig(**env))
+    discovery_config: DiscoveryConfig = Field(default_factory=lambda: DiscoveryConfig(**env))
+    fetch_config: FetchConfig = Field(default_factory=lambda: FetchConfig(**env))
+    archive_config: ArchiveConfig = Field(default_factory=lambda: ArchiveConfig(**env))
+
+    @model_validator(mode='after')
+    def check_streaming(self) -> 'Config':
+        # Worker processes cannot share a parser with the event loop, so streaming falls back to whole pages
+        if self.fetch_config.streaming and self.extractor_config.mode == 'process':
+            logger.warning("FETCH_STREAMING has no effect with EXTRACTOR_MODE=process, pages are fetched whole")
+        return self
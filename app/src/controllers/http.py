@@ -1,32 +1,171 @@
 # -*- coding: utf-8 -*-
 
 import traceback
-from typing import Annotated, Optional, Any
+from dataclasses import asdict, replace
+from typing import Annotated, AsyncIterator, Literal, Optional, Any
 from uuid import UUID
 from http import HTTPStatus
 from decimal import Decimal
 
 from dishka.integrations.base import FromDishka as Depends
 from dishka.integrations.fastapi import inject
-from fastapi import APIRouter, FastAPI, Query, Path, Response
+from fastapi import APIRouter, FastAPI, Query, Path, Header, Response
+from fastapi import Depends as Dependency
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import HTTPException
 from fastapi.openapi.docs import get_swagger_ui_html
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 
 from app.src.application.interactors import (
     GetObjectInteractor,
     FindObjectsInteractor,
+    FindNearbyObjectsInteractor,
+    StreamObjectsInteractor,
     DataParserInteractor,
     SaveObjectInteractor,
     UpdateObjectInteractor,
-    DeleteObjectInteractor
+    RefreshObjectInteractor,
+    DeleteObjectInteractor,
+    BatchIngestInteractor,
+    SearchCacheStatsInteractor,
+    DiscoverListingsInteractor,
+    FetchStatsInteractor,
+    ExtractionStatsInteractor,
+    MarketAggregateInteractor,
+    MarketHistogramInteractor,
+    AnalyticsStatsInteractor,
+    GetPriceHistoryInteractor,
+    MarketStatsInteractor
 )
 from app.src.application import dto
 from app.src.config import AppConfig
-from app.src.controllers.schemas import ObjectSchema, SearchObjectSchema
+from app.src.controllers.schemas import (
+    ObjectSchema,
+    SearchObjectSchema,
+    BatchIngestSchema,
+    IngestResultSchema,
+    DiscoverySchema,
+    DiscoveryResultSchema
+)
 from app.src.application.dto import DbSearchFilters
 
 
+def search_filters(
+    min_price_usd: Annotated[Optional[int], Query(description="Min object price", title="Min object price")] = None,
+    max_price_usd: Annotated[Optional[int], Query(description="Max object price", title="Max object price")] = None,
+    min_year_of_build: Annotated[Optional[int], Query(description="Min year of build", title="Min year of build")] = None,
+    max_year_of_build: Annotated[Optional[int], Query(description="Max year of build", title="Max year of build")] = None,
+    min_floor: Annotated[Optional[int], Query(description="Min floor", title="Min floor")] = None,
+    max_floor: Annotated[Optional[int], Query(description="Max floor", title="Max floor")] = None,
+    min_area: Annotated[Optional[Decimal], Query(description="Min total area", title="Min total area")] = None,
+    max_area: Annotated[Optional[Decimal], Query(description="Max total area", title="Max total area")] = None,
+    min_living_area: Annotated[Optional[Decimal], Query(description="Min living area", title="Min living area")] = None,
+    max_living_area: Annotated[Optional[Decimal], Query(description="Max living area", title="Max living area")] = None,
+    min_kitchen_area: Annotated[Optional[Decimal], Query(description="Min kitchen area", title="Min kitchen area")] = None,
+    max_kitchen_area: Annotated[Optional[Decimal], Query(description="Max kitchen area", title="Max kitchen area")] = None,
+    active: Annotated[Optional[bool], Query(description="Only active (true) or inactive (false) listings", title="Active")] = None,
+    build_type: Annotated[Optional[str], Query(description="Build type", title="Build type")] = None,
+    year_of_build: Annotated[Optional[int], Query(description="Year of build", title="Year of build")] = None,
+    floor: Annotated[Optional[int], Query(description="Floor", title="Floor")] = None,
+    floors_numb: Annotated[Optional[int], Query(description="Number of floors", title="Number of floors")] = None,
+    rooms: Annotated[Optional[int], Query(description="Number of rooms", title="Number of rooms")] = None,
+    separated_rooms: Annotated[Optional[int], Query(description="Number of separated rooms", title="Number of separated rooms")] = None,
+    all_separated_rooms: Annotated[Optional[bool], Query(description="All rooms are separated", title="All rooms are separated")] = None,
+    area: Annotated[Optional[Decimal], Query(description="Total area", title="Total area")] = None,
+    living_area: Annotated[Optional[Decimal], Query(description="Living area", title="Living area")] = None,
+    kitchen_area: Annotated[Optional[Decimal], Query(description="Kitchen area", title="Kitchen area")] = None,
+    repair: Annotated[Optional[str], Query(description="Repair type", title="Repair type")] = None,
+    balcony: Annotated[Optional[str], Query(description="Balcony type", title="Balcony type")] = None,
+    number_balcony: Annotated[Optional[str], Query(description="Number of balconies", title="Number of balconies")] = None,
+    bath: Annotated[Optional[str], Query(description="Bath type", title="Bath type")] = None,
+    region: Annotated[Optional[str], Query(description="Region", title="Region")] = None,
+    city: Annotated[Optional[str], Query(description="City", title="City")] = None,
+    street: Annotated[Optional[str], Query(description="Street", title="Street")] = None,
+    house_number: Annotated[Optional[str], Query(description="House number", title="House number")] = None,
+    city_region: Annotated[Optional[str], Query(description="City region", title="City region")] = None,
+    micro_region: Annotated[Optional[str], Query(description="Micro region", title="Micro region")] = None,
+    q: Annotated[Optional[str], Query(min_length=1, description="Full-text query over title and description", title="Text query")] = None
+) -> DbSearchFilters:
+    filters = DbSearchFilters(
+        min_price_usd=min_price_usd,
+        max_price_usd=max_price_usd,
+        min_year_of_build=min_year_of_build,
+        max_year_of_build=max_year_of_build,
+        min_floor=min_floor,
+        max_floor=max_floor,
+        min_area=min_area,
+        max_area=max_area,
+        min_living_area=min_living_area,
+        max_living_area=max_living_area,
+        min_kitchen_area=min_kitchen_area,
+        max_kitchen_area=max_kitchen_area,
+        active=active,
+        build_type=build_type,
+        year_of_build=year_of_build,
+        floor=floor,
+        floors_numb=floors_numb,
+        rooms=rooms,
+        separated_rooms=separated_rooms,
+        all_separated_rooms=all_separated_rooms,
+        area=area,
+        living_area=living_area,
+        kitchen_area=kitchen_area,
+        repair=repair,
+        balcony=balcony,
+        number_balcony=number_balcony,
+        bath=bath,
+        region=region,
+        city=city,
+        street=street,
+        house_number=house_number,
+        city_region=city_region,
+        micro_region=micro_region,
+        q=q,
+    )
+    # Normalised once here, so the search cache key and the query see the same values
+    return replace(filters, **{
+        name: value.strip() or None
+        for name, value in asdict(filters).items()
+        if isinstance(value, str)
+    })
+
+
+MarketStatsGroup = Literal['city', 'city_region', 'rooms', 'build_type']
+AnalyticsMetric = Literal['price_usd', 'price_m2', 'area']
+AnalyticsGroup = Literal['city', 'city_region', 'micro_region', 'build_type', 'repair', 'rooms', 'year_of_build']
+
+
+def analytics_filters(
+    city: Annotated[Optional[str], Query(description="City", title="City")] = None,
+    city_region: Annotated[Optional[str], Query(description="City region", title="City region")] = None,
+    micro_region: Annotated[Optional[str], Query(description="Micro region", title="Micro region")] = None,
+    build_type: Annotated[Optional[str], Query(description="Build type", title="Build type")] = None,
+    repair: Annotated[Optional[str], Query(description="Repair type", title="Repair type")] = None,
+    rooms: Annotated[Optional[int], Query(description="Number of rooms", title="Number of rooms")] = None,
+    year_of_build: Annotated[Optional[int], Query(description="Year of build", title="Year of build")] = None
+) -> dict[str, Any]:
+    filters = {
+        "city": city,
+        "city_region": city_region,
+        "micro_region": micro_region,
+        "build_type": build_type,
+        "repair": repair,
+        "rooms": rooms,
+        "year_of_build": year_of_build,
+    }
+    return {name: value for name, value in filters.items() if value is not None}
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison: W/ prefixes are ignored
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag.removeprefix("W/")
+        for candidate in if_none_match.split(",")
+    )
+
+
 class Controllers:
     def __init__(self):
         self.router = APIRouter()
@@ -34,8 +173,21 @@ class Controllers:
 
     def setup_routes(self):
         self.router.add_api_route("/{object_id:uuid}", self.get_object, methods=["GET"])
+        self.router.add_api_route("/{object_id:uuid}/prices", self.get_price_history, methods=["GET"])
         self.router.add_api_route("/search", self.search_objects, methods=["GET"])
+        self.router.add_api_route("/search/geo", self.search_nearby_objects, methods=["GET"])
+        self.router.add_api_route("/search/stream", self.stream_objects, methods=["GET"])
+        self.router.add_api_route("/search/cache", self.search_cache_stats, methods=["GET"])
+        self.router.add_api_route("/fetcher", self.fetcher_stats, methods=["GET"])
+        self.router.add_api_route("/extractor/labels", self.extractor_labels, methods=["GET"])
+        self.router.add_api_route("/analytics", self.analytics_stats, methods=["GET"])
+        self.router.add_api_route("/analytics/aggregate", self.analytics_aggregate, methods=["GET"])
+        self.router.add_api_route("/analytics/histogram", self.analytics_histogram, methods=["GET"])
+        self.router.add_api_route("/market/stats", self.market_stats, methods=["GET"])
         self.router.add_api_route("/", self.save_object, methods=["POST"])
+        self.router.add_api_route("/batch", self.save_objects, methods=["POST"])
+        self.router.add_api_route("/discover", self.discover_objects, methods=["POST"])
+        self.router.add_api_route("/", self.update_object, methods=["PUT"])
         self.router.add_api_route("/swagger", self.custom_swagger_ui_html, include_in_schema=False, methods=["GET"])
 
     @inject
@@ -43,18 +195,39 @@ class Controllers:
         self,
         object_id: Annotated[UUID, Path(description="Object ID", title="Object ID")],
         interactor: Depends[GetObjectInteractor],
-    ) -> JSONResponse:
+        if_none_match: Annotated[Optional[str], Header(description="ETag held by the client")] = None,
+    ) -> Response:
         try:
             object_dm = await interactor(id=str(object_id))
             if not object_dm:
                 raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Object not found")
-            return JSONResponse(ObjectSchema.from_dataclass(object_dm).model_dump_json(), status_code=200)
+            etag = f'"{object_dm.id}-{object_dm.version}"'
+            if if_none_match and etag_matches(if_none_match, etag):
+                return Response(status_code=HTTPStatus.NOT_MODIFIED, headers={"ETag": etag})
+            return JSONResponse(
+                ObjectSchema.from_dataclass(object_dm).model_dump_json(),
+                status_code=200,
+                headers={"ETag": etag}
+            )
         except Exception as e:
             error_message = f"Exception occurred: {str(e)}"
             traceback_message = "".join(traceback.format_exception(None, e, e.__traceback__))
             full_error_message = f"{error_message}, Traceback:{traceback_message}"
             return JSONResponse(full_error_message, status_code=400)
 
+    @inject
+    async def get_price_history(
+        self,
+        object_id: Annotated[UUID, Path(description="Object ID", title="Object ID")],
+        interactor: Depends[GetPriceHistoryInteractor]
+    ) -> JSONResponse:
+        try:
+            history = await interactor(str(object_id))
+        except Exception as e:
+            error_message = f"Exception occurred: {str(e)}"
+            return JSONResponse(error_message, status_code=400)
+        return JSONResponse(jsonable_encoder([asdict(point) for point in history]), status_code=200)
+
     @inject
     async def save_object(
         self,
@@ -73,16 +246,56 @@ class Controllers:
             return JSONResponse(error_message, status_code=400)
         return JSONResponse("Success", status_code=200)
 
+    @inject
+    async def save_objects(
+        self,
+        body: BatchIngestSchema,
+        ingest_interactor: Depends[BatchIngestInteractor]
+    ) -> JSONResponse:
+        try:
+            results = await ingest_interactor(body.urls)
+        except Exception as e:
+            error_message = f"Exception occurred: {str(e)}"
+            return JSONResponse(error_message, status_code=400)
+        return JSONResponse(
+            [IngestResultSchema.from_dataclass(result).model_dump() for result in results],
+            status_code=200
+        )
+
+    @inject
+    async def discover_objects(
+        self,
+        body: DiscoverySchema,
+        discover_interactor: Depends[DiscoverListingsInteractor]
+    ) -> JSONResponse:
+        try:
+            filters = dto.Filters(agency=body.agency, address=body.address)
+            result = await discover_interactor(filters, None, body.max_pages)
+        except Exception as e:
+            error_message = f"Exception occurred: {str(e)}"
+            return JSONResponse(error_message, status_code=400)
+        return JSONResponse(DiscoveryResultSchema.from_dataclass(result).model_dump(), status_code=200)
+
     @inject
     async def update_object(
         self,
         url: Annotated[str, Query(description="Url of object", title="Url of object")],
         parser_interactor: Depends[DataParserInteractor],
-        update_interactor: Depends[UpdateObjectInteractor]
+        update_interactor: Depends[UpdateObjectInteractor],
+        refresh_interactor: Depends[RefreshObjectInteractor],
+        force: Annotated[bool, Query(description="Re-parse even if the page is unchanged", title="Force")] = False
     ) -> JSONResponse:
         try:
-            data = await parser_interactor(url)
-            await update_interactor(data, url)
+            request_params = dto.RequestParam(url=url, headers=None)
+            if force:
+                data = await parser_interactor(request_params, None, None)
+                await update_interactor(data, url)
+            else:
+                fetched = await refresh_interactor(request_params)
+                if fetched.gone:
+                    return JSONResponse("Gone", status_code=200)
+                if not fetched.modified:
+                    return JSONResponse("Not modified", status_code=200)
         except Exception as e:
             error_message = f"Exception occurred: {str(e)}"
             traceback_message = "".join(traceback.format_exception(None, e, e.__traceback__))
@@ -109,65 +322,173 @@ class Controllers:
     async def search_objects(
         self,
         search_interactor: Depends[FindObjectsInteractor],
-        min_price_usd: Annotated[Optional[int], Query(description="Min object price", title="Min object price")] = None,
-        max_price_usd: Annotated[Optional[int], Query(description="Max object price", title="Max object price")] = None,
-        build_type: Annotated[Optional[str], Query(description="Build type", title="Build type")] = None,
-        year_of_build: Annotated[Optional[int], Query(description="Year of build", title="Year of build")] = None,
-        floor: Annotated[Optional[int], Query(description="Floor", title="Floor")] = None,
-        floors_numb: Annotated[Optional[int], Query(description="Number of floors", title="Number of floors")] = None,
-        rooms: Annotated[Optional[int], Query(description="Number of rooms", title="Number of rooms")] = None,
-        separated_rooms: Annotated[Optional[int], Query(description="Number of separated rooms", title="Number of separated rooms")] = None,
-        all_separated_rooms: Annotated[Optional[bool], Query(description="All rooms are separated", title="All rooms are separated")] = None,
-        area: Annotated[Optional[Decimal], Query(description="Total area", title="Total area")] = None,
-        living_area: Annotated[Optional[Decimal], Query(description="Living area", title="Living area")] = None,
-        kitchen_area: Annotated[Optional[Decimal], Query(description="Kitchen area", title="Kitchen area")] = None,
-        repair: Annotated[Optional[str], Query(description="Repair type", title="Repair type")] = None,
-        balcony: Annotated[Optional[str], Query(description="Balcony type", title="Balcony type")] = None,
-        number_balcony: Annotated[Optional[str], Query(description="Number of balconies", title="Number of balconies")] = None,
-        bath: Annotated[Optional[str], Query(description="Bath type", title="Bath type")] = None,
-        region: Annotated[Optional[str], Query(description="Region", title="Region")] = None,
-        city: Annotated[Optional[str], Query(description="City", title="City")] = None,
-        street: Annotated[Optional[str], Query(description="Street", title="Street")] = None,
-        house_number: Annotated[Optional[str], Query(description="House number", title="House number")] = None,
-        city_region: Annotated[Optional[str], Query(description="City region", title="City region")] = None,
-        micro_region: Annotated[Optional[str], Query(description="Micro region", title="Micro region")] = None
+        filters: Annotated[DbSearchFilters, Dependency(search_filters)],
+        limit: Annotated[Optional[int], Query(gt=0, description="Page size", title="Page size")] = None,
+        cursor: Annotated[Optional[str], Query(description="Cursor of the next page", title="Cursor")] = None
+    ) -> JSONResponse:
+        try:
+            page = await search_interactor(filters, limit, cursor)
+            result = {
+                "items": [SearchObjectSchema.from_dataclass(object_dm).model_dump() for object_dm in page.items],
+                "next_cursor": page.next_cursor
+            }
+            return JSONResponse(result, status_code=200)
+        except Exception as e:
+            error_message = f"Exception occurred: {str(e)}"
+            traceback_message = "".join(traceback.format_exception(None, e, e.__traceback__))
+            full_error_message = f"{error_message}\n\nTraceback:\n{traceback_message}"
+            return JSONResponse(full_error_message, status_code=400)
+
+    @inject
+    async def search_nearby_objects(
+        self,
+        search_interactor: Depends[FindNearbyObjectsInteractor],
+        filters: Annotated[DbSearchFilters, Dependency(search_filters)],
+        latitude: Annotated[Optional[float], Query(ge=-90, le=90, description="Latitude of the center point", title="Latitude")] = None,
+        longitude: Annotated[Optional[float], Query(ge=-180, le=180, description="Longitude of the center point", title="Longitude")] = None,
+        radius: Annotated[Optional[float], Query(gt=0, description="Search radius in meters", title="Radius")] = None,
+        min_latitude: Annotated[Optional[float], Query(ge=-90, le=90, description="South edge of the bounding box", title="Min latitude")] = None,
+        min_longitude: Annotated[Optional[float], Query(ge=-180, le=180, description="West edge of the bounding box", title="Min longitude")] = None,
+        max_latitude: Annotated[Optional[float], Query(ge=-90, le=90, description="North edge of the bounding box", title="Max latitude")] = None,
+        max_longitude: Annotated[Optional[float], Query(ge=-180, le=180, description="East edge of the bounding box", title="Max longitude")] = None,
+        limit: Annotated[Optional[int], Query(gt=0, description="Page size", title="Page size")] = None,
+        cursor: Annotated[Optional[str], Query(description="Cursor of the next page", title="Cursor")] = None
     ) -> JSONResponse:
+        for low, high, name in ((min_latitude, max_latitude, "latitude"), (min_longitude, max_longitude, "longitude")):
+            if low is not None and high is not None and low > high:
+                return JSONResponse(f"min_{name} must not be greater than max_{name}", status_code=400)
         try:
-            filters = DbSearchFilters(
-                min_price_usd=min_price_usd,
-                max_price_usd=max_price_usd,
-                build_type=build_type,
-                year_of_build=year_of_build,
-                floor=floor,
-                floors_numb=floors_numb,
-                rooms=rooms,
-                separated_rooms=separated_rooms,
-                all_separated_rooms=all_separated_rooms,
-                area=area,
-                living_area=living_area,
-                kitchen_area=kitchen_area,
-                repair=repair,
-                balcony=balcony,
-                number_balcony=number_balcony,
-                bath=bath,
-                region=region,
-                city=city,
-                street=street,
-                house_number=house_number,
-                city_region=city_region,
-                micro_region=micro_region,
+            if latitude is None or longitude is None:
+                if None in (min_latitude, min_longitude, max_latitude, max_longitude) or radius is not None:
+                    raise ValueError("A radius search needs latitude and longitude")
+                latitude = (min_latitude + max_latitude) / 2
+                longitude = (min_longitude + max_longitude) / 2
+            area = dto.GeoSearch(
+                latitude=latitude,
+                longitude=longitude,
+                radius=radius,
+                min_latitude=min_latitude,
+                min_longitude=min_longitude,
+                max_latitude=max_latitude,
+                max_longitude=max_longitude
             )
-            object_dms = await search_interactor(filters)
-            if object_dms:
-                result = [SearchObjectSchema.from_dataclass(object_dm).model_dump() for object_dm in object_dms]
-                return JSONResponse(result, status_code=200)
-            raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Objects not found")
+            page = await search_interactor(filters, area, limit, cursor)
+            result = {
+                "items": [SearchObjectSchema.from_dataclass(object_dm).model_dump() for object_dm in page.items],
+                "next_cursor": page.next_cursor
+            }
+            return JSONResponse(result, status_code=200)
         except Exception as e:
             error_message = f"Exception occurred: {str(e)}"
             traceback_message = "".join(traceback.format_exception(None, e, e.__traceback__))
             full_error_message = f"{error_message}\n\nTraceback:\n{traceback_message}"
             return JSONResponse(full_error_message, status_code=400)
 
+    @inject
+    async def stream_objects(
+        self,
+        stream_interactor: Depends[StreamObjectsInteractor],
+        filters: Annotated[DbSearchFilters, Dependency(search_filters)]
+    ) -> StreamingResponse:
+        async def rows() -> AsyncIterator[str]:
+            async for object_dm in stream_interactor(filters):
+                yield SearchObjectSchema.from_dataclass(object_dm).model_dump_json() + "\n"
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    @inject
+    async def search_cache_stats(
+        self,
+        stats_interactor: Depends[SearchCacheStatsInteractor]
+    ) -> JSONResponse:
+        return JSONResponse(asdict(stats_interactor()), status_code=200)
+
+    @inject
+    async def fetcher_stats(
+        self,
+        stats_interactor: Depends[FetchStatsInteractor]
+    ) -> JSONResponse:
+        return JSONResponse([asdict(host_stats) for host_stats in stats_interactor()], status_code=200)
+
+    @inject
+    async def extractor_labels(
+        self,
+        stats_interactor: Depends[ExtractionStatsInteractor]
+    ) -> JSONResponse:
+        return JSONResponse([asdict(label) for label in stats_interactor()], status_code=200)
+
+    @inject
+    async def analytics_stats(
+        self,
+        stats_interactor: Depends[AnalyticsStatsInteractor]
+    ) -> JSONResponse:
+        return JSONResponse(jsonable_encoder(asdict(stats_interactor())), status_code=200)
+
+    @inject
+    async def analytics_aggregate(
+        self,
+        aggregate_interactor: Depends[MarketAggregateInteractor],
+        filters: Annotated[dict[str, Any], Dependency(analytics_filters)],
+        metric: Annotated[AnalyticsMetric, Query(description="Aggregated column", title="Metric")] = 'price_m2',
+        group_by: Annotated[list[AnalyticsGroup], Query(description="Grouping columns", title="Group by")] = [],
+        percentiles: Annotated[list[float], Query(description="Percentiles from 0 to 100", title="Percentiles")] = [50]
+    ) -> JSONResponse:
+        try:
+            if any(not 0 <= percentile <= 100 for percentile in percentiles):
+                raise ValueError("Percentiles must be between 0 and 100")
+            query = dto.AggregateQuery(
+                metric=metric,
+                group_by=tuple(dict.fromkeys(group_by)),
+                percentiles=tuple(percentiles),
+                filters=filters
+            )
+            groups = aggregate_interactor(query)
+        except Exception as e:
+            error_message = f"Exception occurred: {str(e)}"
+            return JSONResponse(error_message, status_code=400)
+        return JSONResponse([asdict(group) for group in groups], status_code=200)
+
+    @inject
+    async def analytics_histogram(
+        self,
+        histogram_interactor: Depends[MarketHistogramInteractor],
+        filters: Annotated[dict[str, Any], Dependency(analytics_filters)],
+        metric: Annotated[AnalyticsMetric, Query(description="Histogram column", title="Metric")] = 'price_usd',
+        bins: Annotated[int, Query(gt=0, le=1000, description="Number of bins", title="Bins")] = 20
+    ) -> JSONResponse:
+        try:
+            histogram = histogram_interactor(dto.HistogramQuery(metric=metric, bins=bins, filters=filters))
+        except Exception as e:
+            error_message = f"Exception occurred: {str(e)}"
+            return JSONResponse(error_message, status_code=400)
+        return JSONResponse(asdict(histogram), status_code=200)
+
+    @inject
+    async def market_stats(
+        self,
+        stats_interactor: Depends[MarketStatsInteractor],
+        group_by: Annotated[list[MarketStatsGroup], Query(description="Grouping columns", title="Group by")] = [],
+        city: Annotated[Optional[str], Query(description="City", title="City")] = None,
+        city_region: Annotated[Optional[str], Query(description="City region", title="City region")] = None,
+        rooms: Annotated[Optional[int], Query(description="Number of rooms", title="Number of rooms")] = None,
+        build_type: Annotated[Optional[str], Query(description="Build type", title="Build type")] = None
+    ) -> JSONResponse:
+        try:
+            filters = {
+                "city": city,
+                "city_region": city_region,
+                "rooms": rooms,
+                "build_type": build_type,
+            }
+            query = dto.MarketStatsQuery(
+                group_by=tuple(dict.fromkeys(group_by)),
+                filters={name: value for name, value in filters.items() if value is not None}
+            )
+            stats = await stats_interactor(query)
+        except Exception as e:
+            error_message = f"Exception occurred: {str(e)}"
+            return JSONResponse(error_message, status_code=400)
+        return JSONResponse(jsonable_encoder([asdict(stat) for stat in stats]), status_code=200)
+
     @inject
     async def custom_swagger_ui_html(self, config: Depends[AppConfig]) -> HTMLResponse:
         return get_swagger_ui_html(
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import contextlib
+import logging
+from typing import Any, Optional
+
+from dishka import AsyncContainer
+
+from app.src.application import dto
+from app.src.application.interactors import (
+    FindStaleObjectsInteractor,
+    RefreshObjectInteractor,
+    RefreshAnalyticsInteractor,
+    RefreshMarketStatsInteractor,
+    PreparePriceHistoryInteractor
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    failure_message = "Periodic task failed"
+
+    def __init__(self, container: AsyncContainer, interval: float) -> None:
+        self._container = container
+        self._interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def run_once(self) -> Any:
+        raise NotImplementedError
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception(self.failure_message)
+            await asyncio.sleep(self._interval)
+
+
+class RecrawlScheduler(PeriodicTask):
+    failure_message = "Recrawl run failed"
+
+    def __init__(self, container: AsyncContainer, settings: dto.RecrawlSettings) -> None:
+        super().__init__(container, settings.interval)
+        self._budget = asyncio.Semaphore(settings.concurrency)
+
+    async def run_once(self) -> list[dto.FetchResult]:
+        async with self._container() as request_container:
+            find_stale = await request_container.get(FindStaleObjectsInteractor)
+            urls = await find_stale()
+        results = await asyncio.gather(
+            *(self._refresh(url) for url in urls),
+            return_exceptions=True
+        )
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                logger.warning("Refresh of %s failed: %r", url, result)
+        return [result for result in results if isinstance(result, dto.FetchResult)]
+
+    async def _refresh(self, url: str) -> dto.FetchResult:
+        async with self._budget, self._container() as request_container:
+            refresh = await request_container.get(RefreshObjectInteractor)
+            return await refresh(dto.RequestParam(url=url, headers=None))
+
+
+class AnalyticsRefresher(PeriodicTask):
+    failure_message = "Analytics refresh failed"
+
+    def __init__(self, container: AsyncContainer, settings: dto.AnalyticsSettings) -> None:
+        super().__init__(container, settings.interval)
+
+    async def run_once(self) -> int:
+        async with self._container() as request_container:
+            refresh = await request_container.get(RefreshAnalyticsInteractor)
+            return await refresh()
+
+
+class MarketStatsRefresher(PeriodicTask):
+    failure_message = "Market stats refresh failed"
+
+    def __init__(self, container: AsyncContainer, settings: dto.MarketStatsSettings) -> None:
+        super().__init__(container, settings.interval)
+
+    async def run_once(self) -> None:
+        async with self._container() as request_container:
+            refresh = await request_container.get(RefreshMarketStatsInteractor)
+            await refresh()
+
+
+class PriceHistoryPartitioner(PeriodicTask):
+    failure_message = "Price history partitioning failed"
+
+    def __init__(self, container: AsyncContainer, settings: dto.PriceHistorySettings) -> None:
+        super().__init__(container, settings.interval)
+
+    async def run_once(self) -> None:
+        async with self._container() as request_container:
+            prepare = await request_container.get(PreparePriceHistoryInteractor)
+            await prepare()
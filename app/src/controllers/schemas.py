@@ -8,6 +8,7 @@ from uuid import UUID
 from pydantic import BaseModel, ValidationInfo, field_validator
 
 from app.src.domain.entities import ObjectDm, SearchResultsDm
+from app.src.application.dto import IngestResult, DiscoveryResult
 
 
 class LocationSchema(BaseModel):
@@ -49,6 +50,7 @@ class ObjectBaseSchema(BaseModel):
     id: Optional[str] = None
     url: Optional[str] = None
     title: Optional[str] = None
+    version: Optional[int] = None
 
 class ObjectSchema(
     ObjectBaseSchema, 
@@ -81,6 +83,8 @@ class SearchObjectSchema(BaseModel):
     kitchen_area: float 
     floor: int 
     floors_numb: int
+    distance: Optional[float] = None
+    rank: Optional[float] = None
 
     @field_validator('area', 'living_area', 'kitchen_area', mode='wrap')
     def validate_fields(cls, value: Any, info: ValidationInfo) -> float:
@@ -95,3 +99,33 @@ class SearchObjectSchema(BaseModel):
         if isinstance(data_dict['id'], UUID):
             data_dict['id'] = str(data_dict['id'])
         return cls(**data_dict)
+
+
+class BatchIngestSchema(BaseModel):
+    urls: list[str]
+
+
+class IngestResultSchema(BaseModel):
+    url: str
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+    @classmethod
+    def from_dataclass(cls, data: 'IngestResult') -> 'IngestResultSchema':
+        return cls(**asdict(data))
+
+
+class DiscoverySchema(BaseModel):
+    agency: Optional[str] = None
+    address: Optional[str] = None
+    max_pages: Optional[int] = None
+
+
+class DiscoveryResultSchema(BaseModel):
+    pages: int
+    found: int
+    ingested: list[IngestResultSchema]
+
+    @classmethod
+    def from_dataclass(cls, data: 'DiscoveryResult') -> 'DiscoveryResultSchema':
+        return cls(**asdict(data))
@@ -4,6 +4,8 @@ from typing import Optional, List
 from decimal import Decimal
 from dataclasses import dataclass, field
 
+from app.src.domain import geohash
+
 @dataclass(slots=True)
 class Address:
     region: str
@@ -79,6 +81,13 @@ class ObjectDm:
     pictures: List[Optional[str]] = field(default_factory=[])
     id: Optional[str] = field(default=None)
     url: Optional[str] = field(default=None)
+    version: Optional[int] = field(default=None)
+
+    @property
+    def geohash(self) -> Optional[str]:
+        if self.latitude is None or self.longitude is None:
+            return None
+        return geohash.encode(self.latitude, self.longitude)
 
 
 @dataclass
@@ -95,3 +104,5 @@ class SearchResultsDm:
     kitchen_area: Decimal 
     floor: int 
     floors_numb: int
+    distance: Optional[float] = None
+    rank: Optional[float] = None
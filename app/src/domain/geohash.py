@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import math
+from decimal import Decimal
+from typing import Union
+
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+PRECISION = 9
+EARTH_RADIUS = 6371008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+
+Number = Union[float, Decimal]
+
+
+def encode(latitude: Number, longitude: Number, precision: int = PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        bounds, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def bounding_box(latitude: float, longitude: float, radius: float) -> tuple[float, float, float, float]:
+    lat_delta = radius / METERS_PER_DEGREE
+    lon_delta = radius / (METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6))
+    return (
+        max(latitude - lat_delta, -90.0),
+        max(longitude - lon_delta, -180.0),
+        min(latitude + lat_delta, 90.0),
+        min(longitude + lon_delta, 180.0)
+    )
+
+
+def cover(
+    min_latitude: float,
+    min_longitude: float,
+    max_latitude: float,
+    max_longitude: float,
+    max_cells: int = 16
+) -> list[str]:
+    """Smallest set of geohash prefixes, at most ``max_cells`` long, covering the box.
+
+    An empty box (min above max) is covered by no cells at all.
+    """
+    if min_latitude > max_latitude or min_longitude > max_longitude:
+        return []
+    for precision in range(PRECISION, 0, -1):
+        lat_step, lon_step = cell_size(precision)
+        rows = math.floor((max_latitude + 90) / lat_step) - math.floor((min_latitude + 90) / lat_step) + 1
+        columns = math.floor((max_longitude + 180) / lon_step) - math.floor((min_longitude + 180) / lon_step) + 1
+        if rows * columns > max_cells:
+            continue
+        first_row = math.floor((min_latitude + 90) / lat_step)
+        first_column = math.floor((min_longitude + 180) / lon_step)
+        return sorted({
+            encode(
+                min((first_row + row + 0.5) * lat_step - 90, 90.0),
+                min((first_column + column + 0.5) * lon_step - 180, 180.0),
+                precision
+            )
+            for row in range(rows)
+            for column in range(columns)
+        })
+    return ['']
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime, timezone
+from typing import Any, Hashable, Optional
+
+import numpy as np
+
+from app.src.application import interfaces
+from app.src.application import dto
+
+
+GROUP_COLUMNS: tuple[str, ...] = (
+    "city",
+    "city_region",
+    "micro_region",
+    "build_type",
+    "repair",
+    "rooms",
+    "year_of_build",
+)
+
+METRIC_COLUMNS: tuple[str, ...] = (
+    "price_usd",
+    "price_m2",
+    "area",
+)
+
+
+class _Dictionary:
+
+    def __init__(self) -> None:
+        self.values: list[Hashable] = []
+        self._codes: dict[Hashable, int] = {}
+
+    def encode(self, value: Hashable) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: Hashable) -> Optional[int]:
+        return self._codes.get(value)
+
+
+class ColumnarSnapshot(interfaces.MarketAnalytics):
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._size = 0
+        self._rows: dict[str, int] = {}
+        self._live = np.zeros(capacity, dtype=bool)
+        self._dictionaries = {name: _Dictionary() for name in GROUP_COLUMNS}
+        self._codes = {name: np.zeros(capacity, dtype=np.int32) for name in GROUP_COLUMNS}
+        self._metrics = {name: np.full(capacity, np.nan) for name in METRIC_COLUMNS}
+        self._watermark: Optional[datetime] = None
+        self._refreshed_at: Optional[datetime] = None
+
+    def watermark(self) -> Optional[datetime]:
+        return self._watermark
+
+    def apply(self, rows: list[dto.ObjectFacts]) -> None:
+        for facts in rows:
+            row = self._rows.get(facts.id)
+            if row is None:
+                if not facts.active:
+                    continue
+                row = self._append(facts.id)
+            self._live[row] = facts.active
+            for name in GROUP_COLUMNS:
+                self._codes[name][row] = self._dictionaries[name].encode(getattr(facts, name))
+            for name in METRIC_COLUMNS:
+                value = getattr(facts, name)
+                self._metrics[name][row] = np.nan if value is None else float(value)
+            if self._watermark is None or facts.updated_at > self._watermark:
+                self._watermark = facts.updated_at
+        if self._size > 1024 and np.count_nonzero(self._live[:self._size]) < self._size // 2:
+            self._compact()
+        self._refreshed_at = datetime.now(timezone.utc)
+
+    def aggregate(self, query: dto.AggregateQuery) -> list[dto.AggregateGroup]:
+        values, selected = self._select(query.metric, query.filters)
+        if values.size == 0:
+            return []
+        if query.group_by:
+            keys = np.stack([self._codes[name][:self._size][selected] for name in query.group_by], axis=1)
+            unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+        else:
+            unique_keys = np.zeros((1, 0), dtype=np.int32)
+            inverse = np.zeros(values.size, dtype=np.intp)
+        counts = np.bincount(inverse, minlength=len(unique_keys))
+        sums = np.bincount(inverse, weights=values, minlength=len(unique_keys))
+        order = np.argsort(inverse, kind='stable')
+        groups = np.split(values[order], np.cumsum(counts)[:-1])
+        percentiles = np.asarray(query.percentiles, dtype=float)
+        result = []
+        for key, count, total, group in zip(unique_keys, counts, sums, groups):
+            quantiles = np.percentile(group, percentiles) if percentiles.size else ()
+            result.append(dto.AggregateGroup(
+                key={
+                    name: self._dictionaries[name].values[code]
+                    for name, code in zip(query.group_by, key)
+                },
+                count=int(count),
+                mean=float(total / count),
+                min=float(group.min()),
+                max=float(group.max()),
+                percentiles={
+                    f"p{percentile:g}": float(value)
+                    for percentile, value in zip(query.percentiles, quantiles)
+                }
+            ))
+        return result
+
+    def histogram(self, query: dto.HistogramQuery) -> dto.Histogram:
+        values, _ = self._select(query.metric, query.filters)
+        if values.size == 0:
+            return dto.Histogram(edges=[], counts=[])
+        counts, edges = np.histogram(values, bins=query.bins)
+        return dto.Histogram(edges=edges.tolist(), counts=counts.tolist())
+
+    def stats(self) -> dto.AnalyticsStats:
+        return dto.AnalyticsStats(
+            rows=self._size,
+            live=int(np.count_nonzero(self._live[:self._size])),
+            watermark=self._watermark,
+            refreshed_at=self._refreshed_at
+        )
+
+    def _select(self, metric: str, filters: dict[str, Any]) -> tuple[np.ndarray, np.ndarray]:
+        values = self._metrics[metric][:self._size]
+        mask = self._live[:self._size] & ~np.isnan(values)
+        for name, value in filters.items():
+            code = self._dictionaries[name].lookup(value)
+            if code is None:
+                return np.empty(0), np.zeros(self._size, dtype=bool)
+            mask &= self._codes[name][:self._size] == code
+        return values[mask], mask
+
+    def _append(self, id: str) -> int:
+        if self._size == len(self._live):
+            self._resize(2 * len(self._live))
+        row = self._size
+        self._rows[id] = row
+        self._size += 1
+        return row
+
+    def _resize(self, capacity: int) -> None:
+        self._live = _resized(self._live, capacity, False)
+        self._codes = {name: _resized(codes, capacity, 0) for name, codes in self._codes.items()}
+        self._metrics = {name: _resized(values, capacity, np.nan) for name, values in self._metrics.items()}
+
+    def _compact(self) -> None:
+        keep = np.flatnonzero(self._live[:self._size])
+        ids = [None] * self._size
+        for id, row in self._rows.items():
+            ids[row] = id
+        capacity = max(1024, 2 * len(keep))
+        self._live = _resized(self._live[keep], capacity, False)
+        self._codes = {name: _resized(codes[keep], capacity, 0) for name, codes in self._codes.items()}
+        self._metrics = {name: _resized(values[keep], capacity, np.nan) for name, values in self._metrics.items()}
+        self._rows = {ids[row]: new_row for new_row, row in enumerate(keep)}
+        self._size = len(keep)
+
+
+def _resized(array: np.ndarray, capacity: int, fill: Any) -> np.ndarray:
+    resized = np.full(capacity, fill, dtype=array.dtype)
+    resized[:min(len(array), capacity)] = array[:capacity]
+    return resized
\ No newline at end of file
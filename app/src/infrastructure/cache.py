@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Generic, Hashable, Optional, TypeVar
+
+from app.src.application import interfaces
+from app.src.application import dto
+from app.src.domain.entities import ObjectDm
+
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class TTLCache(Generic[K, V]):
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] >= time.monotonic()
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: K, value: V) -> None:
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dto.CacheStats:
+        return dto.CacheStats(hits=self.hits, misses=self.misses, size=len(self._entries))
+
+
+class SearchCache(interfaces.SearchCache):
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._cache: TTLCache[tuple, dto.SearchResults] = TTLCache(maxsize, ttl)
+
+    def get(self, filters: dto.DbSearchFilters, page: dto.SearchPage) -> Optional[dto.SearchResults]:
+        return self._cache.get(self._key(filters, page))
+
+    def set(self, filters: dto.DbSearchFilters, page: dto.SearchPage, results: dto.SearchResults) -> None:
+        self._cache.set(self._key(filters, page), results)
+
+    def invalidate(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dto.CacheStats:
+        return self._cache.stats()
+
+    def _key(self, filters: dto.DbSearchFilters, page: dto.SearchPage) -> tuple:
+        conditions = tuple(sorted(
+            (name, value)
+            for name, value in asdict(filters).items()
+            if value is not None
+        ))
+        return conditions, page.limit, page.cursor
+
+
+class ObjectCache(interfaces.ObjectCache):
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._cache: TTLCache[str, ObjectDm] = TTLCache(maxsize, ttl)
+        self._ids_by_url: dict[str, str] = {}
+
+    def get(self, id: str) -> Optional[ObjectDm]:
+        return self._cache.get(id)
+
+    def set(self, object_dm: ObjectDm) -> None:
+        self._cache.set(object_dm.id, object_dm)
+        self._ids_by_url[object_dm.url] = object_dm.id
+        if len(self._ids_by_url) > 2 * len(self._cache):
+            self._ids_by_url = {
+                url: id for url, id in self._ids_by_url.items()
+                if id in self._cache
+            }
+
+    def invalidate(self, url: str) -> None:
+        if (id := self._ids_by_url.pop(url, None)) is not None:
+            self._cache.pop(id)
+
+    def stats(self) -> dto.CacheStats:
+        return self._cache.stats()
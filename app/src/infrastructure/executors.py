@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from app.src.config import ExtractorConfig
+
+
+T = TypeVar('T')
+
+
+def new_executor(
+    config: ExtractorConfig,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: tuple = ()
+) -> Optional[Executor]:
+    if config.mode == 'thread':
+        return ThreadPoolExecutor(
+            max_workers=config.workers,
+            thread_name_prefix='extractor',
+            initializer=initializer,
+            initargs=initargs
+        )
+    if config.mode == 'process':
+        return ProcessPoolExecutor(
+            max_workers=config.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=initializer,
+            initargs=initargs
+        )
+    return None
+
+
+class ExtractionExecutor:
+
+    def __init__(
+        self,
+        config: ExtractorConfig,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: tuple = ()
+    ) -> None:
+        if initializer is not None and config.mode != 'process':
+            initializer(*initargs)
+            initializer, initargs = None, ()
+        self._executor = new_executor(config, initializer, initargs)
+
+    @property
+    def isolated(self) -> bool:
+        # Work submitted to worker processes cannot share objects with the caller
+        return isinstance(self._executor, ProcessPoolExecutor)
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        if self._executor is None:
+            return func(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
@@ -1,24 +1,56 @@
 # -*- coding: utf-8 -*-
 
-import contextlib
-from typing import Optional
 import asyncio
+import contextlib
+import hashlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
 import re
 from decimal import Decimal
+from urllib.parse import urljoin
 
-from transliterate import translit
-from bs4 import BeautifulSoup
-from aiohttp import ClientSession
+from lxml import etree, html
+from lxml.html import HtmlElement
+from aiohttp import ClientConnectionError, ClientResponse, ClientSession
+from multidict import CIMultiDictProxy
 
 from app.src.application import interfaces
 from app.src.application import dto
 from app.src.domain import entities
+from app.src.infrastructure.executors import ExtractionExecutor
+from app.src.infrastructure.rate_limit import FetchThrottle, parse_retry_after
+from app.src.infrastructure.realt_labels import UNKNOWN_LABELS, collect_unknown_labels, convert_labels
+from app.src.infrastructure.realt_selectors import SelectorPlan, load_selector_plan
+
+
+@dataclass(slots=True)
+class _Page:
+    status: int
+    headers: CIMultiDictProxy[str]
+    body: bytes
+    encoding: str
+
+    def text(self) -> str:
+        return self.body.decode(self.encoding, errors="replace")
 
 
-class HttpParserGateway(interfaces.HttpParser):
+class HttpParserGateway(
+    interfaces.HttpParser,
+    interfaces.StreamingParser
+):
 
-    def __init__(self, request_session: ClientSession) -> None:
+    def __init__(
+            self,
+            request_session: ClientSession,
+            throttle: FetchThrottle,
+            archive: interfaces.PageArchive,
+            executor: ExtractionExecutor
+        ) -> None:
         self._request_session = request_session
+        self._throttle = throttle
+        self._archive = archive
+        self._executor = executor
 
     async def get_data(
             self,
@@ -28,32 +60,267 @@ class HttpParserGateway(interfaces.HttpParser):
         ) -> str:
         with contextlib.suppress(Exception):
             cookies = cookies.to_dict()
-        async with self._request_session.get(
+        with contextlib.suppress(Exception):
+            filters = filters.to_dict()
+        page = await self._fetch(
             url=request_params.url,
             headers=request_params.headers or None, 
-            cookies = cookies or None
-        ) as response:
-            if response.status == 200:
-                return await response.text()
+            cookies = cookies or None,
+            params=filters or None
+        )
+        return page.text()
+
+    async def get_data_if_changed(
+            self,
+            request_params: dto.RequestParam,
+            state: Optional[dto.FetchState],
+            cookies: Optional[dto.Cookies]
+        ) -> dto.FetchResult:
+        with contextlib.suppress(Exception):
+            cookies = cookies.to_dict()
+        headers = dict(request_params.headers or {})
+        if state is not None:
+            if state.etag:
+                headers["If-None-Match"] = state.etag
+            if state.last_modified:
+                headers["If-Modified-Since"] = state.last_modified
+        page = await self._fetch(
+            url=request_params.url,
+            headers=headers or None,
+            cookies=cookies or None,
+            allowed_statuses=(404, 410)
+        )
+        if page.status == 304:
+            return dto.FetchResult(modified=False, data=None, state=state)
+        if page.status in (404, 410):
+            return dto.FetchResult(modified=False, data=None, state=None, gone=True)
+        new_state = dto.FetchState(
+            url=request_params.url,
+            etag=page.headers.get("ETag"),
+            last_modified=page.headers.get("Last-Modified"),
+            content_hash=hashlib.blake2b(page.body, digest_size=16).hexdigest()
+        )
+        if state is not None and state.content_hash == new_state.content_hash:
+            return dto.FetchResult(modified=False, data=None, state=new_state)
+        return dto.FetchResult(modified=True, data=page.text(), state=new_state)
+
+    async def get_object(
+            self,
+            request_params: dto.RequestParam,
+            cookies: Optional[dto.Cookies]
+        ) -> entities.ObjectDm:
+        with contextlib.suppress(Exception):
+            cookies = cookies.to_dict()
+        if self._executor.isolated:
+            # The parser cannot be handed between worker processes, so they get the whole page
+            page = await self._fetch(
+                url=request_params.url,
+                headers=request_params.headers or None,
+                cookies=cookies or None
+            )
+            object_dm, unknown_labels = await self._executor.run(
+                extract_object_with_labels, page.text(), request_params.url
+            )
+            UNKNOWN_LABELS.update(unknown_labels)
+            return object_dm
+        extracted: asyncio.Future[entities.ObjectDm] = asyncio.get_running_loop().create_future()
+
+        async def consume(response: ClientResponse) -> None:
+            stream = _listing_extractor.stream(response.charset)
+            # Chunks are fed in batches, so thread mode makes one executor hop per batch
+            batch: list[bytes] = []
+            batch_size = 0
+            async for chunk in response.content.iter_any():
+                batch.append(chunk)
+                batch_size += len(chunk)
+                if batch_size >= _STREAM_BATCH_SIZE:
+                    if await self._executor.run(stream.feed, b"".join(batch)):
+                        break
+                    batch, batch_size = [], 0
             else:
-                await response.raise_for_status()
+                if batch:
+                    await self._executor.run(stream.feed, b"".join(batch))
+            object_dm, unknown_labels = await self._executor.run(_extract_stream, stream, request_params.url)
+            UNKNOWN_LABELS.update(unknown_labels)
+            extracted.set_result(object_dm)
+            # The caller already has its object; the unparsed tail is drained in the background
+            # so the connection goes back to the pool, or dropped if the connection fails
+            with contextlib.suppress(ClientConnectionError, asyncio.TimeoutError):
+                async for _ in response.content.iter_any():
+                    pass
+
+        fetch = asyncio.create_task(self._fetch(
+            url=request_params.url,
+            headers=request_params.headers or None,
+            cookies=cookies or None,
+            consume=consume
+        ))
+        _DRAINS.add(fetch)
+        fetch.add_done_callback(_DRAINS.discard)
+        try:
+            await asyncio.wait((fetch, extracted), return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            fetch.cancel()
+            raise
+        if not extracted.done():
+            await fetch
+        return extracted.result()
+
+    async def _fetch(
+            self,
+            url: str,
+            allowed_statuses: tuple[int, ...] = (),
+            consume: Optional[Callable[[ClientResponse], Awaitable[None]]] = None,
+            **kwargs
+        ) -> _Page:
+        host_throttle = self._throttle.for_url(url)
+        max_retries = self._throttle.settings.max_retries
+        for attempt in range(max_retries + 1):
+            retry_after = None
+            try:
+                async with host_throttle, self._request_session.get(url, **kwargs) as response:
+                    if response.status == 429 or response.status >= 500:
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        host_throttle.on_throttle(retry_after)
+                        if attempt == max_retries:
+                            response.raise_for_status()
+                    else:
+                        host_throttle.on_success()
+                        if response.status not in allowed_statuses:
+                            response.raise_for_status()
+                        if consume is not None and 200 <= response.status < 300:
+                            await consume(response)
+                            return _Page(
+                                status=response.status,
+                                headers=response.headers,
+                                body=b"",
+                                encoding=response.charset or "utf-8"
+                            )
+                        body = await response.read()
+                        if response.status == 200:
+                            await asyncio.to_thread(self._archive.put, url, body)
+                        return _Page(
+                            status=response.status,
+                            headers=response.headers,
+                            body=body,
+                            encoding=response.get_encoding() if body else "utf-8"
+                        )
+            except (ClientConnectionError, asyncio.TimeoutError):
+                if attempt == max_retries:
+                    raise
+            await asyncio.sleep(self._throttle.backoff(attempt, retry_after))
+
+
+_NO_AREA = Decimal('0.00')
+_STREAM_BATCH_SIZE = 64 * 1024
+# Fetches still draining a streamed response after their object was returned
+_DRAINS: set[asyncio.Task] = set()
+_DROPPED_TAGS = frozenset(('script', 'style', 'noscript', 'svg'))
+_LINKS = etree.XPath('//a/@href')
+
+
+def _first(element: HtmlElement, path: etree.XPath) -> Optional[HtmlElement]:
+    found = path(element)
+    return found[0] if found else None
+
 
+class DataExtracorGateway(
+    interfaces.DataExtractor,
+    interfaces.LinkExtractor,
+    interfaces.ExtractionStats
+):
+
+    def __init__(self, executor: ExtractionExecutor) -> None:
+        self._executor = executor
 
-class DataExtracorGateway(interfaces.DataExtractor):
-    
     async def extract_data(self, data: str, request_param: dto.RequestParam) -> entities.ObjectDm:
-        results = await asyncio.gather(
-            self._find_title(data),
-            self._find_prices(data),
-            self._find_params(data),
-            self._find_description(data),
-            self._find_photos(data),
-            self._find_geo(data)
+        object_dm, unknown_labels = await self._executor.run(
+            extract_object_with_labels, data, request_param.url
         )
-        title, prices, params, description, photos, geo = results
-        print(geo.street)
+        UNKNOWN_LABELS.update(unknown_labels)
+        return object_dm
+
+    async def extract_links(self, data: str, request_params: dto.RequestParam, pattern: str) -> list[str]:
+        return await self._executor.run(extract_links, data, request_params.url, pattern)
+
+
+    def unknown_labels(self) -> list[dto.LabelCount]:
+        return [dto.LabelCount(label=label, count=count) for label, count in UNKNOWN_LABELS.most_common()]
+
+
+def extract_object(data: str, url: str) -> entities.ObjectDm:
+    return _listing_extractor(data, url)
+
+
+def extract_object_with_labels(data: str, url: str) -> tuple[entities.ObjectDm, Counter[str]]:
+    # Worker processes cannot update the parent's UNKNOWN_LABELS, so the labels travel with the result
+    with collect_unknown_labels() as unknown_labels:
+        object_dm = _listing_extractor(data, url)
+    return object_dm, unknown_labels
+
+
+def extract_links(data: str, base_url: str, pattern: str) -> list[str]:
+    link_pattern = re.compile(pattern)
+    links = (
+        urljoin(base_url, href).split('#', 1)[0]
+        for href in _LINKS(html.fromstring(data))
+    )
+    return list(dict.fromkeys(link for link in links if link_pattern.search(link)))
+
+
+def configure_extractor(selectors_path: Optional[str]) -> None:
+    global _listing_extractor
+    _listing_extractor = ListingExtractor(load_selector_plan(selectors_path))
+
+
+class ListingStream:
+
+    def __init__(self, plan: SelectorPlan, encoding: Optional[str]) -> None:
+        self._pending = list(plan.sections)
+        self._parser = etree.HTMLPullParser(
+            events=('end',),
+            tag=_DROPPED_TAGS | {tag for tag, _ in plan.sections},
+            encoding=encoding,
+            remove_comments=True
+        )
+        self._parser.set_element_class_lookup(html.HtmlElementClassLookup())
+
+    def feed(self, chunk: bytes) -> bool:
+        self._parser.feed(chunk)
+        for _, element in self._parser.read_events():
+            if element.tag in _DROPPED_TAGS:
+                element.clear(keep_tail=True)
+            elif self._pending:
+                self._pending = [
+                    (tag, section) for tag, section in self._pending
+                    if tag != element.tag or not section(element)
+                ]
+        return not self._pending
+
+    def close(self) -> HtmlElement:
+        return self._parser.close()
+
+
+class ListingExtractor:
+
+    def __init__(self, plan: SelectorPlan) -> None:
+        self._plan = plan
+
+    def __call__(self, data: str, url: str) -> entities.ObjectDm:
+        return self.extract(html.fromstring(data), url)
+
+    def stream(self, encoding: Optional[str]) -> ListingStream:
+        return ListingStream(self._plan, encoding)
+
+    def extract(self, tree: HtmlElement, url: str) -> entities.ObjectDm:
+        title = self._find_title(tree)
+        prices = self._find_prices(tree)
+        params = self._find_params(tree)
+        description = self._find_description(tree)
+        photos = self._find_photos(tree)
+        geo = self._find_geo(tree)
         return entities.ObjectDm(
-            url=request_param.url,
+            url=url,
             build_type=params.build_type,
             year_of_build=params.year_of_build,
             floor=params.floor,
@@ -85,21 +352,17 @@ class DataExtracorGateway(interfaces.DataExtractor):
             pictures=photos
             )
 
-    async def _find_title(self, data:str) -> str:
-        soup = BeautifulSoup(data, 'lxml')
-        return soup.find('h1').text
-        
-    async def _find_prices(self, data:str) -> entities.Price:
-        soup = BeautifulSoup(data, 'lxml')
-        if dirty_byn_str := soup.find('h2', class_='text-h2'):
-            price_byn_str:str = dirty_byn_str.text
-            price_byn_str = price_byn_str.strip()
+    def _find_title(self, tree: HtmlElement) -> str:
+        return _first(tree, self._plan.title).text_content()
+
+    def _find_prices(self, tree: HtmlElement) -> entities.Price:
+        if (dirty_byn_el := _first(tree, self._plan.price_byn)) is not None:
+            price_byn_str = dirty_byn_el.text_content().strip()
             price_byn = int(re.sub(r'\D', '', price_byn_str))
         else:
             price_byn = None
-        if dirty_usd_str := soup.find('span', class_='text-subhead'):
-            price_usd_str:str = dirty_usd_str.text
-            price_usd_str = price_usd_str.strip()
+        if (dirty_usd_el := _first(tree, self._plan.price_usd)) is not None:
+            price_usd_str = dirty_usd_el.text_content().strip()
             price_usd = Decimal(re.sub(r'\D', '', price_usd_str))
         else:
             price_usd = None
@@ -108,98 +371,67 @@ class DataExtracorGateway(interfaces.DataExtractor):
             price_usd=price_usd
         )
 
-    async def _find_params(self, data: str) -> entities.Chars:
-        soup = BeautifulSoup(data, 'lxml')
-        li_elements = soup.select('ul.w-full.-my-1 > li')
+    def _find_params(self, tree: HtmlElement) -> entities.Chars:
         parameters = {}
-        for li in li_elements:
-            dirty_param_name: str = li.find('span').text
-            param_name = dirty_param_name.strip()
-            if ext_param_value := li.find('p'):
-                dirty_param_value: str = ext_param_value.text
-                param_value = dirty_param_value.strip()
-                parameters[param_name] = param_value
-        params: dict[str, str] = {
-            translit(k, 'ru', reversed=True).replace(' ', '_'): v
-            for k, v in parameters.items()
-        }
-        pattern = r'[^\d.]'
-        if params["Etazh_/_etazhnost'"]:
-            floor, floors_number = map(
-                lambda x: int(x.strip()),
-                params.get("Etazh_/_etazhnost'").split('/')
-            )
-        rooms = int(params.get("Kolichestvo_komnat"))
-        separated_rooms = int(params.get("Razdel'nyh_komnat", 1))
+        for li in self._plan.params(tree):
+            param_name = _first(li, self._plan.param_label).text_content().strip()
+            if (ext_param_value := _first(li, self._plan.param_value)) is not None:
+                parameters[param_name] = ext_param_value.text_content().strip()
+        params = convert_labels(parameters)
+        rooms = params.get("rooms")
+        separated_rooms = params.get("separated_rooms", 1)
         return entities.Chars(
-            build_type=params.get("Tip_doma"),
-            year_of_build=int(params.get("God_postrojki")),
-            floor=floor,
-            floors_numb=floors_number,
+            build_type=params.get("build_type"),
+            year_of_build=params.get("year_of_build"),
+            floor=params.get("floor"),
+            floors_numb=params.get("floors_numb"),
             rooms=rooms,
             separated_rooms=separated_rooms,
             all_separated_rooms=rooms==separated_rooms,
-            area=Decimal(self.clean_param(params.get("Ploschad'_obschaja"), pattern)).quantize(Decimal('1.00')),
-            living_area=Decimal(self.clean_param(params.get("Ploschad'_zhilaja"), pattern)).quantize(Decimal('1.00')),
-            kitchen_area=Decimal(self.clean_param(params.get("Ploschad'_kuhni"), pattern)).quantize(Decimal('1.00')),
-            bath=params.get("Sanuzel"),
-            balcony=params.get("Balkon"),
-            repair=params.get("Remont")
+            area=params.get("area", _NO_AREA),
+            living_area=params.get("living_area", _NO_AREA),
+            kitchen_area=params.get("kitchen_area", _NO_AREA),
+            bath=params.get("bath"),
+            balcony=params.get("balcony"),
+            repair=params.get("repair")
         )
 
-    def clean_param(self, value, pattern, default='0'):
-        return re.sub(pattern, '', str(value)) if value is not None else default
+    def _find_description(self, tree: HtmlElement) -> str:
+        return _first(tree, self._plan.description).text_content().strip()
 
-    async def _find_description(self, data:str) -> str:
-        soup = BeautifulSoup(data, 'lxml')
-        section = soup.find(
-            name='section', 
-            class_='bg-white flex flex-wrap md:p-6 my-4 rounded-md'
-        )
-        dirty_description: str = section.find(
-            name='div', 
-            class_='description_wrapper__tlUQE'
-        ).text
-        return dirty_description.strip()
-
-    async def _find_photos(self, data:str) -> tuple[str]:
-        soup = BeautifulSoup(data, 'lxml')
-        swiper_wrapper = soup.find(
-            name='div',
-            class_='swiper-wrapper'
-        )
-        img_tags = swiper_wrapper.find_all('img')
-        return (
-            img['src'] for img in img_tags
-            if 'src' in img.attrs and
-            img['src'].endswith('.jpg')
+    def _find_photos(self, tree: HtmlElement) -> tuple[str]:
+        return tuple(
+            src for src in self._plan.photos(tree)
+            if src.endswith('.jpg')
         )
 
-    async def _find_geo(self, data:str) -> entities.Address:
-        soup = BeautifulSoup(data, 'lxml')
-        ul_element = soup.find('ul', class_='w-full mb-0.5 -my-1')
+    def _find_geo(self, tree: HtmlElement) -> entities.Address:
         address_info = {}
-        for li in ul_element.find_all('li', class_='relative py-1'):
-            if span := li.find('span', class_='text-basic'):
-                key = span.text.strip()
-                if value := li.find('a') or li.find('p'):
-                    address_info[key] = value.text.strip()
-        address_info = {
-            translit(k, 'ru', reversed=True).replace(' ', '_'):
-            v for k, v in address_info.items()
-        }
-        print(address_info)
-        latitude, longitude = map(
-            lambda x: x.strip(),
-            address_info.get("Koordinaty").split(', ')
-        )
+        for li in self._plan.geo(tree):
+            if (span := _first(li, self._plan.geo_label)) is not None:
+                key = span.text_content().strip()
+                value = _first(li, self._plan.geo_link)
+                if value is None:
+                    value = _first(li, self._plan.geo_value)
+                if value is not None:
+                    address_info[key] = value.text_content().strip()
+        address_info = convert_labels(address_info)
         return entities.Address(
-            house_number=address_info.get("Nomer_doma"),
-            street=address_info.get("Ulitsa"),
-            region=address_info.get("Oblast'"),
-            city=address_info.get("Naselennyj_punkt"),
-            city_region=address_info.get("Rajon_goroda"),
-            micro_region=address_info.get("Mikrorajon"),
-            latitude=Decimal(latitude).quantize(Decimal('1.0000000')),
-            longitude=Decimal(longitude).quantize(Decimal('1.0000000'))
-        )
\ No newline at end of file
+            house_number=address_info.get("house_number"),
+            street=address_info.get("street"),
+            region=address_info.get("region"),
+            city=address_info.get("city"),
+            city_region=address_info.get("city_region"),
+            micro_region=address_info.get("micro_region"),
+            latitude=address_info["latitude"],
+            longitude=address_info["longitude"]
+        )
+
+
+_listing_extractor = ListingExtractor(load_selector_plan())
+
+
+def _extract_stream(stream: ListingStream, url: str) -> tuple[entities.ObjectDm, Counter[str]]:
+    with collect_unknown_labels() as unknown_labels:
+        object_dm = _listing_extractor.extract(stream.close(), url)
+    return object_dm, unknown_labels
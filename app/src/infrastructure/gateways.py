@@ -1,93 +1,240 @@
 # -*- coding: utf-8 -*-
 
-from typing import Optional
+import base64
+import json
+import math
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
+from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
+from sqlalchemy import Row, text
 
 from app.src.application import interfaces
 from app.src.application import dto
+from app.src.domain import geohash
 from app.src.domain.entities import ObjectDm, SearchResultsDm
 
 
+OBJECT_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("id", "uuid"),
+    ("region", "varchar"),
+    ("city", "varchar"),
+    ("street", "varchar"),
+    ("house_number", "varchar"),
+    ("city_region", "varchar"),
+    ("micro_region", "varchar"),
+    ("latitude", "numeric"),
+    ("longitude", "numeric"),
+    ("price_byn", "integer"),
+    ("price_usd", "integer"),
+    ("price_m2", "integer"),
+    ("build_type", "varchar"),
+    ("year_of_build", "integer"),
+    ("floor", "integer"),
+    ("floors_numb", "integer"),
+    ("rooms", "integer"),
+    ("separated_rooms", "integer"),
+    ("all_separated_rooms", "boolean"),
+    ("area", "numeric"),
+    ("living_area", "numeric"),
+    ("kitchen_area", "numeric"),
+    ("repair", "varchar"),
+    ("balcony", "varchar"),
+    ("number_balcony", "varchar"),
+    ("bath", "varchar"),
+    ("active", "boolean"),
+    ("url", "varchar"),
+    ("title", "varchar"),
+    ("description", "varchar"),
+    ("geohash", "varchar"),
+)
+
+PRICE_HISTORY_INSERT = """
+    INSERT INTO price_history (object_id, observed_at, price_usd, price_byn)
+"""
+
+SAVE_MANY_QUERY = text("""
+    WITH inserted_objects AS (
+        INSERT INTO objects ({columns}, pictures)
+        SELECT {columns}, ARRAY(SELECT jsonb_array_elements_text(batch.pictures))::varchar[]
+        FROM unnest({arrays}, CAST(:pictures AS jsonb[])) AS batch({columns}, pictures)
+        ON CONFLICT (url) DO NOTHING
+        RETURNING id, url, price_usd, price_byn
+    ),
+    recorded_price AS (
+        {history}
+        SELECT id, now(), price_usd, price_byn FROM inserted_objects
+    )
+    SELECT url, id FROM inserted_objects;
+""".format(
+    history=PRICE_HISTORY_INSERT.strip(),
+    columns=", ".join(name for name, _ in OBJECT_COLUMNS),
+    arrays=", ".join(f"CAST(:{name} AS {sql_type}[])" for name, sql_type in OBJECT_COLUMNS),
+))
+
+
+SEARCH_RANGE_FILTERS: dict[str, tuple[str, str]] = {
+    "min_price_usd": ("price_usd", ">="),
+    "max_price_usd": ("price_usd", "<="),
+    "min_year_of_build": ("year_of_build", ">="),
+    "max_year_of_build": ("year_of_build", "<="),
+    "min_floor": ("floor", ">="),
+    "max_floor": ("floor", "<="),
+    "min_area": ("area", ">="),
+    "max_area": ("area", "<="),
+    "min_living_area": ("living_area", ">="),
+    "max_living_area": ("living_area", "<="),
+    "min_kitchen_area": ("kitchen_area", ">="),
+    "max_kitchen_area": ("kitchen_area", "<="),
+}
+
+SEARCH_EQUALITY_FILTERS: tuple[str, ...] = (
+    "build_type",
+    "year_of_build",
+    "floor",
+    "floors_numb",
+    "rooms",
+    "separated_rooms",
+    "all_separated_rooms",
+    "area",
+    "living_area",
+    "kitchen_area",
+    "repair",
+    "balcony",
+    "number_balcony",
+    "bath",
+    "region",
+    "city",
+    "street",
+    "house_number",
+    "city_region",
+    "micro_region",
+)
+
+
+DISTANCE_COLUMN = """
+    2 * {radius} * asin(sqrt(
+        power(sin(radians(latitude::float8 - :latitude) / 2), 2)
+        + cos(radians(:latitude)) * cos(radians(latitude::float8))
+        * power(sin(radians(longitude::float8 - :longitude) / 2), 2)
+    )) AS distance
+""".format(radius=geohash.EARTH_RADIUS)
+
+
+RANK_COLUMN = "ts_rank_cd(search_vector, websearch_to_tsquery('russian', :q))::float8 AS rank"
+
+
+def _encode_cursor(values: dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def _decode_cursor(cursor: str, *numbers: str) -> dict[str, Any]:
+    # Cursors come back from clients, so anything but the shape we issued is rejected
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        decoded = {"id": str(UUID(values["id"]))}
+        for name in numbers:
+            decoded[name] = float(values[name])
+            if not math.isfinite(decoded[name]):
+                raise ValueError(f"{name} is not finite")
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    return decoded
+
+
+_UPDATED_COLUMNS = tuple(
+    name for name, _ in OBJECT_COLUMNS if name not in ("id", "url")
+) + ("pictures",)
+
+UPSERT_QUERY = text("""
+    WITH previous_object AS (
+        SELECT id, price_usd, price_byn FROM objects WHERE url = :url
+    ),
+    upserted_object AS (
+        INSERT INTO objects ({columns}, pictures)
+        VALUES ({values}, CAST(:pictures AS varchar[]))
+        ON CONFLICT (url) DO UPDATE SET
+            {assignments},
+            version = objects.version + 1,
+            updated_at = now(),
+            price_changes = objects.price_changes + (
+                (objects.price_usd, objects.price_byn)
+                IS DISTINCT FROM (EXCLUDED.price_usd, EXCLUDED.price_byn)
+            )::int
+        WHERE ({current}) IS DISTINCT FROM ({excluded})
+        RETURNING id, price_usd, price_byn
+    ),
+    recorded_price AS (
+        {history}
+        SELECT upserted.id, now(), upserted.price_usd, upserted.price_byn
+        FROM upserted_object upserted
+        LEFT JOIN previous_object previous ON previous.id = upserted.id
+        WHERE previous.id IS NULL
+        OR (previous.price_usd, previous.price_byn) IS DISTINCT FROM (upserted.price_usd, upserted.price_byn)
+        ON CONFLICT DO NOTHING
+    )
+    SELECT id FROM upserted_object
+    UNION ALL
+    SELECT id FROM objects WHERE url = :url
+    LIMIT 1;
+""".format(
+    history=PRICE_HISTORY_INSERT.strip(),
+    columns=", ".join(name for name, _ in OBJECT_COLUMNS),
+    values=", ".join(f":{name}" for name, _ in OBJECT_COLUMNS),
+    assignments=",\n            ".join(f"{name} = EXCLUDED.{name}" for name in _UPDATED_COLUMNS),
+    current=", ".join(f"objects.{name}" for name in _UPDATED_COLUMNS),
+    excluded=", ".join(f"EXCLUDED.{name}" for name in _UPDATED_COLUMNS),
+))
+
+
 class ObjectsGateway(
-    interfaces.SaveObject,
+    interfaces.SaveObjects,
+    interfaces.UpsertObject,
     interfaces.ReadObject,
-    interfaces.FindObjects
+    interfaces.ReadObjectUrls,
+    interfaces.DeactivateObject,
+    interfaces.FindStaleObjects,
+    interfaces.FindObjects,
+    interfaces.FindNearbyObjects,
+    interfaces.StreamObjects,
+    interfaces.StreamChangedObjects
 ):
 
     def __init__(self, session: AsyncSession) -> None:
         self._session = session
 
-    async def save(self, object: ObjectDm) -> None:
-        query = text("""
-            WITH inserted_object AS (
-                INSERT INTO objects (
-                    id, region, city, street, house_number, city_region, micro_region,
-                    latitude, longitude,
-                    price_byn, price_usd, price_m2,
-                    build_type, year_of_build, floor, floors_numb, rooms, separated_rooms, all_separated_rooms,
-                    area, living_area, kitchen_area,
-                    repair, balcony, number_balcony, bath,
-                    active, url, title, description
-                ) VALUES (
-                    :id, :region, :city, :street, :house_number, :city_region, :micro_region,
-                    :latitude, :longitude, :price_byn, :price_usd, :price_m2,
-                    :build_type, :year_of_build, :floor, :floors_numb, :rooms, :separated_rooms, :all_separated_rooms,
-                    :area, :living_area, :kitchen_area,
-                    :repair, :balcony, :number_balcony, :bath,
-                    :active, :url, :title, :description
-                ) RETURNING id
-            )
-            INSERT INTO objects_photos (object_id, url)
-            SELECT inserted_object.id, unnest(array[:pictures]) FROM inserted_object;
-        """)
-        await self._session.execute(
-            statement=query,
-            params={
-                "id": object.id,
-                "region": object.region,
-                "city": object.city,
-                "street": object.street,
-                "house_number": object.house_number,
-                "city_region": object.city_region,
-                "micro_region": object.micro_region,
-                "latitude": object.latitude,
-                "longitude": object.longitude,
-                "price_byn": object.price_byn,
-                "price_usd": object.price_usd,
-                "price_m2": object.price_m2,
-                "build_type": object.build_type,
-                "year_of_build": object.year_of_build,
-                "floor": object.floor,
-                "floors_numb": object.floors_numb,
-                "rooms": object.rooms,
-                "separated_rooms": object.separated_rooms,
-                "all_separated_rooms": object.all_separated_rooms,
-                "area": object.area,
-                "living_area": object.living_area,
-                "kitchen_area": object.kitchen_area,
-                "repair": object.repair,
-                "balcony": object.balcony,
-                "number_balcony": object.number_balcony,
-                "bath": object.bath,
-                "active": object.active,
-                "url": object.url,
-                "title": object.title,
-                "description": object.description,
-                "pictures": list(object.pictures)
-            }
+    async def save_many(self, objects: list[ObjectDm]) -> dict[str, str]:
+        # Urls already stored are skipped; only inserted rows come back, keyed by url
+        if not objects:
+            return {}
+        params = {
+            name: [getattr(object, name) for object in objects]
+            for name, _ in OBJECT_COLUMNS
+        }
+        params["pictures"] = [json.dumps(list(object.pictures)) for object in objects]
+        result = await self._session.execute(statement=SAVE_MANY_QUERY, params=params)
+        return {row.url: str(row.id) for row in result}
+
+    async def iter_urls(self) -> AsyncIterator[str]:
+        result = await self._session.stream_scalars(
+            text("SELECT url FROM objects;"),
+            execution_options={"yield_per": 10000}
         )
+        async for url in result:
+            yield url
+
+    async def read_stored_urls(self, urls: list[str]) -> set[str]:
+        result = await self._session.scalars(
+            text("SELECT url FROM objects WHERE url = ANY(:urls);"),
+            {"urls": urls}
+        )
+        return set(result)
 
     async def read_by_id(self, id: str) -> Optional[ObjectDm]:
         query = text("""
-            SELECT 
-                object.*, 
-                ARRAY_AGG(photos.url) AS photo_urls
-            FROM objects object
-            LEFT JOIN objects_photos photos ON object.id = photos.object_id
-            WHERE object.id = :id
-            GROUP BY object.id;
+            SELECT * FROM objects
+            WHERE id = :id;
         """)
         result = await self._session.execute(
             statement=query,
@@ -126,183 +273,229 @@ class ObjectsGateway(
                 url=row.url,
                 title=row.title,
                 description=row.description,
-                pictures=row.photo_urls
+                pictures=row.pictures,
+                version=row.version
             ) if row else None
         )
 
-    async def update_by_url(self, url: str, object: ObjectDm) -> None:
-        query = text("""
-            WITH updated_object AS (
-                UPDATE objects
-                SET
-                    region = :region,
-                    city = :city,
-                    street = :street,
-                    house_number = :house_number,
-                    city_region = :city_region,
-                    micro_region = :micro_region,
-                    latitude = :latitude,
-                    longitude = :longitude,
-                    price_byn = :price_byn,
-                    price_usd = :price_usd,
-                    price_m2 = :price_m2,
-                    build_type = :build_type,
-                    year_of_build = :year_of_build,
-                    floor = :floor,
-                    floors_numb = :floors_numb,
-                    rooms = :rooms,
-                    separated_rooms = :separated_rooms,
-                    all_separated_rooms = :all_separated_rooms,
-                    area = :area,
-                    living_area = :living_area,
-                    kitchen_area = :kitchen_area,
-                    repair = :repair,
-                    balcony = :balcony,
-                    number_balcony = :number_balcony,
-                    bath = :bath,
-                    active = :active,
-                    title = :title,
-                    description = :description
-                WHERE url = :url
-                RETURNING id
-            )
-            DELETE FROM objects_photos
-            WHERE object_id = (SELECT id FROM updated_object);
-
-            INSERT INTO objects_photos (object_id, url)
-            SELECT (SELECT id FROM updated_object), unnest(:pictures);
-        """)
-        await self._session.execute(
-            statement=query,
+    async def upsert(self, object: ObjectDm) -> str:
+        result = await self._session.execute(
+            statement=UPSERT_QUERY,
             params={
-                "region": object.region,
-                "city": object.city,
-                "street": object.street,
-                "house_number": object.house_number,
-                "city_region": object.city_region,
-                "micro_region": object.micro_region,
-                "latitude": object.latitude,
-                "longitude": object.longitude,
-                "price_byn": object.price_byn,
-                "price_usd": object.price_usd,
-                "price_m2": object.price_m2,
-                "build_type": object.build_type,
-                "year_of_build": object.year_of_build,
-                "floor": object.floor,
-                "floors_numb": object.floors_numb,
-                "rooms": object.rooms,
-                "separated_rooms": object.separated_rooms,
-                "all_separated_rooms": object.all_separated_rooms,
-                "area": object.area,
-                "living_area": object.living_area,
-                "kitchen_area": object.kitchen_area,
-                "repair": object.repair,
-                "balcony": object.balcony,
-                "number_balcony": object.number_balcony,
-                "bath": object.bath,
-                "active": object.active,
-                "title": object.title,
-                "description": object.description,
-                "url": url,
-                "pictures": object.pictures
+                **{name: getattr(object, name) for name, _ in OBJECT_COLUMNS},
+                "pictures": list(object.pictures)
             }
         )
+        return str(result.scalar_one())
 
     async def delete_by_url(self, url: str) -> None:
         query = text("""
-            WITH deleted_object AS (
-                DELETE FROM objects 
-                WHERE url = :url
-                RETURNING id
-            )
-            DELETE FROM objects_photos
-            WHERE object_id = (SELECT id FROM deleted_object);
+            DELETE FROM objects
+            WHERE url = :url;
         """)
         await self._session.execute(statement=query, params={"url": url})
 
-    async def search_objects(self, filters: dto.DbSearchFilters) -> list[SearchResultsDm]:
-        conditions = []
+    async def deactivate_by_url(self, url: str) -> None:
+        query = text("""
+            UPDATE objects
+            SET active = false, version = version + 1, updated_at = now()
+            WHERE url = :url AND active;
+        """)
+        await self._session.execute(statement=query, params={"url": url})
+
+    async def find_stale_urls(self, limit: int, min_age: float) -> list[str]:
+        query = text("""
+            SELECT object.url
+            FROM objects object
+            LEFT JOIN fetch_states state ON state.url = object.url
+            WHERE object.active
+            AND (
+                state.checked_at IS NULL
+                -- Each consecutive failure doubles the wait, up to 64 * min_age
+                OR state.checked_at < now() - make_interval(secs => :min_age * power(2, LEAST(state.failures, 6)))
+            )
+            ORDER BY
+                EXTRACT(EPOCH FROM now() - COALESCE(state.checked_at, 'epoch'::timestamptz))
+                * (1 + object.price_changes) DESC
+            LIMIT :limit;
+        """)
+        result = await self._session.execute(
+            statement=query,
+            params={"limit": limit, "min_age": min_age}
+        )
+        return list(result.scalars())
+
+    async def search_objects(
+        self,
+        filters: dto.DbSearchFilters,
+        page: dto.SearchPage
+    ) -> dto.SearchResults:
+        query, params = self._search_statement(filters, page)
+        result = await self._session.execute(text(query), params)
+        items = [self._to_search_result(row) for row in result.fetchall()]
+        next_cursor = None
+        if len(items) > page.limit:
+            items = items[:page.limit]
+            last = {"id": str(items[-1].id)}
+            if filters.q is not None:
+                last["rank"] = items[-1].rank
+            next_cursor = _encode_cursor(last)
+        return dto.SearchResults(items=items, next_cursor=next_cursor)
+
+    async def search_nearby(
+        self,
+        filters: dto.DbSearchFilters,
+        area: dto.GeoSearch,
+        page: dto.SearchPage
+    ) -> dto.SearchResults:
+        conditions, params = self._search_conditions(filters)
+        cells = geohash.cover(area.min_latitude, area.min_longitude, area.max_latitude, area.max_longitude)
+        if cells != ['']:
+            # Prefix ranges over the "C"-collated geohash column are btree index scans
+            ranges = []
+            for number, cell in enumerate(cells):
+                ranges.append(f"(geohash >= :cell_{number} AND geohash < :cell_end_{number})")
+                params[f"cell_{number}"] = cell
+                params[f"cell_end_{number}"] = cell + "~"
+            conditions.append("(" + " OR ".join(ranges) + ")")
+        conditions.append("latitude BETWEEN :min_latitude AND :max_latitude")
+        conditions.append("longitude BETWEEN :min_longitude AND :max_longitude")
+        params.update(
+            latitude=area.latitude,
+            longitude=area.longitude,
+            min_latitude=area.min_latitude,
+            min_longitude=area.min_longitude,
+            max_latitude=area.max_latitude,
+            max_longitude=area.max_longitude,
+            limit=page.limit + 1
+        )
+        outer_conditions = []
+        if area.radius is not None:
+            outer_conditions.append("distance <= :radius")
+            params["radius"] = area.radius
+        if page.cursor is not None:
+            after = _decode_cursor(page.cursor, "distance")
+            outer_conditions.append("(distance, id) > (:after_distance, :after_id)")
+            params["after_distance"] = after["distance"]
+            params["after_id"] = after["id"]
+        query = f"SELECT * FROM ({self._search_query(conditions, DISTANCE_COLUMN)}) nearby"
+        if outer_conditions:
+            query += " WHERE " + " AND ".join(outer_conditions)
+        query += " ORDER BY distance, id LIMIT :limit"
+        result = await self._session.execute(text(query), params)
+        items = [self._to_search_result(row) for row in result.fetchall()]
+        next_cursor = None
+        if len(items) > page.limit:
+            items = items[:page.limit]
+            next_cursor = _encode_cursor({"distance": items[-1].distance, "id": str(items[-1].id)})
+        return dto.SearchResults(items=items, next_cursor=next_cursor)
+
+    async def stream_objects(
+        self,
+        filters: dto.DbSearchFilters,
+        batch_size: int
+    ) -> AsyncIterator[SearchResultsDm]:
+        conditions, params = self._search_conditions(filters)
+        query = self._search_query(conditions) + " ORDER BY id"
+        result = await self._session.stream(
+            text(query),
+            params,
+            execution_options={"yield_per": batch_size}
+        )
+        async for row in result:
+            yield self._to_search_result(row)
+
+    async def stream_changed(
+        self,
+        since: Optional[datetime],
+        batch_size: int
+    ) -> AsyncIterator[dto.ObjectFacts]:
+        query = """
+            SELECT id, active, updated_at, city, city_region, micro_region,
+            build_type, repair, rooms, year_of_build, price_usd, price_m2, area
+            FROM objects
+        """
         params = {}
-        if filters.min_price_usd is not None:
-            conditions.append("price_usd >= :min_price_usd")
-            params["min_price_usd"] = filters.min_price_usd
-        if filters.max_price_usd is not None:
-            conditions.append("price_usd <= :max_price_usd")
-            params["max_price_usd"] = filters.max_price_usd
-        if filters.build_type is not None:
-            conditions.append("build_type = :build_type")
-            params["build_type"] = filters.build_type
-        if filters.year_of_build is not None:
-            conditions.append("year_of_build = :year_of_build")
-            params["year_of_build"] = filters.year_of_build
-        if filters.floor is not None:
-            conditions.append("floor = :floor")
-            params["floor"] = filters.floor
-        if filters.floors_numb is not None:
-            conditions.append("floors_numb = :floors_numb")
-            params["floors_numb"] = filters.floors_numb
-        if filters.rooms is not None:
-            conditions.append("rooms = :rooms")
-            params["rooms"] = filters.rooms
-        if filters.separated_rooms is not None:
-            conditions.append("separated_rooms = :separated_rooms")
-            params["separated_rooms"] = filters.separated_rooms
-        if filters.all_separated_rooms is not None:
-            conditions.append("all_separated_rooms = :all_separated_rooms")
-            params["all_separated_rooms"] = filters.all_separated_rooms
-        if filters.area is not None:
-            conditions.append("area = :area")
-            params["area"] = filters.area
-        if filters.living_area is not None:
-            conditions.append("living_area = :living_area")
-            params["living_area"] = filters.living_area
-        if filters.kitchen_area is not None:
-            conditions.append("kitchen_area = :kitchen_area")
-            params["kitchen_area"] = filters.kitchen_area
-        if filters.repair is not None:
-            conditions.append("repair = :repair")
-            params["repair"] = filters.repair
-        if filters.balcony is not None:
-            conditions.append("balcony = :balcony")
-            params["balcony"] = filters.balcony
-        if filters.number_balcony is not None:
-            conditions.append("number_balcony = :number_balcony")
-            params["number_balcony"] = filters.number_balcony
-        if filters.bath is not None:
-            conditions.append("bath = :bath")
-            params["bath"] = filters.bath
-        if filters.region is not None:
-            conditions.append("region = :region")
-            params["region"] = filters.region
-        if filters.city is not None:
-            conditions.append("city = :city")
-            params["city"] = filters.city
-        if filters.street is not None:
-            conditions.append("street = :street")
-            params["street"] = filters.street
-        if filters.house_number is not None:
-            conditions.append("house_number = :house_number")
-            params["house_number"] = filters.house_number
-        if filters.city_region is not None:
-            conditions.append("city_region = :city_region")
-            params["city_region"] = filters.city_region
-        if filters.micro_region is not None:
-            conditions.append("micro_region = :micro_region")
-            params["micro_region"] = filters.micro_region
+        if since is None:
+            query += " WHERE active"
+        else:
+            query += " WHERE updated_at >= :since"
+            params["since"] = since
+        result = await self._session.stream(
+            text(query),
+            params,
+            execution_options={"yield_per": batch_size}
+        )
+        async for row in result:
+            yield dto.ObjectFacts(
+                id=str(row.id),
+                active=row.active,
+                updated_at=row.updated_at,
+                city=row.city,
+                city_region=row.city_region,
+                micro_region=row.micro_region,
+                build_type=row.build_type,
+                repair=row.repair,
+                rooms=row.rooms,
+                year_of_build=row.year_of_build,
+                price_usd=row.price_usd,
+                price_m2=row.price_m2,
+                area=row.area
+            )
+
+    def _search_statement(
+        self,
+        filters: dto.DbSearchFilters,
+        page: dto.SearchPage
+    ) -> tuple[str, dict[str, Any]]:
+        conditions, params = self._search_conditions(filters)
+        params["limit"] = page.limit + 1
+        if filters.q is None:
+            if page.cursor is not None:
+                conditions.append("id > :after_id")
+                params["after_id"] = _decode_cursor(page.cursor)["id"]
+            query = self._search_query(conditions) + " ORDER BY id LIMIT :limit"
+        else:
+            query = f"SELECT * FROM ({self._search_query(conditions, RANK_COLUMN)}) ranked"
+            if page.cursor is not None:
+                after = _decode_cursor(page.cursor, "rank")
+                query += " WHERE rank < :after_rank OR (rank = :after_rank AND id > :after_id)"
+                params["after_rank"] = after["rank"]
+                params["after_id"] = after["id"]
+            query += " ORDER BY rank DESC, id LIMIT :limit"
+        return query, params
+
+    def _search_query(self, conditions: list[str], extra_column: Optional[str] = None) -> str:
         query = """
             SELECT id, title, price_usd, region, city, street, 
             house_number, area, living_area, kitchen_area, floor,
-            floors_numb FROM objects
-        """
+            floors_numb{extra} FROM objects
+        """.format(extra=f", {extra_column}" if extra_column else "")
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
-        # Логирование запроса и параметров
-        print("Generated SQL Query:", query)
-        print("Query Parameters:", params)
-        result = await self._session.execute(text(query), params)
-        rows = result.fetchall()
-        print(rows)
-        return [SearchResultsDm(
+        return query
+
+    def _search_conditions(self, filters: dto.DbSearchFilters) -> tuple[list[str], dict[str, Any]]:
+        conditions = []
+        params = {}
+        if filters.active is not None:
+            # Inlined so the planner can match the partial "WHERE active" indexes
+            conditions.append("active" if filters.active else "NOT active")
+        for name, (column, operator) in SEARCH_RANGE_FILTERS.items():
+            if (value := getattr(filters, name)) is not None:
+                conditions.append(f"{column} {operator} :{name}")
+                params[name] = value
+        if filters.q is not None:
+            conditions.append("search_vector @@ websearch_to_tsquery('russian', :q)")
+            params["q"] = filters.q
+        for name in SEARCH_EQUALITY_FILTERS:
+            if (value := getattr(filters, name)) is not None:
+                conditions.append(f"{name} = :{name}")
+                params[name] = value
+        return conditions, params
+
+    def _to_search_result(self, row: Row) -> SearchResultsDm:
+        return SearchResultsDm(
             id=row.id,
             title=row.title,
             price_usd=row.price_usd,
@@ -314,5 +507,162 @@ class ObjectsGateway(
             living_area=row.living_area,
             kitchen_area=row.kitchen_area,
             floor=row.floor,
-            floors_numb=row.floors_numb
-        ) for row in rows]
+            floors_numb=row.floors_numb,
+            distance=row._mapping.get("distance"),
+            rank=row._mapping.get("rank")
+        )
+
+
+class FetchStateGateway(
+    interfaces.ReadFetchState,
+    interfaces.SaveFetchState
+):
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def read_fetch_state(self, url: str) -> Optional[dto.FetchState]:
+        query = text("""
+            SELECT url, etag, last_modified, content_hash
+            FROM fetch_states
+            WHERE url = :url;
+        """)
+        result = await self._session.execute(statement=query, params={"url": url})
+        row = result.fetchone()
+        return (
+            dto.FetchState(
+                url=row.url,
+                etag=row.etag,
+                last_modified=row.last_modified,
+                content_hash=row.content_hash
+            ) if row else None
+        )
+
+    async def save_fetch_state(self, state: dto.FetchState) -> None:
+        query = text("""
+            INSERT INTO fetch_states (url, etag, last_modified, content_hash, checked_at, failures)
+            VALUES (:url, :etag, :last_modified, :content_hash, now(), 0)
+            ON CONFLICT (url) DO UPDATE SET
+                etag = EXCLUDED.etag,
+                last_modified = EXCLUDED.last_modified,
+                content_hash = EXCLUDED.content_hash,
+                checked_at = EXCLUDED.checked_at,
+                failures = 0;
+        """)
+        await self._session.execute(
+            statement=query,
+            params={
+                "url": state.url,
+                "etag": state.etag,
+                "last_modified": state.last_modified,
+                "content_hash": state.content_hash
+            }
+        )
+
+    async def save_fetch_failure(self, url: str) -> None:
+        query = text("""
+            INSERT INTO fetch_states (url, checked_at, failures)
+            VALUES (:url, now(), 1)
+            ON CONFLICT (url) DO UPDATE SET
+                checked_at = EXCLUDED.checked_at,
+                failures = fetch_states.failures + 1;
+        """)
+        await self._session.execute(statement=query, params={"url": url})
+
+
+class PriceHistoryGateway(
+    interfaces.ReadPriceHistory,
+    interfaces.PriceHistoryPartitions
+):
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def read_price_history(self, object_id: str) -> list[dto.PricePoint]:
+        query = text("""
+            SELECT observed_at, price_usd, price_byn
+            FROM price_history
+            WHERE object_id = :object_id
+            ORDER BY observed_at;
+        """)
+        result = await self._session.execute(statement=query, params={"object_id": object_id})
+        return [
+            dto.PricePoint(
+                observed_at=row.observed_at,
+                price_usd=row.price_usd,
+                price_byn=row.price_byn
+            ) for row in result.fetchall()
+        ]
+
+    async def ensure_partitions(self, months_ahead: int) -> None:
+        query = text("""
+            SELECT ensure_price_history_partition(
+                (date_trunc('month', now()) + make_interval(months => month))::date
+            )
+            FROM generate_series(0, :months_ahead) AS month;
+        """)
+        await self._session.execute(statement=query, params={"months_ahead": months_ahead})
+
+
+MARKET_STATS_KEYS: tuple[str, ...] = ("city", "city_region", "rooms", "build_type")
+
+
+class MarketStatsGateway(
+    interfaces.ReadMarketStats,
+    interfaces.RefreshMarketStats
+):
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def read_market_stats(self, query: dto.MarketStatsQuery) -> list[dto.MarketStat]:
+        group_by = set(query.group_by) | set(query.filters)
+        unknown = group_by - set(MARKET_STATS_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown market stats grouping: {', '.join(sorted(unknown))}")
+        # GROUPING() sets a bit, most significant first, for every key rolled up in the row;
+        # keys are stored coalesced ('' / -1) so the unique index allows a concurrent refresh
+        grouping = sum(
+            1 << (len(MARKET_STATS_KEYS) - 1 - position)
+            for position, name in enumerate(MARKET_STATS_KEYS)
+            if name not in group_by
+        )
+        conditions = ["grouping_set = :grouping"]
+        params: dict[str, Any] = {"grouping": grouping}
+        for name, value in query.filters.items():
+            conditions.append(f"{name} = :{name}")
+            params[name] = value
+        statement = text(f"""
+            SELECT
+                NULLIF(city, '') AS city,
+                NULLIF(city_region, '') AS city_region,
+                NULLIF(rooms, -1) AS rooms,
+                NULLIF(build_type, '') AS build_type,
+                listings, avg_price_usd, p25_price_usd, median_price_usd, p75_price_usd,
+                avg_price_m2, p25_price_m2, median_price_m2, p75_price_m2, refreshed_at
+            FROM market_stats
+            WHERE {" AND ".join(conditions)}
+            ORDER BY listings DESC;
+        """)
+        result = await self._session.execute(statement=statement, params=params)
+        return [
+            dto.MarketStat(
+                city=row.city,
+                city_region=row.city_region,
+                rooms=row.rooms,
+                build_type=row.build_type,
+                count=row.listings,
+                avg_price_usd=row.avg_price_usd,
+                p25_price_usd=row.p25_price_usd,
+                median_price_usd=row.median_price_usd,
+                p75_price_usd=row.p75_price_usd,
+                avg_price_m2=row.avg_price_m2,
+                p25_price_m2=row.p25_price_m2,
+                median_price_m2=row.median_price_m2,
+                p75_price_m2=row.p75_price_m2,
+                refreshed_at=row.refreshed_at
+            ) for row in result.fetchall()
+        ]
+
+    async def refresh_market_stats(self) -> None:
+        await self._session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY market_stats;"))
\ No newline at end of file
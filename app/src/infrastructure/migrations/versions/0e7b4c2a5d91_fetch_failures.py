@@ -0,0 +1,29 @@
+"""Fetch failures
+
+Revision ID: 0e7b4c2a5d91
+Revises: f6c2a9d47e15
+Create Date: 2026-10-18 21:40:26.318504
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0e7b4c2a5d91'
+down_revision: Union[str, None] = 'f6c2a9d47e15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'fetch_states',
+        sa.Column('failures', sa.Integer(), nullable=False, server_default=sa.text('0'))
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('fetch_states', 'failures')
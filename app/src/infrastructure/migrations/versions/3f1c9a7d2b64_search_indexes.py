@@ -0,0 +1,50 @@
+"""Search indexes
+
+Revision ID: 3f1c9a7d2b64
+Revises: 4a7e2b9c1d53
+Create Date: 2026-10-18 10:12:31.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b64'
+down_revision: Union[str, None] = '4a7e2b9c1d53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = (
+    ('ix_objects_active_city_rooms_price_usd', ['city', 'rooms', 'price_usd']),
+    ('ix_objects_active_city_region_rooms_price_usd', ['city_region', 'rooms', 'price_usd']),
+    ('ix_objects_active_city_price_m2', ['city', 'price_m2']),
+    ('ix_objects_active_rooms_area', ['rooms', 'area']),
+)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(
+                name,
+                'objects',
+                columns,
+                postgresql_where=sa.text('active'),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in INDEXES:
+            op.drop_index(
+                name,
+                table_name='objects',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,74 @@
+"""Objects baseline
+
+Revision ID: 4a7e2b9c1d53
+Revises: da8671f6ec51
+Create Date: 2026-10-19 09:14:52.306118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a7e2b9c1d53'
+down_revision: Union[str, None] = 'da8671f6ec51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXED_COLUMNS = ('id', 'city', 'street', 'house_number', 'price_usd', 'price_m2', 'area')
+
+
+def upgrade() -> None:
+    # Databases created before migrations existed already have these tables
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('objects'):
+        op.create_table(
+            'objects',
+            sa.Column('id', sa.Uuid(), primary_key=True),
+            sa.Column('active', sa.Boolean(), nullable=False),
+            sa.Column('url', sa.String(length=500), nullable=False, unique=True),
+            sa.Column('title', sa.String(length=255), nullable=False),
+            sa.Column('description', sa.String(length=5000), nullable=True),
+            sa.Column('region', sa.String(length=60), nullable=False),
+            sa.Column('city', sa.String(length=60), nullable=False),
+            sa.Column('street', sa.String(length=60), nullable=False),
+            sa.Column('house_number', sa.String(length=5), nullable=False),
+            sa.Column('city_region', sa.String(length=60), nullable=True),
+            sa.Column('micro_region', sa.String(length=60), nullable=True),
+            sa.Column('latitude', sa.Numeric(10, 8), nullable=False),
+            sa.Column('longitude', sa.Numeric(10, 8), nullable=False),
+            sa.Column('price_byn', sa.Integer(), nullable=False),
+            sa.Column('price_usd', sa.Integer(), nullable=False),
+            sa.Column('price_m2', sa.Integer(), nullable=True),
+            sa.Column('build_type', sa.String(length=60), nullable=False),
+            sa.Column('year_of_build', sa.Integer(), nullable=False),
+            sa.Column('floor', sa.Integer(), nullable=True),
+            sa.Column('floors_numb', sa.Integer(), nullable=True),
+            sa.Column('rooms', sa.Integer(), nullable=False),
+            sa.Column('separated_rooms', sa.Integer(), nullable=False),
+            sa.Column('all_separated_rooms', sa.Boolean(), nullable=False),
+            sa.Column('area', sa.Numeric(6, 2), nullable=False),
+            sa.Column('living_area', sa.Numeric(6, 2), nullable=False),
+            sa.Column('kitchen_area', sa.Numeric(6, 2), nullable=False),
+            sa.Column('repair', sa.String(length=60), nullable=True),
+            sa.Column('balcony', sa.String(length=60), nullable=True),
+            sa.Column('number_balcony', sa.String(length=60), nullable=True),
+            sa.Column('bath', sa.String(length=20), nullable=True),
+        )
+        for column in INDEXED_COLUMNS:
+            op.create_index(f'ix_objects_{column}', 'objects', [column])
+    if not inspector.has_table('objects_photos'):
+        op.create_table(
+            'objects_photos',
+            sa.Column('photo_id_pk', sa.BigInteger(), primary_key=True),
+            sa.Column('object_id', sa.Uuid()),
+            sa.Column('url', sa.String(length=500)),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('objects_photos')
+    op.drop_table('objects')
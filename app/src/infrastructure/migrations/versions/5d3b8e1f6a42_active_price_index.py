@@ -0,0 +1,40 @@
+"""Active price index
+
+Revision ID: 5d3b8e1f6a42
+Revises: 9c1e5a7f3b28
+Create Date: 2026-10-18 23:41:08.512634
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d3b8e1f6a42'
+down_revision: Union[str, None] = '9c1e5a7f3b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_objects_active_price_usd',
+            'objects',
+            ['price_usd'],
+            postgresql_where=sa.text('active'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_objects_active_price_usd',
+            table_name='objects',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
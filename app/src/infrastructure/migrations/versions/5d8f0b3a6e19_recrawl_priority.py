@@ -0,0 +1,31 @@
+"""Recrawl priority
+
+Revision ID: 5d8f0b3a6e19
+Revises: c47a1e5f9d20
+Create Date: 2026-10-18 12:31:44.961853
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8f0b3a6e19'
+down_revision: Union[str, None] = 'c47a1e5f9d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'objects',
+        sa.Column('price_changes', sa.Integer(), nullable=False, server_default=sa.text('0'))
+    )
+    op.create_index('ix_fetch_states_checked_at', 'fetch_states', ['checked_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_fetch_states_checked_at', table_name='fetch_states')
+    op.drop_column('objects', 'price_changes')
@@ -0,0 +1,76 @@
+"""Objects geohash
+
+Revision ID: 7c3d5e9a1f82
+Revises: e2a6c81f4b37
+Create Date: 2026-10-18 15:22:40.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3d5e9a1f82'
+down_revision: Union[str, None] = 'e2a6c81f4b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+PRECISION = 9
+
+
+# Frozen copy of the geohash encoder, so later changes to app code cannot alter this migration
+def encode(latitude, longitude) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < PRECISION:
+        bounds, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+
+def upgrade() -> None:
+    op.add_column(
+        'objects',
+        sa.Column('geohash', sa.String(length=12, collation='C'), nullable=True)
+    )
+    connection = op.get_bind()
+    select = sa.text("""
+        SELECT id, latitude, longitude FROM objects
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL AND id > :after_id
+        ORDER BY id
+        LIMIT :limit;
+    """)
+    after_id = '00000000-0000-0000-0000-000000000000'
+    while rows := connection.execute(select, {"after_id": after_id, "limit": BATCH_SIZE}).fetchall():
+        connection.execute(
+            sa.text("UPDATE objects SET geohash = :geohash WHERE id = :id;"),
+            [{"id": row.id, "geohash": encode(row.latitude, row.longitude)} for row in rows]
+        )
+        after_id = rows[-1].id
+    op.create_index('ix_objects_geohash', 'objects', ['geohash'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_objects_geohash', table_name='objects')
+    op.drop_column('objects', 'geohash')
@@ -0,0 +1,34 @@
+"""Object version
+
+Revision ID: 8b2e4d91c0a7
+Revises: 3f1c9a7d2b64
+Create Date: 2026-10-18 11:04:52.730114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d91c0a7'
+down_revision: Union[str, None] = '3f1c9a7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'objects',
+        sa.Column('version', sa.Integer(), nullable=False, server_default=sa.text('1'))
+    )
+    op.add_column(
+        'objects',
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now())
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('objects', 'updated_at')
+    op.drop_column('objects', 'version')
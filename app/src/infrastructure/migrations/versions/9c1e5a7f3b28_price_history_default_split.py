@@ -0,0 +1,72 @@
+"""Price history default split
+
+Revision ID: 9c1e5a7f3b28
+Revises: 0e7b4c2a5d91
+Create Date: 2026-10-18 22:05:13.740219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1e5a7f3b28'
+down_revision: Union[str, None] = '0e7b4c2a5d91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows written to price_history_default before their month's partition
+    # existed would make a plain CREATE ... PARTITION OF fail, so they are
+    # moved out while the default partition is detached.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ensure_price_history_partition(month date) RETURNS void
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            month_start date := date_trunc('month', month)::date;
+            month_end date := (date_trunc('month', month) + interval '1 month')::date;
+            partition_name text := 'price_history_' || to_char(month_start, 'YYYY_MM');
+        BEGIN
+            IF to_regclass(partition_name) IS NOT NULL THEN
+                RETURN;
+            END IF;
+            LOCK TABLE price_history IN ACCESS EXCLUSIVE MODE;
+            IF to_regclass(partition_name) IS NOT NULL THEN
+                RETURN;
+            END IF;
+            ALTER TABLE price_history DETACH PARTITION price_history_default;
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF price_history FOR VALUES FROM (%L) TO (%L)',
+                partition_name,
+                month_start,
+                month_end
+            );
+            INSERT INTO price_history
+            SELECT * FROM price_history_default
+            WHERE observed_at >= month_start AND observed_at < month_end;
+            DELETE FROM price_history_default
+            WHERE observed_at >= month_start AND observed_at < month_end;
+            ALTER TABLE price_history ATTACH PARTITION price_history_default DEFAULT;
+        END;
+        $$;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ensure_price_history_partition(month date) RETURNS void
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            month_start date := date_trunc('month', month)::date;
+        BEGIN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF price_history FOR VALUES FROM (%L) TO (%L)',
+                'price_history_' || to_char(month_start, 'YYYY_MM'),
+                month_start,
+                (month_start + interval '1 month')::date
+            );
+        END;
+        $$;
+    """)
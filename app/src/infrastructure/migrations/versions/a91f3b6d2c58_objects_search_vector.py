@@ -0,0 +1,45 @@
+"""Objects search vector
+
+Revision ID: a91f3b6d2c58
+Revises: 7c3d5e9a1f82
+Create Date: 2026-10-18 16:45:03.337291
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a91f3b6d2c58'
+down_revision: Union[str, None] = '7c3d5e9a1f82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'objects',
+        sa.Column(
+            'search_vector',
+            TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('russian', coalesce(description, '')), 'B')",
+                persisted=True
+            )
+        )
+    )
+    op.create_index(
+        'ix_objects_search_vector',
+        'objects',
+        ['search_vector'],
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_objects_search_vector', table_name='objects')
+    op.drop_column('objects', 'search_vector')
@@ -0,0 +1,25 @@
+"""Objects updated_at index
+
+Revision ID: b5e07d4c9a13
+Revises: a91f3b6d2c58
+Create Date: 2026-10-18 18:02:27.640915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e07d4c9a13'
+down_revision: Union[str, None] = 'a91f3b6d2c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_objects_updated_at', 'objects', ['updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_objects_updated_at', table_name='objects')
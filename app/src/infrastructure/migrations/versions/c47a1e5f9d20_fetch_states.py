@@ -0,0 +1,33 @@
+"""Fetch states
+
+Revision ID: c47a1e5f9d20
+Revises: 8b2e4d91c0a7
+Create Date: 2026-10-18 11:48:07.205391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47a1e5f9d20'
+down_revision: Union[str, None] = '8b2e4d91c0a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'fetch_states',
+        sa.Column('url', sa.String(length=500), primary_key=True),
+        sa.Column('etag', sa.String(length=255), nullable=True),
+        sa.Column('last_modified', sa.String(length=64), nullable=True),
+        sa.Column('content_hash', sa.String(length=64), nullable=True),
+        sa.Column('checked_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('fetch_states')
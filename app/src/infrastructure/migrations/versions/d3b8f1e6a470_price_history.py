@@ -0,0 +1,60 @@
+"""Price history
+
+Revision ID: d3b8f1e6a470
+Revises: b5e07d4c9a13
+Create Date: 2026-10-18 19:26:51.173408
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3b8f1e6a470'
+down_revision: Union[str, None] = 'b5e07d4c9a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'price_history',
+        sa.Column('object_id', sa.Uuid(), nullable=False),
+        sa.Column('observed_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('price_usd', sa.Integer(), nullable=True),
+        sa.Column('price_byn', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['object_id'], ['objects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('object_id', 'observed_at'),
+        postgresql_partition_by='RANGE (observed_at)'
+    )
+    op.execute("CREATE TABLE price_history_default PARTITION OF price_history DEFAULT;")
+    op.execute("""
+        CREATE FUNCTION ensure_price_history_partition(month date) RETURNS void
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            month_start date := date_trunc('month', month)::date;
+        BEGIN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF price_history FOR VALUES FROM (%L) TO (%L)',
+                'price_history_' || to_char(month_start, 'YYYY_MM'),
+                month_start,
+                (month_start + interval '1 month')::date
+            );
+        END;
+        $$;
+    """)
+    op.execute("""
+        SELECT ensure_price_history_partition((date_trunc('month', now()) + make_interval(months => month))::date)
+        FROM generate_series(0, 2) AS month;
+    """)
+    op.execute("""
+        INSERT INTO price_history (object_id, observed_at, price_usd, price_byn)
+        SELECT id, updated_at, price_usd, price_byn FROM objects;
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('price_history')
+    op.execute("DROP FUNCTION ensure_price_history_partition(date);")
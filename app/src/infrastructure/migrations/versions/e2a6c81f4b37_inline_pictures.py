@@ -0,0 +1,55 @@
+"""Inline pictures
+
+Revision ID: e2a6c81f4b37
+Revises: 5d8f0b3a6e19
+Create Date: 2026-10-18 14:07:18.204716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a6c81f4b37'
+down_revision: Union[str, None] = '5d8f0b3a6e19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'objects',
+        sa.Column(
+            'pictures',
+            sa.ARRAY(sa.String(length=500)),
+            nullable=False,
+            server_default=sa.text("'{}'")
+        )
+    )
+    op.execute("""
+        UPDATE objects
+        SET pictures = photos.urls
+        FROM (
+            SELECT object_id, ARRAY_AGG(url ORDER BY photo_id_pk) AS urls
+            FROM objects_photos
+            GROUP BY object_id
+        ) photos
+        WHERE photos.object_id = objects.id;
+    """)
+    op.drop_table('objects_photos')
+
+
+def downgrade() -> None:
+    op.create_table(
+        'objects_photos',
+        sa.Column('photo_id_pk', sa.BigInteger(), primary_key=True),
+        sa.Column('object_id', sa.Uuid()),
+        sa.Column('url', sa.String(length=500)),
+    )
+    op.execute("""
+        INSERT INTO objects_photos (object_id, url)
+        SELECT id, unnest(pictures) FROM objects;
+    """)
+    op.drop_column('objects', 'pictures')
@@ -0,0 +1,59 @@
+"""Market stats
+
+Revision ID: f6c2a9d47e15
+Revises: d3b8f1e6a470
+Create Date: 2026-10-18 20:48:12.905362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6c2a9d47e15'
+down_revision: Union[str, None] = 'd3b8f1e6a470'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE MATERIALIZED VIEW market_stats AS
+        SELECT
+            GROUPING(city, city_region, rooms, build_type) AS grouping_set,
+            COALESCE(city, '') AS city,
+            COALESCE(city_region, '') AS city_region,
+            COALESCE(rooms, -1) AS rooms,
+            COALESCE(build_type, '') AS build_type,
+            count(*) AS listings,
+            avg(price_usd)::float8 AS avg_price_usd,
+            percentile_cont(0.25) WITHIN GROUP (ORDER BY price_usd) AS p25_price_usd,
+            percentile_cont(0.5) WITHIN GROUP (ORDER BY price_usd) AS median_price_usd,
+            percentile_cont(0.75) WITHIN GROUP (ORDER BY price_usd) AS p75_price_usd,
+            avg(price_m2)::float8 AS avg_price_m2,
+            percentile_cont(0.25) WITHIN GROUP (ORDER BY price_m2) AS p25_price_m2,
+            percentile_cont(0.5) WITHIN GROUP (ORDER BY price_m2) AS median_price_m2,
+            percentile_cont(0.75) WITHIN GROUP (ORDER BY price_m2) AS p75_price_m2,
+            now() AS refreshed_at
+        FROM (
+            SELECT
+                COALESCE(city, '') AS city,
+                COALESCE(city_region, '') AS city_region,
+                COALESCE(rooms, -1) AS rooms,
+                COALESCE(build_type, '') AS build_type,
+                price_usd,
+                price_m2
+            FROM objects
+            WHERE active
+        ) listing
+        GROUP BY CUBE (city, city_region, rooms, build_type);
+    """)
+    op.execute("""
+        CREATE UNIQUE INDEX ux_market_stats_key
+        ON market_stats (grouping_set, city, city_region, rooms, build_type);
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW market_stats;")
@@ -2,17 +2,57 @@
 
 from typing import Optional
 from decimal import Decimal
+from datetime import datetime
 
 import sqlalchemy as sa
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B')"
+)
 
 class Base(DeclarativeBase):
     pass
 
 class Object(Base):
     __tablename__ = "objects"
+    __table_args__ = (
+        sa.Index(
+            "ix_objects_active_city_rooms_price_usd",
+            "city", "rooms", "price_usd",
+            postgresql_where=sa.text("active"),
+        ),
+        sa.Index(
+            "ix_objects_active_city_region_rooms_price_usd",
+            "city_region", "rooms", "price_usd",
+            postgresql_where=sa.text("active"),
+        ),
+        sa.Index(
+            "ix_objects_active_city_price_m2",
+            "city", "price_m2",
+            postgresql_where=sa.text("active"),
+        ),
+        sa.Index(
+            "ix_objects_active_price_usd",
+            "price_usd",
+            postgresql_where=sa.text("active"),
+        ),
+        sa.Index(
+            "ix_objects_active_rooms_area",
+            "rooms", "area",
+            postgresql_where=sa.text("active"),
+        ),
+        sa.Index(
+            "ix_objects_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+    )
     id: Mapped[str] = mapped_column("id", sa.Uuid, primary_key=True, index=True)
     active: Mapped[bool] = mapped_column("active", sa.Boolean, nullable=False)
     url: Mapped[bool] = mapped_column("url", sa.String(length=500), unique=True)
@@ -43,10 +83,44 @@ class Object(Base):
     balcony: Mapped[Optional[str]] = mapped_column("balcony", sa.String(length=60), nullable=True)
     number_balcony: Mapped[Optional[str]] = mapped_column("number_balcony", sa.String(length=60), nullable=True)
     bath: Mapped[str] = mapped_column("bath", sa.String(length=20), nullable=True)
+    geohash: Mapped[Optional[str]] = mapped_column(
+        "geohash", sa.String(length=12, collation="C"), nullable=True, index=True
+    )
+    search_vector: Mapped[str] = mapped_column(
+        "search_vector",
+        TSVECTOR,
+        sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+    )
+    pictures: Mapped[list[str]] = mapped_column(
+        "pictures", sa.ARRAY(sa.String(length=500)), nullable=False, server_default=sa.text("'{}'")
+    )
+    price_changes: Mapped[int] = mapped_column("price_changes", sa.Integer, nullable=False, server_default=sa.text("0"))
+    version: Mapped[int] = mapped_column("version", sa.Integer, nullable=False, server_default=sa.text("1"))
+    updated_at: Mapped[datetime] = mapped_column(
+        "updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now(), index=True
+    )
+
+
+class FetchState(Base):
+    __tablename__ = "fetch_states"
+    url: Mapped[str] = mapped_column("url", sa.String(length=500), primary_key=True)
+    etag: Mapped[Optional[str]] = mapped_column("etag", sa.String(length=255), nullable=True)
+    last_modified: Mapped[Optional[str]] = mapped_column("last_modified", sa.String(length=64), nullable=True)
+    content_hash: Mapped[Optional[str]] = mapped_column("content_hash", sa.String(length=64), nullable=True)
+    checked_at: Mapped[datetime] = mapped_column(
+        "checked_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now(), index=True
+    )
+    failures: Mapped[int] = mapped_column("failures", sa.Integer, nullable=False, server_default=sa.text("0"))
 
 
-class Photos(Base):
-    __tablename__ = "objects_photos"
-    photo_id: Mapped[int] = mapped_column("photo_id_pk", sa.BigInteger, primary_key=True)
-    object_id: Mapped[str] = mapped_column("object_id", sa.Uuid)
-    url: Mapped[str] = mapped_column("url", sa.String(length=500))
\ No newline at end of file
+class PriceHistory(Base):
+    __tablename__ = "price_history"
+    __table_args__ = {"postgresql_partition_by": "RANGE (observed_at)"}
+    object_id: Mapped[str] = mapped_column(
+        "object_id", sa.Uuid, sa.ForeignKey("objects.id", ondelete="CASCADE"), primary_key=True
+    )
+    observed_at: Mapped[datetime] = mapped_column(
+        "observed_at", sa.DateTime(timezone=True), primary_key=True, server_default=sa.func.now()
+    )
+    price_usd: Mapped[Optional[int]] = mapped_column("price_usd", sa.Integer, nullable=True)
+    price_byn: Mapped[Optional[int]] = mapped_column("price_byn", sa.Integer, nullable=True)
\ No newline at end of file
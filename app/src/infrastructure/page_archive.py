@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import hashlib
+import mmap
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from app.src.application import interfaces
+
+
+_ITER_BATCH_SIZE = 1000
+
+
+def _compressor(codec: str):
+    if codec == 'gzip':
+        return lambda data: gzip.compress(data, compresslevel=6)
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("ARCHIVE_CODEC=zstd requires the zstandard package")
+        return zstandard.ZstdCompressor(level=6).compress
+    raise ValueError(f"Unknown archive codec: {codec}")
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == 'gzip':
+        return gzip.decompress(data)
+    if zstandard is None:
+        raise RuntimeError("Reading zstd pages requires the zstandard package")
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+class NullPageArchive(interfaces.PageArchive):
+
+    def put(self, url: str, body: bytes, fetched_at: Optional[float] = None) -> str:
+        return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    def get(self, url: str, at: Optional[float] = None) -> Optional[bytes]:
+        return None
+
+    def iter_pages(self, latest: bool = False) -> Iterator[tuple[str, float, bytes]]:
+        return iter(())
+
+    def close(self) -> None:
+        pass
+
+
+class PageArchive(interfaces.PageArchive):
+
+    def __init__(self, directory: str, codec: str = 'gzip', segment_size: int = 256 * 1024 * 1024) -> None:
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._codec = codec
+        self._compress = _compressor(codec)
+        self._segment_size = segment_size
+        self._lock = threading.Lock()
+        self._maps: dict[int, mmap.mmap] = {}
+        self._index = sqlite3.connect(self._directory / 'index.sqlite3', check_same_thread=False)
+        self._index.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                segment INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                hash TEXT NOT NULL,
+                PRIMARY KEY (url, fetched_at)
+            );
+        """)
+        row = self._index.execute("SELECT MAX(segment) FROM blobs").fetchone()
+        self._segment = row[0] or 0
+
+    def _segment_path(self, segment: int) -> Path:
+        return self._directory / f'segment-{segment:05d}.bin'
+
+    def put(self, url: str, body: bytes, fetched_at: Optional[float] = None) -> str:
+        content_hash = hashlib.blake2b(body, digest_size=16).hexdigest()
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock:
+            known = self._index.execute(
+                "SELECT 1 FROM blobs WHERE hash = ?", (content_hash,)
+            ).fetchone()
+            if known is None:
+                compressed = self._compress(body)
+                path = self._segment_path(self._segment)
+                if path.exists() and path.stat().st_size + len(compressed) > self._segment_size:
+                    self._segment += 1
+                    path = self._segment_path(self._segment)
+                with open(path, 'ab') as segment_file:
+                    offset = segment_file.tell()
+                    segment_file.write(compressed)
+                self._index.execute(
+                    "INSERT INTO blobs (hash, codec, segment, offset, length) VALUES (?, ?, ?, ?, ?)",
+                    (content_hash, self._codec, self._segment, offset, len(compressed))
+                )
+            self._index.execute(
+                "INSERT OR IGNORE INTO pages (url, fetched_at, hash) VALUES (?, ?, ?)",
+                (url, fetched_at, content_hash)
+            )
+            self._index.commit()
+        return content_hash
+
+    def get(self, url: str, at: Optional[float] = None) -> Optional[bytes]:
+        with self._lock:
+            row = self._index.execute("""
+                SELECT blobs.codec, blobs.segment, blobs.offset, blobs.length
+                FROM pages JOIN blobs ON blobs.hash = pages.hash
+                WHERE pages.url = ? AND pages.fetched_at <= ?
+                ORDER BY pages.fetched_at DESC
+                LIMIT 1
+            """, (url, float('inf') if at is None else at)).fetchone()
+        return self._read(*row) if row else None
+
+    def iter_pages(self, latest: bool = False) -> Iterator[tuple[str, float, bytes]]:
+        with self._lock:
+            cursor = self._index.execute("""
+                SELECT pages.url, pages.fetched_at, blobs.codec, blobs.segment, blobs.offset, blobs.length
+                FROM pages JOIN blobs ON blobs.hash = pages.hash
+                WHERE NOT ? OR pages.fetched_at = (
+                    SELECT MAX(newer.fetched_at) FROM pages newer WHERE newer.url = pages.url
+                )
+                ORDER BY blobs.segment, blobs.offset
+            """, (latest,))
+        try:
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany(_ITER_BATCH_SIZE)
+                if not rows:
+                    return
+                for url, fetched_at, codec, segment, offset, length in rows:
+                    yield url, fetched_at, self._read(codec, segment, offset, length)
+        finally:
+            with self._lock:
+                cursor.close()
+
+    def _read(self, codec: str, segment: int, offset: int, length: int) -> bytes:
+        with self._lock:
+            segment_map = self._maps.get(segment)
+            if segment_map is None or len(segment_map) < offset + length:
+                if segment_map is not None:
+                    segment_map.close()
+                with open(self._segment_path(segment), 'rb') as segment_file:
+                    segment_map = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[segment] = segment_map
+            # Copied out under the lock, so no view outlives a map that a later read replaces
+            compressed = segment_map[offset:offset + length]
+        return _decompress(codec, compressed)
+
+    def close(self) -> None:
+        with self._lock:
+            for segment_map in self._maps.values():
+                segment_map.close()
+            self._maps.clear()
+            self._index.close()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit
+
+from app.src.application import interfaces
+from app.src.application import dto
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostThrottle:
+
+    def __init__(self, host: str, settings: dto.FetchSettings) -> None:
+        self.host = host
+        self._settings = settings
+        self.rate = settings.initial_rate
+        self.concurrency = float(settings.initial_concurrency)
+        self.in_flight = 0
+        self.throttled = 0
+        self._tokens = float(settings.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self) -> 'HostThrottle':
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < max(1, int(self.concurrency)))
+            self.in_flight += 1
+        try:
+            await self._take_token()
+        except BaseException:
+            await self._release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._release()
+
+    async def _release(self) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    async def _take_token(self) -> None:
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            self._tokens = min(self._settings.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def on_success(self) -> None:
+        self.rate = min(self._settings.max_rate, self.rate + 1 / max(self.rate, 1))
+        self.concurrency = min(
+            self._settings.max_concurrency,
+            self.concurrency + 1 / max(self.concurrency, 1)
+        )
+
+    def on_throttle(self, retry_after: Optional[float]) -> None:
+        self.throttled += 1
+        self.rate = max(self._settings.min_rate, self.rate / 2)
+        self.concurrency = max(1.0, self.concurrency / 2)
+        if retry_after is not None:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def stats(self) -> dto.HostFetchStats:
+        return dto.HostFetchStats(
+            host=self.host,
+            rate=round(self.rate, 3),
+            concurrency=int(self.concurrency),
+            in_flight=self.in_flight,
+            throttled=self.throttled
+        )
+
+
+class FetchThrottle(interfaces.FetchStats):
+
+    def __init__(self, settings: dto.FetchSettings) -> None:
+        self.settings = settings
+        self._hosts: dict[str, HostThrottle] = {}
+
+    def for_url(self, url: str) -> HostThrottle:
+        host = urlsplit(url).hostname or ''
+        if (throttle := self._hosts.get(host)) is None:
+            throttle = self._hosts[host] = HostThrottle(host, self.settings)
+        return throttle
+
+    def backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        delay = random.uniform(0, min(self.settings.backoff_max, self.settings.backoff_base * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    def stats(self) -> list[dto.HostFetchStats]:
+        return [throttle.stats() for throttle in self._hosts.values()]
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Iterator, Optional
+
+
+logger = logging.getLogger(__name__)
+
+Converter = Callable[[str], dict[str, Any]]
+
+UNKNOWN_LABELS: Counter[str] = Counter()
+
+# Extractions running in worker processes count into their own Counter and hand it back
+_unknown_labels: ContextVar[Counter[str]] = ContextVar('unknown_labels', default=UNKNOWN_LABELS)
+
+
+def _text(field: str) -> Converter:
+    return lambda value: {field: value}
+
+
+def _integer(field: str) -> Converter:
+    return lambda value: {field: int(value)}
+
+
+def _area(field: str) -> Converter:
+    return lambda value: {
+        field: Decimal(re.sub(r'[^\d.]', '', value) or '0').quantize(Decimal('1.00'))
+    }
+
+
+def _floors(value: str) -> dict[str, Any]:
+    floor, floors_numb = (int(part.strip()) for part in value.split('/'))
+    return {"floor": floor, "floors_numb": floors_numb}
+
+
+def _coordinates(value: str) -> dict[str, Any]:
+    latitude, longitude = (part.strip() for part in value.split(','))
+    return {
+        "latitude": Decimal(latitude).quantize(Decimal('1.0000000')),
+        "longitude": Decimal(longitude).quantize(Decimal('1.0000000')),
+    }
+
+
+LISTING_LABELS: dict[str, Converter] = {
+    "этаж / этажность": _floors,
+    "количество комнат": _integer("rooms"),
+    "раздельных комнат": _integer("separated_rooms"),
+    "тип дома": _text("build_type"),
+    "год постройки": _integer("year_of_build"),
+    "площадь общая": _area("area"),
+    "площадь жилая": _area("living_area"),
+    "площадь кухни": _area("kitchen_area"),
+    "санузел": _text("bath"),
+    "балкон": _text("balcony"),
+    "ремонт": _text("repair"),
+    "номер дома": _text("house_number"),
+    "улица": _text("street"),
+    "область": _text("region"),
+    "населенный пункт": _text("city"),
+    "район города": _text("city_region"),
+    "микрорайон": _text("micro_region"),
+    "координаты": _coordinates,
+}
+
+
+@lru_cache(maxsize=4096)
+def _resolve(label: str) -> Optional[Converter]:
+    normalized = ' '.join(label.replace('ё', 'е').replace('Ё', 'Е').split()).lower()
+    converter = LISTING_LABELS.get(normalized)
+    if converter is None:
+        logger.warning("Unknown listing label: %r", label)
+    return converter
+
+
+def convert_labels(labels: dict[str, str]) -> dict[str, Any]:
+    fields: dict[str, Any] = {}
+    for label, value in labels.items():
+        if (converter := _resolve(label)) is None:
+            _unknown_labels.get()[label] += 1
+            continue
+        fields.update(converter(value))
+    return fields
+
+
+@contextmanager
+def collect_unknown_labels() -> Iterator[Counter[str]]:
+    unknown: Counter[str] = Counter()
+    token = _unknown_labels.set(unknown)
+    try:
+        yield unknown
+    finally:
+        _unknown_labels.reset(token)
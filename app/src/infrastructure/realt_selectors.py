@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+import json
+import re
+from dataclasses import dataclass, fields
+from typing import Optional
+
+from lxml import etree
+
+
+LISTING_SELECTORS: dict[str, str] = {
+    "title": "//h1",
+    "price_byn": "//h2[{class:text-h2}]",
+    "price_usd": "//span[{class:text-subhead}]",
+    "params": "//ul[{class:w-full} and {class:-my-1}]/li",
+    "param_label": ".//span",
+    "param_value": ".//p",
+    "description": (
+        "//section[@class='bg-white flex flex-wrap md:p-6 my-4 rounded-md']"
+        "//div[{class:description_wrapper__tlUQE}]"
+    ),
+    "photos": "(//div[{class:swiper-wrapper}])[1]//img/@src",
+    "geo": "//ul[@class='w-full mb-0.5 -my-1']//li[@class='relative py-1']",
+    "geo_label": ".//span[{class:text-basic}]",
+    "geo_link": ".//a",
+    "geo_value": ".//p",
+}
+
+LISTING_SECTIONS: dict[str, str] = {
+    "title": "self::h1",
+    "prices": "self::h2[{class:text-h2}]",
+    "price_usd": "self::span[{class:text-subhead}]",
+    "params": "self::ul[{class:w-full} and {class:-my-1} and not({class:mb-0.5})]",
+    "description": "self::section[@class='bg-white flex flex-wrap md:p-6 my-4 rounded-md']",
+    "photos": "self::div[{class:swiper-wrapper}]",
+    "geo": "self::ul[@class='w-full mb-0.5 -my-1']",
+}
+
+_CLASS_TOKEN = re.compile(r'\{class:([^}]+)\}')
+_SECTION_TAG = re.compile(r'^self::([\w-]+)')
+
+
+def _expand(selector: str) -> str:
+    return _CLASS_TOKEN.sub(
+        lambda match: f"contains(concat(' ', normalize-space(@class), ' '), ' {match.group(1)} ')",
+        selector
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class SelectorPlan:
+    title: etree.XPath
+    price_byn: etree.XPath
+    price_usd: etree.XPath
+    params: etree.XPath
+    param_label: etree.XPath
+    param_value: etree.XPath
+    description: etree.XPath
+    photos: etree.XPath
+    geo: etree.XPath
+    geo_label: etree.XPath
+    geo_link: etree.XPath
+    geo_value: etree.XPath
+    sections: tuple[tuple[str, etree.XPath], ...] = ()
+
+    @classmethod
+    def compile(cls, selectors: dict[str, str], sections: dict[str, str]) -> "SelectorPlan":
+        compiled_sections = []
+        for name, section in sections.items():
+            if (tag := _SECTION_TAG.match(section)) is None:
+                raise ValueError(f"Listing section {name!r} must start with self::<tag>")
+            compiled_sections.append((tag.group(1), etree.XPath(_expand(section))))
+        return cls(
+            sections=tuple(compiled_sections),
+            **{
+                spec.name: etree.XPath(_expand(selectors[spec.name]))
+                for spec in fields(cls)
+                if spec.name in selectors
+            }
+        )
+
+
+def load_selector_plan(path: Optional[str] = None) -> SelectorPlan:
+    selectors = dict(LISTING_SELECTORS)
+    sections = dict(LISTING_SECTIONS)
+    if path is not None:
+        with open(path, encoding='utf-8') as source:
+            overrides = json.load(source)
+        sections.update(overrides.pop('sections', {}))
+        unknown = overrides.keys() - selectors.keys()
+        if unknown:
+            raise ValueError(f"Unknown listing selectors: {', '.join(sorted(unknown))}")
+        selectors.update(overrides)
+    return SelectorPlan.compile(selectors, sections)
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import logging
+import math
+
+from app.src.application import interfaces
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = capacity
+        self.count = 0
+        self._size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def _positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self._size for i in range(self._hashes)]
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class SeenUrlFilter(interfaces.SeenUrls):
+    # Scalable Bloom filter: once a stage is full a larger one with a tighter error rate is
+    # added, so the overall false positive rate stays below error_rate as the table grows
+    _GROWTH = 2
+    _TIGHTENING = 0.5
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self._error_rate = error_rate * (1 - self._TIGHTENING)
+        self._stages = [BloomFilter(capacity, self._error_rate)]
+
+    def contains(self, url: str) -> bool:
+        return any(url in stage for stage in self._stages)
+
+    def add(self, url: str) -> None:
+        if self.contains(url):
+            return
+        stage = self._stages[-1]
+        if stage.count >= stage.capacity:
+            stage = BloomFilter(
+                stage.capacity * self._GROWTH,
+                self._error_rate * self._TIGHTENING ** len(self._stages)
+            )
+            self._stages.append(stage)
+            logger.info(
+                "Seen URL filter over capacity, added stage %d for %d URLs",
+                len(self._stages), stage.capacity
+            )
+        stage.add(url)
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from typing import AsyncIterable
+from typing import AsyncIterable, Iterable
 from uuid import uuid4
 
 from aiohttp import ClientSession
@@ -11,18 +11,50 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.src.config import Config, AppConfig
 from app.src.application import interfaces
+from app.src.application import dto
 from app.src.application.interactors import (
     SaveObjectInteractor,
     GetObjectInteractor,
     UpdateObjectInteractor,
+    RefreshObjectInteractor,
     DeleteObjectInteractor,
     FindObjectsInteractor,
-    DataParserInteractor
+    FindNearbyObjectsInteractor,
+    StreamObjectsInteractor,
+    DataParserInteractor,
+    BatchIngestInteractor,
+    SearchCacheStatsInteractor,
+    FindStaleObjectsInteractor,
+    DiscoverListingsInteractor,
+    FetchStatsInteractor,
+    ExtractionStatsInteractor,
+    GetPriceHistoryInteractor,
+    PreparePriceHistoryInteractor,
+    MarketStatsInteractor,
+    RefreshMarketStatsInteractor,
+    RefreshAnalyticsInteractor,
+    MarketAggregateInteractor,
+    MarketHistogramInteractor,
+    AnalyticsStatsInteractor
 )
 from app.src.infrastructure.database import new_session_maker
-from app.src.infrastructure.requests_sessions import SessionManager
-from app.src.infrastructure.gateways import ObjectsGateway
-from app.src.infrastructure.extractor_gateway import DataExtracorGateway, HttpParserGateway
+from app.src.infrastructure.requests_sessions import new_client_session
+from app.src.infrastructure.executors import ExtractionExecutor
+from app.src.infrastructure.cache import SearchCache, ObjectCache
+from app.src.infrastructure.seen_filter import SeenUrlFilter
+from app.src.infrastructure.rate_limit import FetchThrottle
+from app.src.infrastructure.page_archive import PageArchive, NullPageArchive
+from app.src.infrastructure.gateways import (
+    ObjectsGateway,
+    FetchStateGateway,
+    PriceHistoryGateway,
+    MarketStatsGateway
+)
+from app.src.infrastructure.extractor_gateway import (
+    DataExtracorGateway,
+    HttpParserGateway,
+    configure_extractor
+)
 
 
 class AppProvider(Provider):
@@ -62,46 +94,229 @@ class AppProvider(Provider):
             yield session
 
     @provide(scope=Scope.APP)
-    def get_reuest_session_maker(
-        self
-    ) -> SessionManager:
-        return SessionManager()
-
-    @provide(scope=Scope.REQUEST)
     async def get_client_session(
         self,
-        session_maker: SessionManager
+        config: Config
     ) -> AsyncIterable[ClientSession]:
-        async with session_maker.manage_sessions() as session:
+        async with new_client_session(config.http_client_config) as session:
             yield session
 
+    @provide(scope=Scope.APP)
+    def get_extraction_executor(
+        self,
+        config: Config
+    ) -> Iterable[ExtractionExecutor]:
+        executor = ExtractionExecutor(
+            config.extractor_config,
+            configure_extractor,
+            (config.extractor_config.selectors_path,)
+        )
+        yield executor
+        executor.shutdown()
+
+    @provide(scope=Scope.APP)
+    def get_fetch_throttle(self, config: Config) -> AnyOf[FetchThrottle, interfaces.FetchStats]:
+        return FetchThrottle(
+            dto.FetchSettings(
+                initial_rate=config.fetch_config.initial_rate,
+                min_rate=config.fetch_config.min_rate,
+                max_rate=config.fetch_config.max_rate,
+                burst=config.fetch_config.burst,
+                initial_concurrency=config.fetch_config.initial_concurrency,
+                max_concurrency=config.fetch_config.max_concurrency,
+                max_retries=config.fetch_config.max_retries,
+                backoff_base=config.fetch_config.backoff_base,
+                backoff_max=config.fetch_config.backoff_max
+            )
+        )
+
+    @provide(scope=Scope.APP)
+    def get_page_archive(self, config: Config) -> Iterable[interfaces.PageArchive]:
+        if config.archive_config.directory:
+            archive = PageArchive(
+                directory=config.archive_config.directory,
+                codec=config.archive_config.codec,
+                segment_size=config.archive_config.segment_size
+            )
+        else:
+            archive = NullPageArchive()
+        yield archive
+        archive.close()
+
+    @provide(scope=Scope.APP)
+    def get_parse_settings(self, config: Config) -> dto.ParseSettings:
+        return dto.ParseSettings(streaming=config.fetch_config.streaming)
+
+    @provide(scope=Scope.APP)
+    def get_ingest_settings(self, config: Config) -> dto.IngestSettings:
+        return dto.IngestSettings(
+            fetch_workers=config.ingest_config.fetch_workers,
+            parse_workers=config.ingest_config.parse_workers,
+            queue_size=config.ingest_config.queue_size,
+            persist_batch_size=config.ingest_config.persist_batch_size
+        )
+
+    @provide(scope=Scope.APP)
+    def get_search_settings(self, config: Config) -> dto.SearchSettings:
+        return dto.SearchSettings(
+            default_page_size=config.search_config.default_page_size,
+            max_page_size=config.search_config.max_page_size,
+            stream_batch_size=config.search_config.stream_batch_size
+        )
+
+    @provide(scope=Scope.APP)
+    def get_search_cache(self, config: Config) -> interfaces.SearchCache:
+        return SearchCache(
+            maxsize=config.search_config.cache_size,
+            ttl=config.search_config.cache_ttl
+        )
+
+    @provide(scope=Scope.APP)
+    def get_object_cache(self, config: Config) -> interfaces.ObjectCache:
+        return ObjectCache(
+            maxsize=config.object_cache_config.size,
+            ttl=config.object_cache_config.ttl
+        )
+
+    @provide(scope=Scope.APP)
+    def get_recrawl_settings(self, config: Config) -> dto.RecrawlSettings:
+        return dto.RecrawlSettings(
+            interval=config.recrawl_config.interval,
+            batch_size=config.recrawl_config.batch_size,
+            concurrency=config.recrawl_config.concurrency,
+            min_age=config.recrawl_config.min_age
+        )
+
+    @provide(scope=Scope.APP)
+    def get_analytics_settings(self, config: Config) -> dto.AnalyticsSettings:
+        return dto.AnalyticsSettings(
+            interval=config.analytics_config.interval,
+            batch_size=config.analytics_config.batch_size,
+            lag=config.analytics_config.lag
+        )
+
+    @provide(scope=Scope.APP)
+    def get_market_stats_settings(self, config: Config) -> dto.MarketStatsSettings:
+        return dto.MarketStatsSettings(interval=config.market_stats_config.interval)
+
+    @provide(scope=Scope.APP)
+    def get_price_history_settings(self, config: Config) -> dto.PriceHistorySettings:
+        return dto.PriceHistorySettings(
+            interval=config.price_history_config.interval,
+            months_ahead=config.price_history_config.months_ahead
+        )
+
+    @provide(scope=Scope.APP)
+    def get_market_analytics(self) -> interfaces.MarketAnalytics:
+        # numpy is only imported once analytics are actually requested
+        from app.src.infrastructure.analytics import ColumnarSnapshot
+
+        return ColumnarSnapshot()
+
+    @provide(scope=Scope.APP)
+    def get_discovery_settings(self, config: Config) -> dto.DiscoverySettings:
+        return dto.DiscoverySettings(
+            search_url=config.discovery_config.search_url,
+            link_pattern=config.discovery_config.link_pattern,
+            max_pages=config.discovery_config.max_pages
+        )
+
+    @provide(scope=Scope.APP)
+    async def get_seen_urls(
+        self,
+        config: Config,
+        session_maker: async_sessionmaker[AsyncSession]
+    ) -> interfaces.SeenUrls:
+        seen_urls = SeenUrlFilter(
+            capacity=config.discovery_config.bloom_capacity,
+            error_rate=config.discovery_config.bloom_error_rate
+        )
+        async with session_maker() as session:
+            async for url in ObjectsGateway(session).iter_urls():
+                seen_urls.add(url)
+        return seen_urls
+
     parser_gateway = provide(
         HttpParserGateway,
         scope=Scope.REQUEST,
-        provides=interfaces.HttpParser
+        provides=AnyOf[interfaces.HttpParser, interfaces.StreamingParser]
     )
 
     object_gateway = provide(
         ObjectsGateway,
         scope=Scope.REQUEST,
         provides=AnyOf[
-            interfaces.SaveObject, 
+            interfaces.SaveObjects,
             interfaces.ReadObject, 
+            interfaces.ReadObjectUrls,
             interfaces.FindObjects,
-            interfaces.UpdateObject,
+            interfaces.FindNearbyObjects,
+            interfaces.StreamObjects,
+            interfaces.UpsertObject,
+            interfaces.DeactivateObject,
+            interfaces.FindStaleObjects,
+            interfaces.StreamChangedObjects,
             interfaces.DeleteObject
         ]
     )
 
+    fetch_state_gateway = provide(
+        FetchStateGateway,
+        scope=Scope.REQUEST,
+        provides=AnyOf[
+            interfaces.ReadFetchState,
+            interfaces.SaveFetchState
+        ]
+    )
+
+    price_history_gateway = provide(
+        PriceHistoryGateway,
+        scope=Scope.REQUEST,
+        provides=AnyOf[
+            interfaces.ReadPriceHistory,
+            interfaces.PriceHistoryPartitions
+        ]
+    )
+
+    market_stats_gateway = provide(
+        MarketStatsGateway,
+        scope=Scope.REQUEST,
+        provides=AnyOf[
+            interfaces.ReadMarketStats,
+            interfaces.RefreshMarketStats
+        ]
+    )
+
     extractor_gateway = provide(
         DataExtracorGateway,
         scope=Scope.REQUEST,
-        provides=interfaces.DataExtractor
+        provides=AnyOf[
+            interfaces.DataExtractor,
+            interfaces.LinkExtractor,
+            interfaces.ExtractionStats
+        ]
     )
 
     parse_object_data = provide(DataParserInteractor, scope=Scope.REQUEST)
     get_object_interactor = provide(GetObjectInteractor, scope=Scope.REQUEST)
     create_new_object_interactor = provide(SaveObjectInteractor, scope=Scope.REQUEST)
     update_object_interactor = provide(UpdateObjectInteractor, scope=Scope.REQUEST)
+    refresh_object_interactor = provide(RefreshObjectInteractor, scope=Scope.REQUEST)
     delete_object_interactor = provide(DeleteObjectInteractor, scope=Scope.REQUEST)
-    find_objects_interactor = provide(FindObjectsInteractor, scope=Scope.REQUEST)
\ No newline at end of file
+    find_objects_interactor = provide(FindObjectsInteractor, scope=Scope.REQUEST)
+    find_nearby_objects_interactor = provide(FindNearbyObjectsInteractor, scope=Scope.REQUEST)
+    stream_objects_interactor = provide(StreamObjectsInteractor, scope=Scope.REQUEST)
+    batch_ingest_interactor = provide(BatchIngestInteractor, scope=Scope.REQUEST)
+    search_cache_stats_interactor = provide(SearchCacheStatsInteractor, scope=Scope.REQUEST)
+    find_stale_objects_interactor = provide(FindStaleObjectsInteractor, scope=Scope.REQUEST)
+    discover_listings_interactor = provide(DiscoverListingsInteractor, scope=Scope.REQUEST)
+    fetch_stats_interactor = provide(FetchStatsInteractor, scope=Scope.REQUEST)
+    extraction_stats_interactor = provide(ExtractionStatsInteractor, scope=Scope.REQUEST)
+    refresh_analytics_interactor = provide(RefreshAnalyticsInteractor, scope=Scope.REQUEST)
+    market_aggregate_interactor = provide(MarketAggregateInteractor, scope=Scope.REQUEST)
+    market_histogram_interactor = provide(MarketHistogramInteractor, scope=Scope.REQUEST)
+    analytics_stats_interactor = provide(AnalyticsStatsInteractor, scope=Scope.REQUEST)
+    get_price_history_interactor = provide(GetPriceHistoryInteractor, scope=Scope.REQUEST)
+    prepare_price_history_interactor = provide(PreparePriceHistoryInteractor, scope=Scope.REQUEST)
+    market_stats_interactor = provide(MarketStatsInteractor, scope=Scope.REQUEST)
+    refresh_market_stats_interactor = provide(RefreshMarketStatsInteractor, scope=Scope.REQUEST)
\ No newline at end of file
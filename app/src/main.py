@@ -1,21 +1,55 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from typing import AsyncIterator
+from contextlib import asynccontextmanager
+
 from dishka import make_async_container
 from dishka.integrations import fastapi as fastapi_integration
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
 from app.src.config import Config
+from app.src.application import dto
+from app.src.application import interfaces
 from app.src.controllers.http import Controllers
+from app.src.controllers.scheduler import (
+    AnalyticsRefresher,
+    MarketStatsRefresher,
+    PriceHistoryPartitioner,
+    RecrawlScheduler
+)
 from app.src.ioc import AppProvider
 
 
 config = Config()
 container = make_async_container(AppProvider(), context={Config: config})
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    await container.get(interfaces.SeenUrls)
+    partitioner = PriceHistoryPartitioner(container, await container.get(dto.PriceHistorySettings))
+    partitioner.start()
+    scheduler = RecrawlScheduler(container, await container.get(dto.RecrawlSettings))
+    if config.recrawl_config.enabled:
+        scheduler.start()
+    analytics = AnalyticsRefresher(container, await container.get(dto.AnalyticsSettings))
+    if config.analytics_config.enabled:
+        analytics.start()
+    market_stats = MarketStatsRefresher(container, await container.get(dto.MarketStatsSettings))
+    if config.market_stats_config.enabled:
+        market_stats.start()
+    yield
+    await market_stats.stop()
+    await analytics.stop()
+    await scheduler.stop()
+    await partitioner.stop()
+    await container.close()
+
+
 def get_fastapi_app() -> FastAPI:
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
     app.mount("/static", StaticFiles(directory="static"), name="static")
     controller = Controllers()
     app.include_router(controller.router)
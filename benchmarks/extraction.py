@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+"""Pages per second of the listing extractor on listing pages.
+
+Usage: python -m benchmarks.extraction [fixtures_dir] [--repeat N]
+
+The "before" column runs the former BeautifulSoup extractor kept in
+benchmarks.baseline; both extractors must agree on every page before they
+are timed. Defaults to the pages committed in benchmarks/fixtures. Those are
+synthetic: realt.by's markup for the extracted sections, padded with inline
+CSS, scripts and SVG to the size of a live page. Their numbers are relative;
+pass a directory of saved pages for figures that match production.
+"""
+
+import argparse
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable
+
+from app.src.domain import entities
+from app.src.infrastructure.extractor_gateway import extract_object
+from benchmarks.baseline import BaselineExtractor
+
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+Extractor = Callable[[str, str], entities.ObjectDm]
+
+
+def load_pages(fixtures_dir: Path) -> list[tuple[str, str]]:
+    return [
+        (path.name, path.read_text(encoding='utf-8'))
+        for path in sorted(fixtures_dir.glob('*.html'))
+    ]
+
+
+def check_agreement(pages: list[tuple[str, str]], baseline: Extractor, current: Extractor) -> list[str]:
+    mismatches = []
+    for name, data in pages:
+        before = asdict(baseline(data, name))
+        after = asdict(current(data, name))
+        fields = [field for field in before if before[field] != after[field]]
+        if fields:
+            mismatches.append(f"{name}: {', '.join(fields)}")
+    return mismatches
+
+
+def bench(extract: Extractor, pages: list[tuple[str, str]], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for name, data in pages:
+            extract(data, name)
+    return len(pages) * repeat / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('fixtures_dir', type=Path, nargs='?', default=FIXTURES_DIR)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    pages = load_pages(args.fixtures_dir)
+    if not pages:
+        parser.error(f'no *.html fixtures in {args.fixtures_dir}')
+    baseline_extractor = BaselineExtractor().extract_data
+    if mismatches := check_agreement(pages, baseline_extractor, extract_object):
+        parser.exit(1, 'extractors disagree:\n  ' + '\n  '.join(mismatches) + '\n')
+    baseline = bench(baseline_extractor, pages, args.repeat)
+    current = bench(extract_object, pages, args.repeat)
+    print(f'pages: {len(pages)} x {args.repeat}')
+    print(f'before (BeautifulSoup, 6 parses/page): {baseline:10.1f} pages/s')
+    print(f'after  (lxml, 1 parse/page):           {current:10.1f} pages/s')
+    print(f'speedup: {current / baseline:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
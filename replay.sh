@@ -0,0 +1,5 @@
+#!/bin/bash
+# -*- coding: utf-8 -*-
+
+export $(grep -v '^#' .env | xargs)
+python -m app.src.cli "$@"
\ No newline at end of file
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+from decimal import Decimal
+from uuid import uuid4
+
+from app.src.domain.entities import ObjectDm
+
+
+def make_object(**fields) -> ObjectDm:
+    object_id = str(uuid4())
+    values = dict(
+        id=object_id,
+        url=f'https://realt.by/sale-flats/object/{object_id}/',
+        region='Минская область',
+        city='Минск',
+        street='Притыцкого',
+        house_number='1',
+        latitude=Decimal('53.9080000'),
+        longitude=Decimal('27.4820000'),
+        price_byn=200000,
+        price_usd=60000,
+        price_m2=1200,
+        build_type='панельный',
+        year_of_build=1985,
+        rooms=2,
+        separated_rooms=2,
+        all_separated_rooms=True,
+        bath='раздельный',
+        area=Decimal('50.00'),
+        living_area=Decimal('30.00'),
+        kitchen_area=Decimal('8.00'),
+        balcony='есть',
+        active=True,
+        title='2-комнатная квартира',
+        description='',
+        pictures=[]
+    )
+    values.update(fields)
+    return ObjectDm(**values)
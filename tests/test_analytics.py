@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.src.application import dto
+from app.src.infrastructure.analytics import ColumnarSnapshot
+
+
+NOW = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+
+def facts(id, city='Минск', rooms=2, price_usd=50000, area='50.00', active=True, minutes=0):
+    return dto.ObjectFacts(
+        id=str(id),
+        active=active,
+        updated_at=NOW + timedelta(minutes=minutes),
+        city=city,
+        city_region=None,
+        micro_region=None,
+        build_type='панельный',
+        repair=None,
+        rooms=rooms,
+        year_of_build=1985,
+        price_usd=price_usd,
+        price_m2=None if price_usd is None else price_usd // int(Decimal(area)),
+        area=Decimal(area)
+    )
+
+
+@pytest.fixture
+def snapshot():
+    snapshot = ColumnarSnapshot(capacity=4)
+    snapshot.apply([
+        facts(1, price_usd=40000),
+        facts(2, price_usd=60000),
+        facts(3, rooms=3, price_usd=90000, minutes=5),
+        facts(4, city='Гродно', price_usd=30000),
+        facts(5, city='Гродно', price_usd=None)
+    ])
+    return snapshot
+
+
+def test_aggregate_groups(snapshot):
+    groups = snapshot.aggregate(dto.AggregateQuery(metric='price_usd', group_by=('city', 'rooms')))
+    by_key = {(group.key['city'], group.key['rooms']): group for group in groups}
+    assert set(by_key) == {('Минск', 2), ('Минск', 3), ('Гродно', 2)}
+    minsk = by_key['Минск', 2]
+    assert (minsk.count, minsk.mean, minsk.min, minsk.max) == (2, 50000, 40000, 60000)
+    assert by_key['Гродно', 2].count == 1
+
+
+def test_aggregate_filters(snapshot):
+    [group] = snapshot.aggregate(dto.AggregateQuery(metric='price_usd', filters={'city': 'Минск'}))
+    assert group.key == {}
+    assert group.count == 3
+    assert snapshot.aggregate(dto.AggregateQuery(metric='price_usd', filters={'city': 'Брест'})) == []
+
+
+def test_aggregate_percentiles(snapshot):
+    [group] = snapshot.aggregate(dto.AggregateQuery(
+        metric='price_usd',
+        percentiles=(0, 50, 90, 100),
+        filters={'city': 'Минск'}
+    ))
+    assert group.percentiles == {'p0': 40000, 'p50': 60000, 'p90': 84000, 'p100': 90000}
+
+
+def test_apply_updates_and_deactivates(snapshot):
+    snapshot.apply([facts(2, price_usd=70000, minutes=10), facts(3, active=False, minutes=11)])
+    [group] = snapshot.aggregate(dto.AggregateQuery(metric='price_usd', filters={'city': 'Минск'}))
+    assert (group.count, group.max) == (2, 70000)
+    stats = snapshot.stats()
+    assert (stats.rows, stats.live) == (5, 4)
+    assert stats.watermark == NOW + timedelta(minutes=11)
+
+
+def test_histogram(snapshot):
+    histogram = snapshot.histogram(dto.HistogramQuery(metric='price_usd', bins=3))
+    assert histogram.edges == [30000, 50000, 70000, 90000]
+    assert histogram.counts == [2, 1, 1]
+
+
+def test_compaction_keeps_live_rows():
+    snapshot = ColumnarSnapshot()
+    snapshot.apply([facts(i, price_usd=1000 + i) for i in range(1200)])
+    snapshot.apply([facts(i, active=False, minutes=1) for i in range(700)])
+    stats = snapshot.stats()
+    assert (stats.rows, stats.live) == (500, 500)
+    [group] = snapshot.aggregate(dto.AggregateQuery(metric='price_usd'))
+    assert (group.count, group.min, group.max) == (500, 1700, 2199)
+
+    snapshot.apply([facts(5, price_usd=1, minutes=2), facts(700, active=False, minutes=2)])
+    [group] = snapshot.aggregate(dto.AggregateQuery(metric='price_usd'))
+    assert (group.count, group.min, group.max) == (500, 1, 2199)
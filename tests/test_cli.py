@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from app.src.cli import Replay, StageStats, read_archive, read_jsonl
+from app.src.config import ExtractorConfig
+from app.src.infrastructure.executors import ExtractionExecutor
+from app.src.infrastructure.page_archive import PageArchive
+
+
+PAGE = (Path(__file__).parent.parent / 'benchmarks' / 'fixtures' / 'synthetic_listing_2.html').read_text(encoding='utf-8')
+
+
+class BrokenContainer:
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        raise ConnectionRefusedError('database is down')
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+async def collect(source):
+    return [record async for record in source]
+
+
+async def test_malformed_jsonl_lines_count_as_read_failures(tmp_path):
+    path = tmp_path / 'pages.jsonl'
+    path.write_text('\n'.join([
+        json.dumps({'url': 'https://realt.by/a/', 'html': '<h1>a</h1>'}),
+        '{"url": "https://realt.by/truncated/',
+        json.dumps({'html': '<h1>no url</h1>'}),
+        '',
+        json.dumps({'url': 'https://realt.by/b/'}),
+    ]), encoding='utf-8')
+    stats = StageStats()
+    records = await collect(read_jsonl(str(path), stats))
+    assert records == [('https://realt.by/a/', '<h1>a</h1>'), ('https://realt.by/b/', None)]
+    assert (stats.failed, stats.errors) == (2, {'JSONDecodeError': 1, 'KeyError': 1})
+
+
+async def test_archive_replays_latest_pages(tmp_path):
+    archive = PageArchive(str(tmp_path))
+    archive.put('https://realt.by/a/', '<h1>old</h1>'.encode(), fetched_at=1.0)
+    archive.put('https://realt.by/a/', '<h1>new</h1>'.encode(), fetched_at=2.0)
+    archive.put('https://realt.by/b/', '<h1>б</h1>'.encode(), fetched_at=1.0)
+    archive.close()
+    records = await collect(read_archive(str(tmp_path), latest=True))
+    assert sorted(records) == [('https://realt.by/a/', '<h1>new</h1>'), ('https://realt.by/b/', '<h1>б</h1>')]
+
+
+async def test_persist_failure_stops_the_replay():
+    args = argparse.Namespace(workers=1, batch_size=1, dry_run=False)
+    executor = ExtractionExecutor(ExtractorConfig(EXTRACTOR_MODE='process', EXTRACTOR_WORKERS=1))
+    replay = Replay(BrokenContainer(), executor, args)
+
+    async def source():
+        for i in range(50):
+            yield f'https://realt.by/sale-flats/object/{i}/', PAGE
+
+    try:
+        with pytest.raises(ExceptionGroup) as error:
+            await asyncio.wait_for(replay.run(source()), timeout=60)
+    finally:
+        executor.shutdown()
+    assert error.group_contains(ConnectionRefusedError)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+
+import pytest
+from multidict import CIMultiDict, CIMultiDictProxy
+
+from app.src.application import dto
+from app.src.config import ExtractorConfig
+from app.src.infrastructure.executors import ExtractionExecutor
+from app.src.infrastructure.extractor_gateway import HttpParserGateway
+from app.src.infrastructure.page_archive import NullPageArchive
+from app.src.infrastructure.rate_limit import FetchThrottle
+from tests.test_refresh import FETCH_SETTINGS
+
+
+URL = 'https://realt.by/sale-flats/object/3412807/'
+BODY = '<html><h1>Квартира</h1></html>'.encode('utf-8')
+
+
+def content_hash(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class FakeResponse:
+
+    def __init__(self, status: int, body: bytes = b'', headers: dict[str, str] = {}) -> None:
+        self.status = status
+        self.headers = CIMultiDictProxy(CIMultiDict(headers))
+        self.charset = 'utf-8'
+        self._body = body
+
+    async def __aenter__(self) -> 'FakeResponse':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    async def read(self) -> bytes:
+        return self._body
+
+    def get_encoding(self) -> str:
+        return self.charset
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise AssertionError(f'unexpected status {self.status}')
+
+
+class FakeSession:
+
+    def __init__(self, response: FakeResponse) -> None:
+        self.response = response
+        self.requests: list[dict] = []
+
+    def get(self, url: str, **kwargs) -> FakeResponse:
+        self.requests.append({'url': url, **kwargs})
+        return self.response
+
+
+async def fetch(response: FakeResponse, state):
+    session = FakeSession(response)
+    executor = ExtractionExecutor(ExtractorConfig(EXTRACTOR_MODE='inline'))
+    gateway = HttpParserGateway(session, FetchThrottle(FETCH_SETTINGS), NullPageArchive(), executor)
+    result = await gateway.get_data_if_changed(dto.RequestParam(url=URL, headers=None), state, None)
+    return result, session.requests[0]['headers']
+
+
+STATE = dto.FetchState(
+    url=URL,
+    etag='"v1"',
+    last_modified='Sat, 01 Mar 2025 12:00:00 GMT',
+    content_hash=content_hash(BODY)
+)
+
+
+async def test_validators_are_sent_and_304_is_not_modified():
+    result, headers = await fetch(FakeResponse(304), STATE)
+    assert headers == {'If-None-Match': '"v1"', 'If-Modified-Since': 'Sat, 01 Mar 2025 12:00:00 GMT'}
+    assert result == dto.FetchResult(modified=False, data=None, state=STATE)
+
+
+async def test_unchanged_body_is_a_no_op():
+    result, _ = await fetch(FakeResponse(200, BODY, {'ETag': '"v2"'}), STATE)
+    assert result.modified is False
+    assert result.data is None
+    assert result.state == dto.FetchState(url=URL, etag='"v2"', last_modified=None, content_hash=STATE.content_hash)
+
+
+async def test_changed_body_is_returned():
+    body = '<html><h1>Квартира продана</h1></html>'.encode('utf-8')
+    result, _ = await fetch(FakeResponse(200, body), STATE)
+    assert result.modified is True
+    assert result.data == body.decode('utf-8')
+    assert result.state.content_hash == content_hash(body)
+
+
+async def test_first_fetch_sends_no_validators():
+    result, headers = await fetch(FakeResponse(200, BODY), None)
+    assert headers is None
+    assert result.modified is True
+
+
+@pytest.mark.parametrize('status', [404, 410])
+async def test_removed_listing_is_gone(status):
+    result, _ = await fetch(FakeResponse(status), STATE)
+    assert (result.modified, result.gone, result.state) == (False, True, None)
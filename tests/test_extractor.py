@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from aiohttp import ClientSession, web
+
+from app.src.application import dto
+from app.src.config import ExtractorConfig
+from app.src.infrastructure.executors import ExtractionExecutor
+from app.src.infrastructure.extractor_gateway import (
+    DataExtracorGateway,
+    HttpParserGateway,
+    _DRAINS,
+    _extract_stream,
+    _listing_extractor,
+    configure_extractor,
+    extract_object
+)
+from app.src.infrastructure.page_archive import NullPageArchive
+from app.src.infrastructure.rate_limit import FetchThrottle
+from app.src.infrastructure.realt_labels import UNKNOWN_LABELS
+from tests.test_refresh import FETCH_SETTINGS
+
+
+FIXTURES_DIR = Path(__file__).parent.parent / 'benchmarks' / 'fixtures'
+LISTING_URL = 'https://realt.by/sale-flats/object/2/'
+LISTING = (FIXTURES_DIR / 'synthetic_listing_2.html').read_text(encoding='utf-8')
+
+
+@pytest.fixture
+async def listing_site():
+    peers = []
+
+    async def listing(request):
+        peers.append(request.transport.get_extra_info('peername'))
+        response = web.StreamResponse(status=int(request.query.get('status', 200)))
+        response.content_type = 'text/html'
+        response.charset = 'utf-8'
+        await response.prepare(request)
+        await response.write(LISTING.encode('utf-8'))
+        # A tail larger than the client's read buffer, so it is still unread when parsing stops
+        for _ in range(64):
+            await response.write(b'<p>' + b'x' * 65536 + b'</p>')
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get('/object/2/', listing)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    yield f'http://{host}:{port}/object/2/', peers
+    await runner.cleanup()
+
+
+async def get_object(executor, url):
+    async with ClientSession() as client:
+        gateway = HttpParserGateway(client, FetchThrottle(FETCH_SETTINGS), NullPageArchive(), executor)
+        first = await gateway.get_object(dto.RequestParam(url=url, headers=None), None)
+        # The streamed tail drains after the object is returned; the next fetch reuses the connection
+        await asyncio.gather(*_DRAINS)
+        second = await gateway.get_object(dto.RequestParam(url=url + '?status=203', headers=None), None)
+        await asyncio.gather(*_DRAINS)
+    return first, second
+
+
+@pytest.fixture
+def process_executor():
+    executor = ExtractionExecutor(
+        ExtractorConfig(EXTRACTOR_MODE='process', EXTRACTOR_WORKERS=1),
+        configure_extractor,
+        (None,)
+    )
+    yield executor
+    executor.shutdown()
+
+
+async def test_unknown_labels_from_worker_processes_are_reported(process_executor):
+    page = LISTING.replace(
+        '<li class="relative py-1"><span class="text-basic w-full text-subhead md:w-1/2">Ремонт</span>',
+        '<li class="relative py-1"><span class="text-basic w-full text-subhead md:w-1/2">Вид из окна</span>'
+        '<p class="w-1/2 !inline-block">во двор</p></li>\n'
+        '<li class="relative py-1"><span class="text-basic w-full text-subhead md:w-1/2">Ремонт</span>'
+    )
+    UNKNOWN_LABELS.pop('Вид из окна', None)
+    gateway = DataExtracorGateway(process_executor)
+
+    object_dm = await gateway.extract_data(page, dto.RequestParam(url=LISTING_URL, headers=None))
+    await gateway.extract_data(page, dto.RequestParam(url=LISTING_URL, headers=None))
+
+    assert (object_dm.price_usd, object_dm.repair) == (72000, 'евроремонт')
+    assert dto.LabelCount(label='Вид из окна', count=2) in gateway.unknown_labels()
+
+
+def test_streamed_labels_are_returned_not_counted():
+    page = LISTING.replace(
+        '<span class="text-basic w-full text-subhead md:w-1/2">Ремонт</span>',
+        '<span class="text-basic w-full text-subhead md:w-1/2">Вид на парк</span>'
+    )
+    UNKNOWN_LABELS.pop('Вид на парк', None)
+    stream = _listing_extractor.stream('utf-8')
+    stream.feed(page.encode('utf-8'))
+
+    object_dm, unknown_labels = _extract_stream(stream, LISTING_URL)
+
+    assert object_dm.price_usd == 72000
+    assert unknown_labels == {'Вид на парк': 1}
+    assert 'Вид на парк' not in UNKNOWN_LABELS
+
+
+async def test_streamed_object_matches_full_parse_and_reuses_connection(listing_site):
+    url, peers = listing_site
+    executor = ExtractionExecutor(ExtractorConfig(EXTRACTOR_MODE='thread', EXTRACTOR_WORKERS=1))
+    try:
+        first, second = await get_object(executor, url)
+    finally:
+        executor.shutdown()
+    expected = extract_object(LISTING, url)
+    assert first == expected
+    assert first.price_usd == 72000
+    assert second.price_byn == expected.price_byn
+    assert peers[0] == peers[1]
+
+
+async def test_streamed_object_is_returned_before_the_tail_arrives():
+    tail_sent = asyncio.Event()
+
+    async def listing(request):
+        response = web.StreamResponse()
+        response.content_type = 'text/html'
+        await response.prepare(request)
+        await response.write(LISTING.encode('utf-8'))
+        await tail_sent.wait()
+        await response.write(b'<p>tail</p>')
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get('/object/2/', listing)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    executor = ExtractionExecutor(ExtractorConfig(EXTRACTOR_MODE='inline'))
+    try:
+        async with ClientSession() as client:
+            gateway = HttpParserGateway(client, FetchThrottle(FETCH_SETTINGS), NullPageArchive(), executor)
+            url = f'http://{host}:{port}/object/2/'
+            object_dm = await asyncio.wait_for(
+                gateway.get_object(dto.RequestParam(url=url, headers=None), None), timeout=10
+            )
+            assert object_dm.price_usd == 72000
+            assert _DRAINS
+            tail_sent.set()
+            await asyncio.gather(*_DRAINS)
+    finally:
+        executor.shutdown()
+        await runner.cleanup()
+
+
+async def test_process_mode_uses_worker_selectors(listing_site, tmp_path):
+    url, _ = listing_site
+    selectors = tmp_path / 'selectors.json'
+    selectors.write_text(json.dumps({'title': '//title'}), encoding='utf-8')
+    executor = ExtractionExecutor(
+        ExtractorConfig(EXTRACTOR_MODE='process', EXTRACTOR_WORKERS=1),
+        configure_extractor,
+        (str(selectors),)
+    )
+    try:
+        first, second = await get_object(executor, url)
+    finally:
+        executor.shutdown()
+    assert first.title == '2-комнатная квартира, Притыцкого ул., 62 — купить в Минск'
+    assert (first.price_usd, second.price_usd) == (72000, 72000)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+import math
+import random
+
+import pytest
+
+from app.src.domain import geohash
+
+
+def test_encode_known_points():
+    assert geohash.encode(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+    assert geohash.encode(53.9, 27.5667) == 'u9edek1qq'
+    assert geohash.encode(-90, -180, 4) == '0000'
+
+
+def test_encode_prefixes_are_coarser_cells():
+    assert geohash.encode(53.9, 27.5667, 5) == geohash.encode(53.9, 27.5667)[:5]
+
+
+def test_bounding_box_contains_radius():
+    min_lat, min_lon, max_lat, max_lon = geohash.bounding_box(53.9, 27.5667, 1000)
+    assert max_lat - 53.9 == pytest.approx(1000 / geohash.METERS_PER_DEGREE)
+    assert 53.9 - min_lat == pytest.approx(1000 / geohash.METERS_PER_DEGREE)
+    lon_delta = 1000 / (geohash.METERS_PER_DEGREE * math.cos(math.radians(53.9)))
+    assert (max_lon - 27.5667, 27.5667 - min_lon) == pytest.approx((lon_delta, lon_delta))
+
+
+def test_bounding_box_is_clipped_at_the_poles():
+    min_lat, min_lon, max_lat, max_lon = geohash.bounding_box(89.99, 179.99, 5000)
+    assert max_lat == 90.0
+    assert max_lon == 180.0
+    assert min_lat < 89.99 and min_lon < 179.99
+
+
+@pytest.mark.parametrize('box', [
+    (53.85, 27.45, 53.95, 27.65),
+    (53.9, 27.5667, 53.9001, 27.5668),
+    (-10.0, -10.0, 10.0, 10.0),
+])
+def test_cover_contains_every_point(box):
+    cells = geohash.cover(*box)
+    assert 0 < len(cells) <= 16
+    rng = random.Random(0)
+    for _ in range(500):
+        point = geohash.encode(rng.uniform(box[0], box[2]), rng.uniform(box[1], box[3]))
+        assert any(point.startswith(cell) for cell in cells)
+
+
+def test_cover_uses_finest_precision_that_fits():
+    cells = geohash.cover(53.9, 27.5667, 53.9, 27.5667)
+    assert cells == [geohash.encode(53.9, 27.5667)]
+
+
+def test_cover_falls_back_to_everything():
+    assert geohash.cover(-90, -180, 90, 180) == ['']
+
+
+def test_cover_of_an_empty_box():
+    assert geohash.cover(54.0, 27.0, 53.0, 28.0) == []
+    assert geohash.cover(53.0, 28.0, 54.0, 27.0) == []
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from app.src.application.dto import DbSearchFilters
+from app.src.controllers.http import etag_matches, search_filters
+
+
+ETAG = '"0b6a7c1e-3"'
+
+
+@pytest.mark.parametrize('if_none_match', [
+    '"0b6a7c1e-3"',
+    '*',
+    ' * ',
+    '"other-1", "0b6a7c1e-3"',
+    '"other-1","0b6a7c1e-3"',
+    '"other-1" ,  W/"0b6a7c1e-3" ',
+    'W/"0b6a7c1e-3"',
+])
+def test_etag_matches(if_none_match):
+    assert etag_matches(if_none_match, ETAG)
+
+
+@pytest.mark.parametrize('if_none_match', [
+    '"0b6a7c1e-2"',
+    '"other-1", "0b6a7c1e-4"',
+    '0b6a7c1e-3',
+    '',
+])
+def test_etag_does_not_match(if_none_match):
+    assert not etag_matches(if_none_match, ETAG)
+
+
+def test_search_filters_are_stripped():
+    filters = search_filters(city='Минск ', street='  ', rooms=2, q=' центр')
+    assert (filters.city, filters.street, filters.rooms, filters.q) == ('Минск', None, 2, 'центр')
+    assert search_filters(city='Минск ') == DbSearchFilters(city='Минск')
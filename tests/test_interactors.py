@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+from itertools import count
+
+from app.src.application import dto
+from app.src.application.interactors import (
+    BatchIngestInteractor,
+    DiscoverListingsInteractor,
+    FindNearbyObjectsInteractor
+)
+from tests.factories import make_object
+
+
+class FakeNearbyGateway:
+
+    def __init__(self) -> None:
+        self.areas: list[dto.GeoSearch] = []
+
+    async def search_nearby(self, filters, area, page):
+        self.areas.append(area)
+        return dto.SearchResults(items=[])
+
+
+SEARCH_SETTINGS = dto.SearchSettings(default_page_size=20, max_page_size=100, stream_batch_size=500)
+
+
+async def test_nearby_search_clips_radius_to_box():
+    gateway = FakeNearbyGateway()
+    find_nearby = FindNearbyObjectsInteractor(gateway, SEARCH_SETTINGS)
+    area = dto.GeoSearch(latitude=53.9, longitude=27.5, radius=10000, min_latitude=53.88, max_longitude=27.52)
+    await find_nearby(dto.DbSearchFilters(), area)
+    [searched] = gateway.areas
+    assert searched.min_latitude == 53.88
+    assert searched.max_longitude == 27.52
+    assert searched.max_latitude > 53.9 > searched.min_latitude
+
+
+async def test_nearby_search_outside_box_is_empty():
+    gateway = FakeNearbyGateway()
+    find_nearby = FindNearbyObjectsInteractor(gateway, SEARCH_SETTINGS)
+    area = dto.GeoSearch(
+        latitude=53.9,
+        longitude=27.5,
+        radius=1000,
+        min_latitude=52.0,
+        min_longitude=23.0,
+        max_latitude=52.5,
+        max_longitude=24.0
+    )
+    page = await find_nearby(dto.DbSearchFilters(), area)
+    assert page.items == []
+    assert page.next_cursor is None
+    assert gateway.areas == []
+
+
+class FakeSaveGateway:
+
+    def __init__(self, stored: dict[str, str]) -> None:
+        self.stored = stored
+        self.upserted: list[str] = []
+
+    async def save_many(self, objects):
+        inserted = {object_dm.url: object_dm.id for object_dm in objects if object_dm.url not in self.stored}
+        self.stored.update(inserted)
+        return inserted
+
+    async def upsert(self, object_dm):
+        self.upserted.append(object_dm.url)
+        return self.stored[object_dm.url]
+
+
+class FakeParser:
+
+    async def get_data(self, request_params, cookies, filters):
+        return request_params.url
+
+
+class FakeExtractor:
+
+    async def extract_data(self, data, request_params):
+        return make_object(id=None, url=request_params.url, title=data)
+
+
+class FakeSession:
+
+    def __init__(self) -> None:
+        self.commits = 0
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+    async def rollback(self) -> None:
+        pass
+
+
+class FakeCache:
+
+    def __init__(self) -> None:
+        self.invalidated: list[str] = []
+
+    def invalidate(self, url=None) -> None:
+        self.invalidated.append(url)
+
+
+class FakeSeenUrls(set):
+
+    def contains(self, url: str) -> bool:
+        return url in self
+
+
+async def test_batch_ingest_upserts_urls_stored_meanwhile():
+    save_gateway = FakeSaveGateway({'https://realt.by/object/1/': 'stored-id'})
+    object_cache = FakeCache()
+    seen_urls = FakeSeenUrls()
+    ids = count()
+    ingest = BatchIngestInteractor(
+        FakeParser(), FakeExtractor(), save_gateway, save_gateway, FakeSession(),
+        lambda: f'new-{next(ids)}', FakeCache(), object_cache, seen_urls,
+        dto.IngestSettings(fetch_workers=2, parse_workers=1, queue_size=4, persist_batch_size=10)
+    )
+    urls = ['https://realt.by/object/1/', 'https://realt.by/object/2/']
+    results = {result.url: result for result in await ingest(urls)}
+    assert results[urls[0]].id == 'stored-id'
+    assert results[urls[1]].id.startswith('new-')
+    assert all(result.error is None for result in results.values())
+    assert save_gateway.upserted == [urls[0]]
+    assert seen_urls == set(urls)
+    assert set(object_cache.invalidated) == set(urls)
+
+
+class FakeLinkExtractor:
+
+    def __init__(self, pages: dict[str, list[str]]) -> None:
+        self.pages = pages
+
+    async def extract_links(self, data, request_params, link_pattern):
+        return self.pages.get(data, [])
+
+
+class FakeUrlsGateway:
+
+    def __init__(self, stored: set[str]) -> None:
+        self.stored = stored
+
+    async def read_stored_urls(self, urls):
+        return self.stored.intersection(urls)
+
+
+class FakeIngest:
+
+    def __init__(self) -> None:
+        self.ingested: list[str] = []
+
+    async def __call__(self, urls):
+        self.ingested.extend(urls)
+        return [dto.IngestResult(url=url, id=url, error=None) for url in urls]
+
+
+async def test_discovery_ingests_false_positive_hits():
+    stored, false_positive, new = (f'https://realt.by/object/{n}/' for n in range(3))
+    ingest = FakeIngest()
+    discover = DiscoverListingsInteractor(
+        FakeParser(),
+        FakeLinkExtractor({'https://realt.by/search/1/': [stored, false_positive, new]}),
+        FakeSeenUrls({stored, false_positive}),
+        FakeUrlsGateway({stored}),
+        ingest,
+        dto.DiscoverySettings(search_url='https://realt.by/search/{page}/', link_pattern='', max_pages=3)
+    )
+    result = await discover(None)
+    assert (result.pages, result.found) == (1, 3)
+    assert ingest.ingested == [false_positive, new]
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+from dataclasses import replace
+
+from sqlalchemy import text
+
+from app.src.infrastructure.gateways import ObjectsGateway
+from tests.factories import make_object
+
+
+async def object_row(session, url):
+    result = await session.execute(text("""
+        SELECT id, version, price_changes, updated_at, price_usd, title,
+            (SELECT count(*) FROM price_history WHERE object_id = objects.id) AS history
+        FROM objects WHERE url = :url
+    """), {"url": url})
+    return result.one()
+
+
+async def test_save_many_inserts_new_urls_only(db_session):
+    gateway = ObjectsGateway(db_session)
+    stored = make_object()
+    await gateway.save_many([stored])
+    fresh = [make_object(), make_object(price_m2=None, pictures=['https://static.realt.by/1.jpg'])]
+
+    inserted = await gateway.save_many([replace(stored, id=make_object().id, title='Дубль'), *fresh])
+
+    assert inserted.keys() == {object_dm.url for object_dm in fresh}
+    for object_dm in fresh:
+        row = await object_row(db_session, object_dm.url)
+        assert (str(row.id), row.version, row.history) == (inserted[object_dm.url], 1, 1)
+    row = await object_row(db_session, stored.url)
+    assert (str(row.id), row.title, row.history) == (stored.id, stored.title, 1)
+    assert await gateway.save_many([]) == {}
+
+
+async def test_upsert_of_unchanged_object_is_a_no_op(db_session):
+    gateway = ObjectsGateway(db_session)
+    object_dm = make_object()
+    object_id = await gateway.upsert(object_dm)
+    before = await object_row(db_session, object_dm.url)
+
+    assert await gateway.upsert(replace(object_dm, id=make_object().id)) == object_id
+
+    after = await object_row(db_session, object_dm.url)
+    assert after == before
+    assert (after.version, after.price_changes, after.history) == (1, 0, 1)
+
+
+async def test_upsert_bumps_version_and_counts_price_changes(db_session):
+    gateway = ObjectsGateway(db_session)
+    object_dm = make_object()
+    object_id = await gateway.upsert(object_dm)
+
+    await gateway.upsert(replace(object_dm, title='Новое название'))
+    row = await object_row(db_session, object_dm.url)
+    assert (str(row.id), row.version, row.price_changes, row.title) == (object_id, 2, 0, 'Новое название')
+
+    await gateway.upsert(replace(object_dm, title='Новое название', price_usd=58000))
+    row = await object_row(db_session, object_dm.url)
+    assert (row.version, row.price_changes, row.price_usd) == (3, 1, 58000)
+
+
+async def test_read_stored_urls_confirms_only_stored(db_session):
+    gateway = ObjectsGateway(db_session)
+    stored = make_object()
+    await gateway.save_many([stored])
+    missing = make_object().url
+
+    assert await gateway.read_stored_urls([stored.url, missing]) == {stored.url}
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+from app.src.infrastructure import page_archive
+from app.src.infrastructure.page_archive import PageArchive
+
+
+def page(number: int) -> bytes:
+    # Random bytes do not compress, so segment sizes are predictable
+    return f'<h1>{number}</h1>'.encode() + os.urandom(400)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = PageArchive(str(tmp_path), segment_size=1024)
+    yield archive
+    archive.close()
+
+
+def segments(directory) -> list[str]:
+    return sorted(path.name for path in directory.glob('segment-*.bin'))
+
+
+def test_identical_bodies_are_stored_once(archive, tmp_path):
+    body = page(1)
+    first = archive.put('https://realt.by/a/', body, fetched_at=1.0)
+    size = (tmp_path / 'segment-00000.bin').stat().st_size
+    second = archive.put('https://realt.by/b/', body, fetched_at=2.0)
+    assert first == second
+    assert (tmp_path / 'segment-00000.bin').stat().st_size == size
+    assert archive.get('https://realt.by/a/') == archive.get('https://realt.by/b/') == body
+
+
+def test_segments_roll_over_at_the_size_limit(archive, tmp_path):
+    bodies = {f'https://realt.by/{number}/': page(number) for number in range(6)}
+    for url, body in bodies.items():
+        archive.put(url, body, fetched_at=1.0)
+    assert segments(tmp_path) == ['segment-00000.bin', 'segment-00001.bin', 'segment-00002.bin']
+    assert all((tmp_path / name).stat().st_size <= 1024 for name in segments(tmp_path))
+    assert {url: archive.get(url) for url in bodies} == bodies
+    assert {url: body for url, _, body in archive.iter_pages()} == bodies
+
+
+def test_reopened_archive_appends_to_the_last_segment(archive, tmp_path):
+    archive.put('https://realt.by/1/', page(1), fetched_at=1.0)
+    archive.put('https://realt.by/2/', page(2), fetched_at=1.0)
+    archive.put('https://realt.by/3/', page(3), fetched_at=1.0)
+    archive.close()
+    reopened = PageArchive(str(tmp_path), segment_size=1024)
+    body = page(4)
+    reopened.put('https://realt.by/4/', body, fetched_at=1.0)
+    assert segments(tmp_path) == ['segment-00000.bin', 'segment-00001.bin']
+    assert reopened.get('https://realt.by/4/') == body
+    reopened.close()
+
+
+def test_grown_segment_is_remapped_and_old_map_closed(tmp_path):
+    archive = PageArchive(str(tmp_path))
+    first = page(1)
+    archive.put('https://realt.by/1/', first, fetched_at=1.0)
+    assert archive.get('https://realt.by/1/') == first
+    old_map = archive._maps[0]
+    second = page(2)
+    archive.put('https://realt.by/2/', second, fetched_at=1.0)
+    assert archive.get('https://realt.by/2/') == second
+    assert old_map.closed
+    assert archive._maps[0] is not old_map
+    archive.close()
+
+
+def test_iter_pages_reads_the_index_in_batches(archive, monkeypatch):
+    monkeypatch.setattr(page_archive, '_ITER_BATCH_SIZE', 2)
+    for number in range(5):
+        archive.put(f'https://realt.by/{number}/', page(number), fetched_at=float(number))
+    archive.put('https://realt.by/0/', page(9), fetched_at=10.0)
+    assert len(list(archive.iter_pages())) == 6
+    latest = {url: fetched_at for url, fetched_at, _ in archive.iter_pages(latest=True)}
+    assert latest == {'https://realt.by/0/': 10.0, **{f'https://realt.by/{n}/': float(n) for n in range(1, 5)}}
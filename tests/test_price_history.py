@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+from sqlalchemy import text
+
+from app.src.infrastructure.gateways import ObjectsGateway, PriceHistoryGateway
+from tests.factories import make_object
+
+
+async def test_partition_takes_rows_from_default(db_session):
+    object_id = await ObjectsGateway(db_session).upsert(make_object())
+    await db_session.execute(
+        text("""
+            INSERT INTO price_history (object_id, observed_at, price_usd, price_byn)
+            VALUES (:id, '2099-05-15', 50000, 150000), (:id, '2099-06-01', 51000, 153000)
+        """),
+        {"id": object_id}
+    )
+
+    await db_session.execute(text("SELECT ensure_price_history_partition('2099-05-20')"))
+    await db_session.execute(text("SELECT ensure_price_history_partition('2099-05-01')"))
+
+    partitions = await db_session.execute(text("""
+        SELECT tableoid::regclass::text AS partition, price_usd
+        FROM price_history WHERE object_id = :id AND observed_at >= '2099-01-01' ORDER BY observed_at
+    """), {"id": object_id})
+    assert [tuple(row) for row in partitions] == [
+        ("price_history_2099_05", 50000),
+        ("price_history_default", 51000),
+    ]
+    history = await PriceHistoryGateway(db_session).read_price_history(str(object_id))
+    assert [point.price_usd for point in history] == [60000, 50000, 51000]
+
+
+async def test_ensure_partitions_is_idempotent(db_session):
+    gateway = PriceHistoryGateway(db_session)
+    await gateway.ensure_partitions(2)
+    await gateway.ensure_partitions(2)
+    current = await db_session.scalar(text(
+        "SELECT to_regclass('price_history_' || to_char(now(), 'YYYY_MM'))::text"
+    ))
+    assert current is not None
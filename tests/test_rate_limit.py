@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from app.src.application import dto
+from app.src.infrastructure import rate_limit
+from app.src.infrastructure.rate_limit import FetchThrottle, HostThrottle, parse_retry_after
+
+
+SETTINGS = dto.FetchSettings(
+    initial_rate=4,
+    min_rate=0.5,
+    max_rate=5,
+    burst=2,
+    initial_concurrency=4,
+    max_concurrency=6,
+    max_retries=3,
+    backoff_base=0.5,
+    backoff_max=3
+)
+NOW = datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeClock:
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+class FrozenDatetime(datetime):
+
+    @classmethod
+    def now(cls, tz=None):
+        return NOW
+
+
+# Bound before the clock fixture replaces asyncio.sleep
+yield_to_loop = asyncio.sleep
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(asyncio, 'sleep', clock.sleep)
+    return clock
+
+
+def test_parse_retry_after_seconds():
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after(' 7 ') == 7.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('') is None
+    assert parse_retry_after('soon') is None
+
+
+def test_parse_retry_after_http_date(monkeypatch):
+    monkeypatch.setattr(rate_limit, 'datetime', FrozenDatetime)
+    assert parse_retry_after('Sat, 01 Mar 2025 12:01:30 GMT') == 90.0
+    assert parse_retry_after('Sat, 01 Mar 2025 11:59:00 GMT') == 0.0
+
+
+def test_success_grows_rate_and_concurrency_additively(clock):
+    throttle = HostThrottle('realt.by', SETTINGS)
+    throttle.on_success()
+    assert (throttle.rate, throttle.concurrency) == (4.25, 4.25)
+    for _ in range(50):
+        throttle.on_success()
+    assert (throttle.rate, throttle.concurrency) == (5, 6)
+
+
+def test_throttle_halves_rate_and_concurrency(clock):
+    throttle = HostThrottle('realt.by', SETTINGS)
+    throttle.on_throttle(None)
+    assert (throttle.rate, throttle.concurrency, throttle.throttled) == (2, 2, 1)
+    for _ in range(5):
+        throttle.on_throttle(None)
+    assert (throttle.rate, throttle.concurrency) == (0.5, 1)
+    assert throttle.stats() == dto.HostFetchStats(
+        host='realt.by', rate=0.5, concurrency=1, in_flight=0, throttled=6
+    )
+
+
+async def test_token_bucket_paces_after_burst(clock):
+    throttle = HostThrottle('realt.by', SETTINGS)
+    for _ in range(3):
+        async with throttle:
+            pass
+    assert clock.sleeps == [0.25]
+
+
+async def test_retry_after_pauses_the_host(clock):
+    throttle = HostThrottle('realt.by', SETTINGS)
+    throttle.on_throttle(30)
+    async with throttle:
+        assert throttle.in_flight == 1
+    assert clock.sleeps == [30]
+    assert throttle.in_flight == 0
+
+
+async def test_concurrency_limits_requests_in_flight(clock):
+    throttle = HostThrottle('realt.by', SETTINGS)
+    throttle.on_throttle(None)
+    await throttle.__aenter__()
+    await throttle.__aenter__()
+    waiter = asyncio.create_task(throttle.__aenter__())
+    for _ in range(3):
+        await yield_to_loop(0)
+    assert (waiter.done(), throttle.in_flight) == (False, 2)
+    await throttle.__aexit__(None, None, None)
+    await waiter
+    assert throttle.in_flight == 2
+
+
+def test_backoff_is_capped_exponential(monkeypatch):
+    monkeypatch.setattr(rate_limit.random, 'uniform', lambda low, high: high)
+    throttle = FetchThrottle(SETTINGS)
+    assert [throttle.backoff(attempt, None) for attempt in range(5)] == [0.5, 1, 2, 3, 3]
+    assert throttle.backoff(0, 10) == 10
+
+
+def test_hosts_are_throttled_separately():
+    throttle = FetchThrottle(SETTINGS)
+    first = throttle.for_url('https://realt.by/sale-flats/object/1/')
+    assert throttle.for_url('https://realt.by/sale-flats/object/2/') is first
+    assert throttle.for_url('https://example.com/') is not first
+    assert [stats.host for stats in throttle.stats()] == ['realt.by', 'example.com']
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from aiohttp import ClientResponseError, ClientSession, web
+
+from app.src.application import dto
+from app.src.application.interactors import RefreshObjectInteractor
+from app.src.config import ExtractorConfig
+from app.src.infrastructure.executors import ExtractionExecutor
+from app.src.infrastructure.extractor_gateway import DataExtracorGateway, HttpParserGateway
+from app.src.infrastructure.page_archive import NullPageArchive
+from app.src.infrastructure.rate_limit import FetchThrottle
+
+
+FETCH_SETTINGS = dto.FetchSettings(
+    initial_rate=100,
+    min_rate=1,
+    max_rate=100,
+    burst=10,
+    initial_concurrency=4,
+    max_concurrency=4,
+    max_retries=1,
+    backoff_base=0.001,
+    backoff_max=0.001
+)
+
+
+@pytest.fixture
+async def stub_site():
+    async def broken_listing(request):
+        return web.Response(text='<html><body><h1>Квартира</h1></body></html>', content_type='text/html')
+
+    async def server_error(request):
+        return web.Response(status=503)
+
+    app = web.Application()
+    app.router.add_get('/object/broken/', broken_listing)
+    app.router.add_get('/object/down/', server_error)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    yield f'http://{host}:{port}'
+    await runner.cleanup()
+
+
+class FakeFetchStates:
+
+    def __init__(self) -> None:
+        self.failures: dict[str, int] = {}
+        self.saved: list[dto.FetchState] = []
+
+    async def read_fetch_state(self, url):
+        return None
+
+    async def save_fetch_state(self, state):
+        self.saved.append(state)
+        self.failures.pop(state.url, None)
+
+    async def save_fetch_failure(self, url):
+        self.failures[url] = self.failures.get(url, 0) + 1
+
+
+class FakeObjects:
+
+    def __init__(self) -> None:
+        self.upserted = []
+
+    async def upsert(self, object_dm):
+        self.upserted.append(object_dm)
+        return object_dm.id
+
+    async def deactivate_by_url(self, url):
+        pass
+
+
+class FakeSession:
+
+    def __init__(self) -> None:
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+class FakeCache:
+
+    def invalidate(self, url=None):
+        pass
+
+
+@pytest.fixture
+async def refresh_setup():
+    executor = ExtractionExecutor(ExtractorConfig(EXTRACTOR_MODE='inline'))
+    states, objects, session = FakeFetchStates(), FakeObjects(), FakeSession()
+    async with ClientSession() as client:
+        refresh = RefreshObjectInteractor(
+            HttpParserGateway(client, FetchThrottle(FETCH_SETTINGS), NullPageArchive(), executor),
+            DataExtracorGateway(executor),
+            states,
+            states,
+            objects,
+            objects,
+            session,
+            lambda: '00000000-0000-0000-0000-000000000000',
+            FakeCache(),
+            FakeCache(),
+            set()
+        )
+        yield refresh, states, objects, session
+    executor.shutdown()
+
+
+async def test_extraction_failure_is_recorded(stub_site, refresh_setup):
+    refresh, states, objects, session = refresh_setup
+    url = f'{stub_site}/object/broken/'
+    for attempt in (1, 2):
+        with pytest.raises(Exception):
+            await refresh(dto.RequestParam(url=url, headers=None))
+        assert states.failures == {url: attempt}
+    assert states.saved == []
+    assert objects.upserted == []
+    assert (session.rollbacks, session.commits) == (2, 2)
+
+
+async def test_fetch_failure_is_recorded(stub_site, refresh_setup):
+    refresh, states, _, session = refresh_setup
+    url = f'{stub_site}/object/down/'
+    with pytest.raises(ClientResponseError):
+        await refresh(dto.RequestParam(url=url, headers=None))
+    assert states.failures == {url: 1}
+    assert session.commits == 1
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+from app.src.controllers.scheduler import PeriodicTask
+
+
+class FlakyTask(PeriodicTask):
+    failure_message = "Flaky task failed"
+
+    def __init__(self, runs: int) -> None:
+        super().__init__(container=None, interval=0.001)
+        self.calls = 0
+        self.done = asyncio.Event()
+        self._runs = runs
+
+    async def run_once(self) -> None:
+        self.calls += 1
+        if self.calls >= self._runs:
+            self.done.set()
+        if self.calls == 1:
+            raise RuntimeError("first run fails")
+
+
+async def test_periodic_task_runs_at_once_and_survives_failures(caplog):
+    task = FlakyTask(runs=3)
+    task.start()
+    task.start()
+    await asyncio.wait_for(task.done.wait(), timeout=5)
+    await task.stop()
+    calls = task.calls
+    await asyncio.sleep(0.01)
+    assert calls >= 3
+    assert task.calls == calls
+    assert "Flaky task failed" in caplog.text
+
+
+async def test_stop_before_start_is_a_no_op():
+    await FlakyTask(runs=1).stop()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import json
+
+import pytest
+
+from app.src.application import dto
+from app.src.infrastructure.gateways import ObjectsGateway, _decode_cursor, _encode_cursor
+from tests.factories import make_object
+
+
+OBJECT_ID = '6f1c2a3b-4d5e-4f60-8a7b-9c0d1e2f3a4b'
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_cursor_round_trip():
+    cursor = _encode_cursor({"id": OBJECT_ID, "rank": 0.0607927})
+    assert _decode_cursor(cursor, "rank") == {"id": OBJECT_ID, "rank": 0.0607927}
+    assert _decode_cursor(_encode_cursor({"id": OBJECT_ID})) == {"id": OBJECT_ID}
+
+
+@pytest.mark.parametrize('cursor', [
+    'not a cursor',
+    base64.urlsafe_b64encode(b'{"id": ').decode(),
+    raw_cursor([OBJECT_ID]),
+    raw_cursor({"rank": 0.5}),
+    raw_cursor({"id": "1 OR 1=1", "rank": 0.5}),
+    raw_cursor({"id": OBJECT_ID}),
+    raw_cursor({"id": OBJECT_ID, "rank": "high"}),
+    raw_cursor({"id": OBJECT_ID, "rank": "NaN"}),
+])
+def test_tampered_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        _decode_cursor(cursor, "rank")
+
+
+def test_cursor_becomes_keyset_condition():
+    gateway = ObjectsGateway(session=None)
+    cursor = _encode_cursor({"id": OBJECT_ID, "rank": 0.25})
+    query, params = gateway._search_statement(
+        dto.DbSearchFilters(q='кирпичный'),
+        dto.SearchPage(limit=20, cursor=cursor)
+    )
+    assert "rank < :after_rank OR (rank = :after_rank AND id > :after_id)" in query
+    assert (params["after_rank"], params["after_id"], params["limit"]) == (0.25, OBJECT_ID, 21)
+
+    query, params = gateway._search_statement(dto.DbSearchFilters(), dto.SearchPage(limit=20, cursor=cursor))
+    assert "id > :after_id" in query and query.endswith("ORDER BY id LIMIT :limit")
+    assert params["after_id"] == OBJECT_ID
+
+
+async def test_pages_follow_the_cursor(db_session):
+    gateway = ObjectsGateway(db_session)
+    await gateway.save_many([make_object(city='Курсорск') for _ in range(5)])
+    filters = dto.DbSearchFilters(city='Курсорск')
+    seen, cursor = [], None
+    while True:
+        page = await gateway.search_objects(filters, dto.SearchPage(limit=2, cursor=cursor))
+        seen.extend(str(item.id) for item in page.items)
+        if (cursor := page.next_cursor) is None:
+            break
+    assert len(seen) == 5
+    assert seen == sorted(seen)
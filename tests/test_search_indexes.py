@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from sqlalchemy import text
+
+from app.src.application import dto
+from app.src.infrastructure.gateways import ObjectsGateway
+from tests.factories import make_object
+
+
+@pytest.fixture
+async def gateway(db_session):
+    gateway = ObjectsGateway(db_session)
+    await gateway.save_many([
+        make_object(
+            city=('Минск', 'Гродно', 'Брест', 'Гомель')[i % 4],
+            rooms=i % 5 + 1,
+            price_usd=20000 + i * 50,
+            active=i % 3 != 0
+        )
+        for i in range(2000)
+    ])
+    await db_session.execute(text("ANALYZE objects"))
+    return gateway
+
+
+async def explain(gateway, filters):
+    query, params = gateway._search_statement(filters, dto.SearchPage(limit=20))
+    result = await gateway._session.execute(text("EXPLAIN " + query), params)
+    return "\n".join(result.scalars())
+
+
+async def test_price_range_uses_active_price_index(gateway):
+    plan = await explain(gateway, dto.DbSearchFilters(
+        active=True,
+        min_price_usd=40000,
+        max_price_usd=42000
+    ))
+    assert "ix_objects_active_price_usd" in plan
+
+
+async def test_city_rooms_price_uses_active_city_rooms_index(gateway):
+    plan = await explain(gateway, dto.DbSearchFilters(
+        active=True,
+        city='Гродно',
+        rooms=2,
+        min_price_usd=40000,
+        max_price_usd=80000
+    ))
+    assert "ix_objects_active_city_rooms_price_usd" in plan
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+
+from app.src.infrastructure.seen_filter import SeenUrlFilter
+
+
+def test_filter_grows_past_capacity():
+    seen_urls = SeenUrlFilter(capacity=100, error_rate=0.01)
+    urls = [f'https://realt.by/object/{n}/' for n in range(1000)]
+    for url in urls:
+        seen_urls.add(url)
+    assert all(seen_urls.contains(url) for url in urls)
+    assert len(seen_urls._stages) > 1
+    false_positives = sum(seen_urls.contains(f'https://realt.by/other/{n}/') for n in range(10000))
+    assert false_positives < 100
+
+
+def test_repeated_urls_do_not_fill_the_filter():
+    seen_urls = SeenUrlFilter(capacity=10, error_rate=0.01)
+    for _ in range(100):
+        seen_urls.add('https://realt.by/object/1/')
+    assert len(seen_urls._stages) == 1